@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+核心操作效能測試
+產生固定亂數種子的測試資料（大量小檔案、少數大型檔案、混合編碼、深層目錄），
+在不需要顯示器的情況下測量拖拽資料解析、新增檔案、合併、匯出、狀態存取與
+編碼偵測的時間，並以 JSON 輸出每項的時間與記憶體高峰，可在不同版本間比較
+
+用法:
+    python benchmarks/core_operations.py [--scale 1.0] [--repeat 5] [-o results.json]
+    python benchmarks/core_operations.py --baseline old.json   # 與先前的結果比較（輸出到標準錯誤）
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree as ElementTree
+
+# 將專案目錄加入Python路徑
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from cli.combine import expand_paths
+from core.drop_parser import parse_drop_files
+from core.file_handler import FileHandler
+from core.output_formatters import get_formatter
+from core.state_manager import StateManager
+
+# 結果格式版本（欄位改變時遞增）
+RESULT_VERSION = 1
+
+# 測試資料的用字（ASCII 程式碼與 big5、gbk 都能編碼的中文）
+WORDS = ("value", "result", "config", "buffer", "index", "return", "import", "class",
+         "self", "data", "file", "path", "None", "True", "error", "count")
+CHINESE = ("檔案", "內容", "設定", "測試", "資料", "處理", "讀取", "編碼", "目錄", "結果")
+
+
+def make_lines(rng: random.Random, count: int, chinese: bool = False) -> str:
+    """
+    產生類似程式碼的文字
+    
+    Args:
+        rng (random.Random): 亂數產生器
+        count (int): 行數
+        chinese (bool): 是否在註解中加入中文
+        
+    Returns:
+        str: 文字內容
+    """
+    lines = []
+    for number in range(count):
+        words = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 8)))
+        indent = "    " * rng.randint(0, 3)
+        if chinese:
+            comment = "".join(rng.choice(CHINESE) for _ in range(rng.randint(1, 4)))
+            lines.append(f"{indent}{words} = {number}  # {comment}")
+        else:
+            lines.append(f"{indent}{words} = {number}")
+    return "\n".join(lines) + "\n"
+
+
+def write_corpora(directory: str, scale: float, seed: int) -> dict:
+    """
+    產生測試資料
+    
+    Args:
+        directory (str): 輸出目錄
+        scale (float): 資料量倍數
+        seed (int): 亂數種子
+        
+    Returns:
+        dict: 資料名稱 -> 檔案路徑列表（依產生順序）
+    """
+    rng = random.Random(seed)
+    corpora = {}
+    
+    # 大量小檔案
+    small_dir = os.path.join(directory, "small")
+    os.makedirs(small_dir)
+    corpora['small'] = []
+    for i in range(max(1, int(2000 * scale))):
+        file_path = os.path.join(small_dir, f"module_{i:05d}.py")
+        with open(file_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(make_lines(rng, 40))
+        corpora['small'].append(file_path)
+    
+    # 少數大型檔案（每個約 8 MB）
+    huge_dir = os.path.join(directory, "huge")
+    os.makedirs(huge_dir)
+    corpora['huge'] = []
+    block = make_lines(rng, 2000)
+    repeats = max(1, int(8 * 1024 * 1024 * scale) // len(block))
+    for i in range(3):
+        file_path = os.path.join(huge_dir, f"server_{i}.log")
+        with open(file_path, 'w', encoding='utf-8', newline='') as f:
+            for _ in range(repeats):
+                f.write(block)
+        corpora['huge'].append(file_path)
+    
+    # 混合編碼（含 Windows 換行）
+    mixed_dir = os.path.join(directory, "mixed")
+    os.makedirs(mixed_dir)
+    corpora['mixed'] = []
+    encodings = ('utf-8', 'utf-8-sig', 'big5', 'gbk')
+    for i in range(max(len(encodings), int(400 * scale))):
+        encoding = encodings[i % len(encodings)]
+        file_path = os.path.join(mixed_dir, f"note_{i:04d}_{encoding}.txt")
+        content = make_lines(rng, 60, chinese=True)
+        if i % 3 == 0:
+            content = content.replace("\n", "\r\n")
+        with open(file_path, 'wb') as f:
+            f.write(content.encode(encoding))
+        corpora['mixed'].append(file_path)
+    
+    # 深層目錄（每層一個子目錄與數個檔案）
+    deep_root = os.path.join(directory, "deep")
+    corpora['deep'] = []
+    current = deep_root
+    for depth in range(max(1, int(60 * scale))):
+        current = os.path.join(current, f"level_{depth:02d}")
+        os.makedirs(current)
+        for i in range(5):
+            file_path = os.path.join(current, f"part_{i}.md")
+            with open(file_path, 'w', encoding='utf-8', newline='') as f:
+                f.write(make_lines(rng, 20))
+            corpora['deep'].append(file_path)
+    
+    return corpora
+
+
+def drop_data(file_paths: list) -> str:
+    """
+    產生 tkdnd 拖拽事件的資料格式（{路徑1} {路徑2} ...）
+    
+    Args:
+        file_paths (list): 檔案路徑
+        
+    Returns:
+        str: 拖拽資料
+    """
+    return " ".join("{" + file_path + "}" for file_path in file_paths)
+
+
+def load_handler(file_paths: list) -> FileHandler:
+    """
+    建立載入指定檔案的檔案處理器（不寫入狀態檔案）
+    
+    Args:
+        file_paths (list): 檔案路徑
+        
+    Returns:
+        FileHandler: 檔案處理器
+    """
+    handler = FileHandler(load_state=False)
+    for file_path in file_paths:
+        handler.add_file(file_path)
+    handler.state_manager.cancel_pending()
+    return handler
+
+
+def run_benchmark(run, setup=None, repeat: int = 5) -> dict:
+    """
+    重複執行並記錄時間，再以 tracemalloc 另外執行一次記錄記憶體高峰
+    （追蹤會拖慢執行，因此不計入時間）
+    
+    Args:
+        run (Callable): 受測函數，參數為 setup 的回傳值
+        setup (Optional[Callable]): 每次執行前的準備（不計時）
+        repeat (int): 計時次數
+        
+    Returns:
+        dict: {'runs', 'min_ms', 'median_ms', 'mean_ms', 'peak_alloc_bytes'}
+    """
+    times = []
+    for _ in range(max(1, repeat)):
+        state = setup() if setup else None
+        gc.collect()
+        started = time.perf_counter()
+        run(state)
+        times.append(time.perf_counter() - started)
+        del state
+    
+    state = setup() if setup else None
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run(state)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del state
+    
+    return {
+        'runs': len(times),
+        'min_ms': round(min(times) * 1000, 3),
+        'median_ms': round(statistics.median(times) * 1000, 3),
+        'mean_ms': round(statistics.mean(times) * 1000, 3),
+        'peak_alloc_bytes': peak
+    }
+
+
+def run_all(directory: str, corpora: dict, repeat: int, only=None) -> dict:
+    """
+    執行所有測試
+    
+    Args:
+        directory (str): 工作目錄（匯出檔案寫入此處）
+        corpora (dict): 資料名稱 -> 檔案路徑列表
+        repeat (int): 每項的計時次數
+        only (Optional[list]): 只執行名稱以這些字串開頭的測試
+        
+    Returns:
+        dict: 測試名稱 -> 結果
+    """
+    results = {}
+    
+    def bench(name, run, setup=None):
+        if only and not any(name.startswith(prefix) for prefix in only):
+            return
+        print(f"{name} ...", file=sys.stderr)
+        results[name] = run_benchmark(run, setup, repeat)
+    
+    export_path = os.path.join(directory, "export.txt")
+    state_manager = StateManager()
+    
+    for corpus, file_paths in corpora.items():
+        data = drop_data(file_paths)
+        bench(f"drop_parse.{corpus}", lambda _, data=data: parse_drop_files(data))
+        bench(f"batch_add.{corpus}", lambda _, file_paths=file_paths: load_handler(file_paths))
+        
+        handler = load_handler(file_paths)
+        extra = file_paths[-1]
+        
+        def add_one_setup(handler=handler, extra=extra):
+            # 移除最後一個檔案，再測量將它加回已有大量檔案的列表
+            if extra in handler.file_list:
+                handler.remove_file(handler.file_list.index(extra))
+                handler.deleted_files.clear()
+            return handler
+        
+        def add_one(state, extra=extra):
+            state.add_file(extra)
+            state.state_manager.cancel_pending()
+        
+        bench(f"add_one.{corpus}", add_one, add_one_setup)
+        bench(f"combine.{corpus}", lambda _, handler=handler: handler.get_combined_content())
+        bench(f"export.{corpus}", lambda _, handler=handler: handler.export_combined_content(export_path))
+        # 同時檢查多檔案的 XML 輸出可被解析（格式錯誤時中止）
+        bench(f"format_xml.{corpus}", lambda _, handler=handler: ElementTree.fromstring(
+            "".join(handler.iter_combined_content(formatter=get_formatter('xml')))))
+        bench(f"state_save.{corpus}",
+              lambda _, file_paths=file_paths: state_manager.save_state(file_paths, file_paths[:10]))
+        bench(f"state_load.{corpus}", lambda _: state_manager.load_state(),
+              lambda file_paths=file_paths: state_manager.save_state(file_paths, file_paths[:10]))
+        del handler
+        
+        # 只測量解碼與換行處理，檔案內容事先讀入
+        raws = []
+        for file_path in file_paths:
+            with open(file_path, 'rb') as f:
+                raws.append(f.read())
+        bench(f"detect_encoding.{corpus}",
+              lambda _, raws=raws: [FileHandler.decode_content(raw) for raw in raws])
+        del raws
+    
+    deep_root = os.path.join(directory, "deep")
+    bench("walk.deep", lambda _: list(expand_paths([deep_root])))
+    
+    return results
+
+
+def describe_corpora(corpora: dict) -> dict:
+    """
+    統計測試資料（檔案數、總位元組數與偵測到的編碼）
+    
+    Args:
+        corpora (dict): 資料名稱 -> 檔案路徑列表
+        
+    Returns:
+        dict: 資料名稱 -> {'files', 'bytes', 'encodings'}
+    """
+    description = {}
+    for corpus, file_paths in corpora.items():
+        encodings = {}
+        total = 0
+        for file_path in file_paths:
+            _, stats = FileHandler.load_file(file_path)
+            encodings[stats['encoding']] = encodings.get(stats['encoding'], 0) + 1
+            total += stats['bytes']
+        description[corpus] = {'files': len(file_paths), 'bytes': total,
+                               'encodings': dict(sorted(encodings.items()))}
+    return description
+
+
+def get_commit() -> str:
+    """
+    取得目前的 git commit（無法取得時返回None）
+    
+    Returns:
+        Optional[str]: commit 雜湊
+    """
+    try:
+        completed = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT_DIR, stdout=subprocess.PIPE,
+                                   stderr=subprocess.DEVNULL, universal_newlines=True)
+    except OSError:
+        return None
+    return completed.stdout.strip() or None
+
+
+def get_max_rss() -> int:
+    """
+    取得行程的記憶體高峰（KB，無法取得時返回None）
+    
+    Returns:
+        Optional[int]: 最大常駐記憶體
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 以位元組為單位，Linux 以 KB 為單位
+    return max_rss // 1024 if sys.platform == 'darwin' else max_rss
+
+
+def compare(results: dict, baseline: dict):
+    """
+    將結果與先前的結果比較，輸出到標準錯誤
+    
+    Args:
+        results (dict): 本次結果
+        baseline (dict): 先前的結果
+    """
+    old_results = baseline.get('results', {})
+    print(f"{'benchmark':<28}{'old ms':>12}{'new ms':>12}{'ratio':>8}{'peak ratio':>12}", file=sys.stderr)
+    for name, result in results['results'].items():
+        old = old_results.get(name)
+        if not old:
+            print(f"{name:<28}{'-':>12}{result['median_ms']:>12.3f}", file=sys.stderr)
+            continue
+        ratio = result['median_ms'] / old['median_ms'] if old['median_ms'] else float('inf')
+        peak = (result['peak_alloc_bytes'] / old['peak_alloc_bytes']
+                if old.get('peak_alloc_bytes') else float('inf'))
+        print(f"{name:<28}{old['median_ms']:>12.3f}{result['median_ms']:>12.3f}{ratio:>8.2f}{peak:>12.2f}",
+              file=sys.stderr)
+
+
+def main() -> int:
+    """核心操作效能測試入口"""
+    parser = argparse.ArgumentParser(description="Benchmark core file operations on synthetic corpora "
+                                                 "without a display.")
+    parser.add_argument('--scale', type=float, default=1.0, help="corpus size multiplier (default: 1.0)")
+    parser.add_argument('--repeat', type=int, default=5, help="timed runs per benchmark (default: 5)")
+    parser.add_argument('--seed', type=int, default=1, help="random seed for the corpora (default: 1)")
+    parser.add_argument('--only', nargs='+', help="run only benchmarks whose names start with these prefixes")
+    parser.add_argument('-o', '--output', help="write the JSON results to this file instead of stdout")
+    parser.add_argument('--baseline', help="compare with an earlier JSON result and print ratios on stderr")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as directory:
+        # 狀態檔案寫入暫存目錄，不影響使用者的狀態
+        tempfile.tempdir = directory
+        print("generating corpora ...", file=sys.stderr)
+        corpora = write_corpora(directory, args.scale, args.seed)
+        results = {
+            'version': RESULT_VERSION,
+            'commit': get_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'scale': args.scale,
+            'repeat': args.repeat,
+            'seed': args.seed,
+            'corpora': describe_corpora(corpora),
+            'results': run_all(directory, corpora, args.repeat, args.only),
+            'max_rss_kb': get_max_rss()
+        }
+        tempfile.tempdir = None
+    
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    
+    if args.baseline:
+        try:
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                compare(results, json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"無法讀取比較基準: {e}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+啟動時間測試
+為空白、100 個檔案與 1000 個檔案的上次狀態各啟動一次主視窗（每次一個新的行程），
+回報第一次繪製（first_paint）與可操作（interactive，拖拽支援與上次狀態皆已載入）的時間。
+需要顯示器（或 Xvfb）
+
+用法:
+    python benchmarks/startup.py [--sizes 0 100 1000] [--repeat 3]
+"""
+
+import time
+
+STARTED = time.perf_counter()
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+# 將專案目錄加入Python路徑
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+# 狀態檔案名稱（與 StateManager 相同）
+STATE_FILE_NAME = "drag_n_paste_state.json"
+
+
+def write_session(directory: str, file_count: int):
+    """
+    產生測試檔案與指向它們的狀態檔案
+    
+    Args:
+        directory (str): 暫存目錄（同時作為子行程的 TMPDIR）
+        file_count (int): 檔案數
+    """
+    file_paths = []
+    files_dir = os.path.join(directory, "files")
+    os.makedirs(files_dir, exist_ok=True)
+    for i in range(file_count):
+        file_path = os.path.join(files_dir, f"module_{i:04d}.py")
+        with open(file_path, 'w', encoding='utf-8') as f:
+            for line in range(40):
+                f.write(f"def function_{i}_{line}(value):\n    return value * {line}  # 測試\n")
+        file_paths.append(file_path)
+    
+    with open(os.path.join(directory, STATE_FILE_NAME), 'w', encoding='utf-8') as f:
+        json.dump({"version": "1.0", "file_paths": file_paths, "deleted_files": [],
+                   "total_files": file_count}, f)
+
+
+def run_child() -> int:
+    """
+    子行程：建立主視窗並執行事件迴圈直到啟動完成，以 JSON 輸出時間（毫秒，從行程啟動起算）
+    
+    Returns:
+        int: 結束代碼
+    """
+    import tkinter as tk
+    try:
+        from gui.main_window import MainWindow
+        app = MainWindow()
+    except tk.TclError as e:
+        print(f"無法建立視窗（需要顯示器）: {e}", file=sys.stderr)
+        return 2
+    
+    while not app.is_ready():
+        app.root.update()
+    
+    times = app.startup_times
+    result = {
+        'first_paint_ms': round((times['first_paint'] - STARTED) * 1000, 1),
+        'interactive_ms': round((times['interactive'] - STARTED) * 1000, 1),
+        'files': len(app.file_handler.file_list)
+    }
+    app._on_closing()
+    print(json.dumps(result))
+    return 0
+
+
+def measure(file_count: int) -> dict:
+    """
+    在新的行程中測量一次啟動時間
+    
+    Args:
+        file_count (int): 上次狀態中的檔案數
+        
+    Returns:
+        dict: 子行程回報的時間，加上整個行程的時間 process_ms
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        write_session(directory, file_count)
+        env = dict(os.environ, TMPDIR=directory, TEMP=directory, TMP=directory)
+        started = time.perf_counter()
+        completed = subprocess.run([sys.executable, os.path.abspath(__file__), '--child'],
+                                   env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                   universal_newlines=True)
+        elapsed = time.perf_counter() - started
+    
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip() or f"exit code {completed.returncode}")
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result['process_ms'] = round(elapsed * 1000, 1)
+    return result
+
+
+def main() -> int:
+    """啟動時間測試入口"""
+    parser = argparse.ArgumentParser(description="Measure GUI time-to-first-paint and time-to-interactive.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[0, 100, 1000],
+                        help="number of files in the restored session (default: 0 100 1000)")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per size, the fastest is reported")
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.child:
+        return run_child()
+    
+    results = []
+    for file_count in args.sizes:
+        try:
+            runs = [measure(file_count) for _ in range(max(1, args.repeat))]
+        except RuntimeError as e:
+            print(f"測量失敗: {e}", file=sys.stderr)
+            return 1
+        best = min(runs, key=lambda run: run['interactive_ms'])
+        best['session_files'] = file_count
+        results.append(best)
+        print(f"{file_count:>5} files: first paint {best['first_paint_ms']:.1f} ms, "
+              f"interactive {best['interactive_ms']:.1f} ms", file=sys.stderr)
+    
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+# CLI module for headless commands 
\ No newline at end of file
@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+"""
+常駐服務的命令列客戶端
+只載入標準函式庫的少數模組，將請求透過 Unix socket 交給 'main.py daemon'
+處理；服務未啟動時 combine 改為在本行程中執行
+
+用法:
+    python main.py client combine [路徑|萬用字元|-] ... [-o 輸出檔案] [--format 格式] [--reduce]
+    python main.py client tokens [路徑|萬用字元|-] ... [--estimator 名稱]
+    python main.py client status
+    python main.py client stop
+    
+協定:
+    請求為一行 JSON；回應為一行 JSON 標頭，之後直到連線關閉為 UTF-8 的輸出內容
+"""
+
+import argparse
+import json
+import os
+import socket
+import stat
+import struct
+import sys
+import tempfile
+import time
+from typing import List, Optional
+from utils.constants import DAEMON_SOCKET_DIR, DAEMON_SOCKET_NAME
+
+# 服務未回應時的等待上限（秒）
+CONNECT_TIMEOUT = 2.0
+
+
+def default_socket_path() -> str:
+    """
+    取得預設的 socket 路徑：放在 XDG_RUNTIME_DIR，沒有時放在暫存目錄下
+    每個使用者一個、只有本人可存取（0700）的目錄，其他使用者無法搶先建立或冒充
+    
+    Returns:
+        str: socket 路徑
+        
+    Raises:
+        PermissionError: 暫存目錄下的目錄屬於其他使用者或權限過寬
+    """
+    user = os.getuid() if hasattr(os, 'getuid') else os.environ.get('USERNAME', 'user')
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir and _is_private_dir(runtime_dir):
+        directory = runtime_dir
+    else:
+        directory = os.path.join(tempfile.gettempdir(), DAEMON_SOCKET_DIR.format(user))
+        try:
+            os.mkdir(directory, 0o700)
+        except FileExistsError:
+            pass
+        if not _is_private_dir(directory):
+            raise PermissionError(f"unsafe socket directory (not a private directory owned by you): {directory}")
+    return os.path.join(directory, DAEMON_SOCKET_NAME.format(user))
+
+
+def verify_peer(sock: socket.socket, socket_path: Optional[str] = None):
+    """
+    確認 socket 另一端的行程屬於同一個使用者（Linux 使用 SO_PEERCRED，
+    其他平台改為檢查 socket 檔案的擁有者）
+    
+    Args:
+        sock (socket.socket): 已連線的 socket
+        socket_path (Optional[str]): socket 路徑（無法取得對方身分時檢查其擁有者）
+        
+    Raises:
+        PermissionError: 對方屬於其他使用者
+    """
+    if not hasattr(os, 'getuid'):
+        return
+    if hasattr(socket, 'SO_PEERCRED'):
+        credentials = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i'))
+        _, uid, _ = struct.unpack('3i', credentials)
+    elif socket_path:
+        uid = os.stat(socket_path).st_uid
+    else:
+        return
+    if uid != os.getuid():
+        raise PermissionError(f"socket peer belongs to another user (uid {uid})")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    建立命令列參數解析器
+    
+    Returns:
+        argparse.ArgumentParser: 參數解析器
+    """
+    parser = argparse.ArgumentParser(
+        prog="main.py client",
+        description="Send requests to a running 'main.py daemon' (warm file cache)."
+    )
+    parser.add_argument('--socket', default=None, help="socket path (default: per-user socket in the temp dir)")
+    parser.add_argument('--timing', action='store_true', help="report total time on stderr")
+    commands = parser.add_subparsers(dest='command')
+    
+    combine = commands.add_parser('combine', help="combine files (write to stdout or -o)")
+    combine.add_argument('paths', nargs='*', default=['-'],
+                         help="files, directories or glob patterns; '-' reads paths from stdin")
+    combine.add_argument('-o', '--output', help="have the daemon write this file instead of stdout")
+    combine.add_argument('-f', '--format', default='plain', help="output format (default: plain)")
+    combine.add_argument('--reduce', action='store_true', help="apply content reduction")
+    
+    tokens = commands.add_parser('tokens', help="count tokens per file and in total")
+    tokens.add_argument('paths', nargs='*', default=['-'],
+                        help="files, directories or glob patterns; '-' reads paths from stdin")
+    tokens.add_argument('--estimator', default=None, help="token estimator name")
+    
+    commands.add_parser('status', help="show daemon status")
+    commands.add_parser('stop', help="stop the daemon")
+    return parser
+
+
+def request(socket_path: str, payload: dict):
+    """
+    送出請求並讀取回應
+    
+    Args:
+        socket_path (str): socket 路徑
+        payload (dict): 請求內容
+        
+    Returns:
+        Tuple[dict, bytes]: (回應標頭, 輸出內容)
+        
+    Raises:
+        OSError: 無法連線或連線中斷
+    """
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.settimeout(CONNECT_TIMEOUT)
+        client.connect(socket_path)
+        verify_peer(client, socket_path)
+        client.settimeout(None)
+        client.sendall(json.dumps(payload).encode('utf-8') + b'\n')
+        client.shutdown(socket.SHUT_WR)
+        
+        chunks = []
+        while True:
+            chunk = client.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    finally:
+        client.close()
+    
+    data = b''.join(chunks)
+    header, _, body = data.partition(b'\n')
+    if not header:
+        raise ConnectionError("empty response from daemon")
+    return json.loads(header.decode('utf-8')), body
+
+
+def main(argv: Optional[List[str]] = None, started: Optional[float] = None) -> int:
+    """
+    客戶端入口
+    
+    Args:
+        argv (Optional[List[str]]): 參數（不含 'client'），預設為 sys.argv[2:]
+        started (Optional[float]): 程式啟動時間（time.perf_counter）
+        
+    Returns:
+        int: 結束代碼（0 成功，1 沒有任何檔案被輸出，2 參數或輸出錯誤，3 服務未啟動）
+    """
+    started = time.perf_counter() if started is None else started
+    parser = build_parser()
+    args = parser.parse_args(sys.argv[2:] if argv is None else argv)
+    if not args.command:
+        parser.print_usage(sys.stderr)
+        return 2
+    if not hasattr(socket, 'AF_UNIX'):
+        print("the daemon requires Unix domain sockets", file=sys.stderr)
+        return 3
+    
+    payload = {'command': args.command, 'cwd': os.getcwd()}
+    if args.command in ('combine', 'tokens'):
+        payload['paths'] = _read_stdin_paths(args.paths)
+    if args.command == 'combine':
+        payload.update(format=args.format, reduce=args.reduce)
+        if args.output:
+            payload.update(command='export', output=os.path.abspath(args.output))
+    elif args.command == 'tokens':
+        payload['estimator'] = args.estimator
+    
+    try:
+        header, body = request(args.socket or default_socket_path(), payload)
+    except (OSError, ValueError) as e:
+        if args.command != 'combine':
+            print(f"daemon not available ({e}); start it with: python main.py daemon", file=sys.stderr)
+            return 3
+        # 服務未啟動時直接在本行程中合併
+        from cli.combine import main as combine_main
+        argv = payload['paths'] + ['--format', args.format]
+        argv += ['--reduce'] if args.reduce else []
+        argv += ['-o', args.output] if args.output else []
+        return combine_main(argv, started)
+    
+    result = _print_response(args.command, header, body)
+    if args.timing:
+        print(f"total: {(time.perf_counter() - started) * 1000:.1f} ms", file=sys.stderr)
+    return result
+
+
+def _is_private_dir(directory: str) -> bool:
+    """
+    目錄是否屬於目前的使用者且其他人無法存取
+    
+    Args:
+        directory (str): 目錄路徑
+        
+    Returns:
+        bool: 是私人目錄時為True
+    """
+    try:
+        info = os.lstat(directory)
+    except OSError:
+        return False
+    if not stat.S_ISDIR(info.st_mode):
+        return False
+    if not hasattr(os, 'getuid'):
+        return True
+    return info.st_uid == os.getuid() and not info.st_mode & 0o077
+
+
+def _read_stdin_paths(arguments: List[str]) -> List[str]:
+    """
+    將 '-' 替換為從標準輸入讀取的路徑（服務無法讀取客戶端的標準輸入）
+    
+    Args:
+        arguments (List[str]): 命令列路徑參數
+        
+    Returns:
+        List[str]: 路徑參數
+    """
+    paths = []
+    for argument in arguments:
+        if argument != '-':
+            paths.append(argument)
+            continue
+        for line in sys.stdin:
+            line = line.strip().strip('"\'')
+            if line:
+                paths.append(line)
+    return paths
+
+
+def _print_response(command: str, header: dict, body: bytes) -> int:
+    """
+    輸出服務的回應
+    
+    Args:
+        command (str): 請求的命令
+        header (dict): 回應標頭
+        body (bytes): 輸出內容
+        
+    Returns:
+        int: 結束代碼
+    """
+    if header.get('errors'):
+        sys.stderr.write(header['errors'])
+    if not header.get('ok'):
+        print(header.get('message', 'request failed'), file=sys.stderr)
+        return 2
+    
+    if command == 'combine':
+        try:
+            sys.stdout.buffer.write(body)
+            sys.stdout.flush()
+        except BrokenPipeError:
+            pass
+    elif command == 'tokens':
+        for file_path, tokens in header['counts']:
+            print(f"{tokens}\t{file_path}")
+        print(f"{header['total']}\ttotal ({header['estimator']})")
+    elif command in ('status', 'stop'):
+        print(json.dumps({key: value for key, value in header.items() if key != 'ok'}, indent=2))
+    
+    if command in ('combine', 'tokens') and not header.get('files'):
+        return 1
+    return 0
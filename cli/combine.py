@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+命令列合併模式
+不載入任何 GUI 模組（tkinter、tkinterdnd2、pyperclip），以與 GUI 相同的
+檔案驗證、編碼偵測與合併格式，將檔案以串流方式輸出到標準輸出或檔案
+
+用法:
+    python main.py combine [路徑|萬用字元|-] ... [-o 輸出檔案] [--format 格式] [--reduce]
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+from typing import Iterable, Iterator, List, Optional, Tuple
+from core.archive_reader import list_members, path_exists, real_path
+from core.content_reducer import ContentReducer
+from core.file_handler import FileHandler
+from core.file_validator import FileValidator
+from core.output_formatters import get_format_names, get_formatter
+
+# 萬用字元（含有這些字元的參數以 glob 展開）
+GLOB_CHARS = set('*?[')
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    建立命令列參數解析器
+    
+    Returns:
+        argparse.ArgumentParser: 參數解析器
+    """
+    parser = argparse.ArgumentParser(
+        prog="main.py combine",
+        description="Combine text files into one output without starting the GUI."
+    )
+    parser.add_argument('paths', nargs='*', default=['-'],
+                        help="files, directories or glob patterns; '-' reads one path per line "
+                             "from stdin (default when no paths are given)")
+    parser.add_argument('-o', '--output', help="write to this file instead of stdout")
+    parser.add_argument('-f', '--format', choices=get_format_names(), default='plain',
+                        help="output format (default: plain)")
+    parser.add_argument('--reduce', action='store_true',
+                        help="strip comments, blank-line runs and repeated log lines")
+    parser.add_argument('--timing', action='store_true',
+                        help="report startup and total time on stderr")
+    return parser
+
+
+def expand_paths(arguments: Iterable[str], stdin=None) -> Iterator[str]:
+    """
+    將參數展開為檔案路徑（依參數順序，重複的路徑只保留第一個）
+    
+    Args:
+        arguments (Iterable[str]): 路徑、目錄、萬用字元或 '-'
+        stdin: 讀取路徑列表的來源，預設為標準輸入
+        
+    Returns:
+        Iterator[str]: 檔案路徑
+    """
+    seen = set()
+    for argument in arguments:
+        if argument == '-':
+            candidates = _read_path_list(stdin or sys.stdin)
+        elif GLOB_CHARS & set(argument):
+            candidates = sorted(glob.glob(argument, recursive=True))
+        else:
+            candidates = [argument]
+        
+        for candidate in candidates:
+            for file_path in _walk(candidate):
+                file_path = os.path.abspath(file_path)
+                if file_path not in seen:
+                    seen.add(file_path)
+                    yield file_path
+
+
+def skip_reason(file_path: str) -> Optional[str]:
+    """
+    取得檔案無法輸出的原因（不存在、無法讀取與不支援的類型分開回報）
+    
+    Args:
+        file_path (str): 檔案路徑（壓縮檔成員檢查其壓縮檔）
+        
+    Returns:
+        Optional[str]: 原因，可以輸出時為None
+    """
+    if not path_exists(file_path):
+        return "not a regular file" if os.path.exists(real_path(file_path)) else "no such file"
+    if not os.access(real_path(file_path), os.R_OK):
+        return "permission denied"
+    if not FileValidator.is_text_file(file_path):
+        return "not a supported text file"
+    return None
+
+
+def iter_entries(file_paths: Iterable[str], errors=None, load=None) -> Iterator[Tuple[str, str]]:
+    """
+    依序讀取檔案（一次只保留一個檔案的內容），略過不支援或無法讀取的檔案
+    
+    Args:
+        file_paths (Iterable[str]): 檔案路徑
+        errors: 錯誤訊息的輸出，預設為標準錯誤
+        load: 讀取函數（返回 (內容, 統計)），預設為 FileHandler.load_file
+        
+    Returns:
+        Iterator[Tuple[str, str]]: (檔案路徑, 檔案內容)
+    """
+    errors = errors or sys.stderr
+    load = load or FileHandler.load_file
+    for file_path in file_paths:
+        reason = skip_reason(file_path)
+        if reason is not None:
+            print(f"skipped ({reason}): {file_path}", file=errors)
+            continue
+        try:
+            content, _ = load(file_path)
+        except Exception as e:
+            print(f"skipped (read failed: {e}): {file_path}", file=errors)
+            continue
+        yield file_path, content
+
+
+def main(argv: Optional[List[str]] = None, started: Optional[float] = None) -> int:
+    """
+    命令列合併模式入口
+    
+    Args:
+        argv (Optional[List[str]]): 參數（不含 'combine'），預設為 sys.argv[2:]
+        started (Optional[float]): 程式啟動時間（time.perf_counter），用於回報啟動時間
+        
+    Returns:
+        int: 結束代碼（0 成功，1 沒有任何檔案被輸出，2 參數或輸出錯誤）
+    """
+    started = time.perf_counter() if started is None else started
+    args = build_parser().parse_args(sys.argv[2:] if argv is None else argv)
+    ready = time.perf_counter()
+    
+    formatter = get_formatter(args.format)
+    reducer = ContentReducer() if args.reduce else None
+    entries = iter_entries(expand_paths(args.paths))
+    if reducer is not None:
+        # 逐一精簡，維持一次只處理一個檔案
+        entries = (reducer.reduce_entries([entry])[0] for entry in entries)
+    
+    counted = []
+    
+    def counting(source):
+        for entry in source:
+            counted.append(entry[0])
+            yield entry
+    
+    try:
+        if args.output:
+            output = open(args.output, 'w', encoding='utf-8', newline='')
+        else:
+            output = open(sys.stdout.fileno(), 'w', encoding='utf-8', newline='', closefd=False)
+    except OSError as e:
+        print(f"cannot open output: {e}", file=sys.stderr)
+        return 2
+    
+    try:
+        with output:
+            for chunk in formatter.iter_format(counting(entries)):
+                output.write(chunk)
+    except BrokenPipeError:
+        # 例如輸出接到 head：不視為錯誤
+        pass
+    except OSError as e:
+        print(f"write failed: {e}", file=sys.stderr)
+        return 2
+    
+    if args.timing:
+        finished = time.perf_counter()
+        print(f"startup: {(ready - started) * 1000:.1f} ms, total: {(finished - started) * 1000:.1f} ms, "
+              f"files: {len(counted)}", file=sys.stderr)
+    return 0 if counted else 1
+
+
+def _read_path_list(stream) -> Iterator[str]:
+    """
+    從文字串流讀取路徑列表（每行一個，忽略空行與前後引號）
+    
+    Args:
+        stream: 文字串流
+        
+    Returns:
+        Iterator[str]: 路徑
+    """
+    for line in stream:
+        line = line.strip().strip('"\'')
+        if line:
+            yield line
+
+
+def _walk(path: str) -> Iterator[str]:
+    """
+    目錄展開為其下支援的文字檔案（依名稱排序，略過隱藏目錄），壓縮檔展開為其中
+    文字檔的虛擬路徑，其他路徑原樣返回
+    
+    Args:
+        path (str): 路徑
+        
+    Returns:
+        Iterator[str]: 檔案路徑
+    """
+    if FileValidator.is_archive_file(path):
+        try:
+            yield from list_members(os.path.abspath(path))
+        except Exception as e:
+            print(f"skipped (cannot open archive: {e}): {path}", file=sys.stderr)
+        return
+    if not os.path.isdir(path):
+        yield path
+        return
+    for root, dirs, files in os.walk(path):
+        dirs[:] = sorted(name for name in dirs if not name.startswith('.'))
+        for name in sorted(files):
+            file_path = os.path.join(root, name)
+            if FileValidator.is_text_file(file_path):
+                yield file_path
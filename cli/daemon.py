@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+"""
+常駐合併服務
+在 Unix socket 上處理 combine、export 與 token 計數請求。檔案內容保留在
+ContentCache 中，以 stat 判斷變更，重複合併大致不變的檔案時不需重新讀取與解碼
+
+用法:
+    python main.py daemon [--socket 路徑]
+"""
+
+import argparse
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+from cli.client import default_socket_path, verify_peer
+from cli.combine import expand_paths, iter_entries
+from core.content_cache import ContentCache
+from core.content_reducer import ContentReducer
+from core.output_formatters import get_format_names, get_formatter
+from core.token_estimator import create_estimator
+from utils.constants import DAEMON_TOKEN_CACHE_SIZE
+
+
+class CombineDaemon:
+    """常駐合併服務 - 處理請求並保留內容快取（請求可在多個執行緒中同時處理）"""
+    
+    def __init__(self, socket_path: str):
+        """
+        Args:
+            socket_path (str): socket 路徑
+        """
+        self.socket_path = socket_path
+        self.cache = ContentCache()
+        self.reducer = None  # 第一次需要時才建立
+        self.started = time.time()
+        self.requests = 0
+        self._estimators = {}  # 估計器名稱（None 為預設）-> 估計器
+        self._tokens = OrderedDict()  # (檔案路徑, 估計器名稱) -> (stat 簽章, token 數)，最多 DAEMON_TOKEN_CACHE_SIZE 筆
+        self._lock = threading.Lock()
+        self._server = None
+    
+    def handle(self, payload: dict) -> Tuple[dict, str]:
+        """
+        處理一個請求
+        
+        Args:
+            payload (dict): 請求內容（command、cwd 與各命令的參數）
+            
+        Returns:
+            Tuple[dict, str]: (回應標頭, 輸出內容)
+        """
+        with self._lock:
+            self.requests += 1
+        command = payload.get('command')
+        handler = {
+            'combine': self._combine,
+            'export': self._combine,
+            'tokens': self._count_tokens,
+            'status': self._status,
+            'stop': self._stop
+        }.get(command)
+        if handler is None:
+            return {'ok': False, 'message': f"unknown command: {command}"}, ""
+        return handler(payload)
+    
+    def serve_forever(self) -> int:
+        """
+        啟動服務直到收到 stop 請求或中斷
+        
+        Returns:
+            int: 結束代碼
+        """
+        try:
+            claimed = self._claim_socket()
+        except OSError as e:
+            print(f"cannot use socket {self.socket_path}: {e}", file=sys.stderr)
+            return 2
+        if not claimed:
+            print(f"daemon already running: {self.socket_path}", file=sys.stderr)
+            return 1
+        
+        daemon = self
+        
+        class RequestHandler(socketserver.StreamRequestHandler):
+            def handle(self):
+                stop = False
+                try:
+                    # 只接受同一個使用者的請求
+                    verify_peer(self.request)
+                    payload = json.loads(self.rfile.readline().decode('utf-8'))
+                    header, body = daemon.handle(payload)
+                    stop = payload.get('command') == 'stop' and header.get('ok')
+                except Exception as e:
+                    header, body = {'ok': False, 'message': f"request failed: {e}"}, ""
+                try:
+                    self.wfile.write(json.dumps(header).encode('utf-8') + b'\n')
+                    self.wfile.write(body.encode('utf-8', 'surrogatepass'))
+                    self.wfile.flush()
+                except OSError:
+                    pass  # 客戶端已中斷
+                if stop:
+                    # 回應送出後才停止（shutdown 會等待 serve_forever 結束，此處不是其執行緒）
+                    self.server.shutdown()
+        
+        class Server(socketserver.ThreadingUnixStreamServer):
+            daemon_threads = True
+        
+        # 以 umask 讓 socket 一建立就只有本人可存取，不留下 bind 之後才 chmod 的空檔
+        old_umask = os.umask(0o177)
+        try:
+            self._server = Server(self.socket_path, RequestHandler)
+        finally:
+            os.umask(old_umask)
+        try:
+            print(f"listening on {self.socket_path}", file=sys.stderr)
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._server.server_close()
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+            if self.reducer is not None:
+                self.reducer.close()
+        return 0
+    
+    def _claim_socket(self) -> bool:
+        """
+        確認沒有其他服務使用同一個 socket，並移除前一次留下的 socket 檔案
+        （只移除自己的檔案；其他使用者的 socket 不視為執行中的服務）
+        
+        Returns:
+            bool: 可以使用時為True，自己的服務已在執行時為False
+            
+        Raises:
+            PermissionError: socket 屬於其他使用者
+        """
+        try:
+            info = os.lstat(self.socket_path)
+        except FileNotFoundError:
+            return True
+        if hasattr(os, 'getuid') and info.st_uid != os.getuid():
+            raise PermissionError("socket belongs to another user")
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+        except OSError:
+            os.unlink(self.socket_path)
+            return True
+        try:
+            verify_peer(probe, self.socket_path)
+        finally:
+            probe.close()
+        return False
+    
+    def _resolve_paths(self, payload: dict) -> List[str]:
+        """
+        以客戶端的工作目錄展開路徑參數
+        
+        Args:
+            payload (dict): 請求內容
+            
+        Returns:
+            List[str]: 檔案路徑
+        """
+        cwd = payload.get('cwd') or os.getcwd()
+        arguments = [os.path.join(cwd, os.path.expanduser(path)) for path in payload.get('paths', [])]
+        return list(expand_paths(arguments))
+    
+    def _combine(self, payload: dict) -> Tuple[dict, str]:
+        """合併檔案（combine 返回輸出內容，export 寫入 output 檔案）"""
+        format_name = payload.get('format', 'plain')
+        if format_name not in get_format_names():
+            return {'ok': False, 'message': f"unknown format: {format_name}"}, ""
+        
+        errors = io.StringIO()
+        entries = list(iter_entries(self._resolve_paths(payload), errors, self.cache.get))
+        if payload.get('reduce'):
+            with self._lock:
+                if self.reducer is None:
+                    self.reducer = ContentReducer()
+            entries = self.reducer.reduce_entries(entries)
+        output = "".join(get_formatter(format_name).iter_format(entries))
+        
+        header = {'ok': True, 'files': len(entries), 'errors': errors.getvalue()}
+        if payload['command'] != 'export':
+            return header, output
+        
+        try:
+            with open(payload['output'], 'w', encoding='utf-8', newline='') as f:
+                f.write(output)
+        except (KeyError, OSError) as e:
+            return {'ok': False, 'message': f"write failed: {e}", 'errors': header['errors']}, ""
+        return header, ""
+    
+    def _count_tokens(self, payload: dict) -> Tuple[dict, str]:
+        """計算每個檔案與總共的 token 數（依 stat 簽章快取）"""
+        name = payload.get('estimator')
+        with self._lock:
+            estimator = self._estimators.get(name)
+            if estimator is None:
+                estimator = self._estimators[name] = create_estimator(name)
+        
+        errors = io.StringIO()
+        counts = []
+        for file_path, content in iter_entries(self._resolve_paths(payload), errors, self.cache.get):
+            key = (file_path, estimator.name)
+            signature = self.cache.get_signature(file_path)
+            with self._lock:
+                cached = self._tokens.get(key)
+                if cached is not None:
+                    self._tokens.move_to_end(key)
+            if cached is not None and signature is not None and cached[0] == signature:
+                tokens = cached[1]
+            else:
+                tokens = estimator.count(content)
+                with self._lock:
+                    self._tokens[key] = (signature, tokens)
+                    self._tokens.move_to_end(key)
+                    while len(self._tokens) > DAEMON_TOKEN_CACHE_SIZE:
+                        self._tokens.popitem(last=False)
+            counts.append((file_path, tokens))
+        
+        return {'ok': True, 'files': len(counts), 'counts': counts, 'estimator': estimator.name,
+                'total': sum(tokens for _, tokens in counts), 'errors': errors.getvalue()}, ""
+    
+    def _status(self, payload: dict) -> Tuple[dict, str]:
+        """服務狀態"""
+        return {'ok': True, 'pid': os.getpid(), 'socket': self.socket_path,
+                'uptime': round(time.time() - self.started, 1), 'requests': self.requests,
+                'cached_files': len(self.cache), 'cache_hits': self.cache.hits,
+                'cache_misses': self.cache.misses}, ""
+    
+    def _stop(self, payload: dict) -> Tuple[dict, str]:
+        """停止服務（由請求處理在回應送出後關閉伺服器）"""
+        return self._status(payload)
+
+
+def main(argv: Optional[List[str]] = None, started: Optional[float] = None) -> int:
+    """
+    常駐服務入口
+    
+    Args:
+        argv (Optional[List[str]]): 參數（不含 'daemon'），預設為 sys.argv[2:]
+        started (Optional[float]): 程式啟動時間（未使用，與其他命令一致）
+        
+    Returns:
+        int: 結束代碼
+    """
+    parser = argparse.ArgumentParser(
+        prog="main.py daemon",
+        description="Keep file contents cached and serve 'main.py client' requests over a Unix socket."
+    )
+    parser.add_argument('--socket', default=None, help="socket path (default: per-user socket in the temp dir)")
+    args = parser.parse_args(sys.argv[2:] if argv is None else argv)
+    
+    if not hasattr(socketserver, 'ThreadingUnixStreamServer'):
+        print("the daemon requires Unix domain sockets", file=sys.stderr)
+        return 2
+    try:
+        socket_path = args.socket or default_socket_path()
+    except OSError as e:
+        print(f"cannot create socket directory: {e}", file=sys.stderr)
+        return 2
+    return CombineDaemon(socket_path).serve_forever()
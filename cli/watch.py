@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+命令列監看模式
+合併一組檔案到輸出檔案，之後監看這些檔案，變更時只重新讀取變更的檔案，
+並只改寫輸出檔案中受影響的部分
+
+用法:
+    python main.py watch [路徑|萬用字元|-] ... -o 輸出檔案 [--format 格式] [--reduce] [--polling]
+"""
+
+import argparse
+import sys
+import time
+from typing import List, Optional
+from cli.combine import expand_paths, skip_reason
+from core.content_reducer import ContentReducer
+from core.file_watcher import FileWatcher
+from core.output_formatters import get_format_names, get_formatter
+from core.segmented_output import SegmentedOutput
+from utils.constants import WATCH_DEBOUNCE
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    建立命令列參數解析器
+    
+    Returns:
+        argparse.ArgumentParser: 參數解析器
+    """
+    parser = argparse.ArgumentParser(
+        prog="main.py watch",
+        description="Combine files into an output file and keep it up to date as they change."
+    )
+    parser.add_argument('paths', nargs='*', default=['-'],
+                        help="files, directories or glob patterns; '-' reads one path per line "
+                             "from stdin (default when no paths are given)")
+    parser.add_argument('-o', '--output', required=True, help="output file to keep up to date")
+    parser.add_argument('-f', '--format', choices=get_format_names(), default='plain',
+                        help="output format (default: plain)")
+    parser.add_argument('--reduce', action='store_true',
+                        help="strip comments, blank-line runs and repeated log lines")
+    parser.add_argument('--polling', action='store_true', help="use stat polling instead of inotify")
+    parser.add_argument('--debounce', type=float, default=WATCH_DEBOUNCE,
+                        help=f"seconds of quiet before rewriting (default: {WATCH_DEBOUNCE})")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None, started: Optional[float] = None) -> int:
+    """
+    命令列監看模式入口（直到 Ctrl+C 才結束）
+    
+    Args:
+        argv (Optional[List[str]]): 參數（不含 'watch'），預設為 sys.argv[2:]
+        started (Optional[float]): 程式啟動時間（未使用，與其他命令一致）
+        
+    Returns:
+        int: 結束代碼（0 正常結束，1 沒有任何檔案，2 輸出錯誤）
+    """
+    args = build_parser().parse_args(sys.argv[2:] if argv is None else argv)
+    
+    file_paths = []
+    for file_path in expand_paths(args.paths):
+        reason = skip_reason(file_path)
+        if reason is None:
+            file_paths.append(file_path)
+        else:
+            print(f"skipped ({reason}): {file_path}", file=sys.stderr)
+    if not file_paths:
+        print("no files to watch", file=sys.stderr)
+        return 1
+    
+    reducer = ContentReducer() if args.reduce else None
+    output = SegmentedOutput(args.output, get_formatter(args.format), reducer, errors=sys.stderr)
+    try:
+        written = output.build(file_paths)
+    except OSError as e:
+        print(f"cannot write output: {e}", file=sys.stderr)
+        return 2
+    
+    watcher = FileWatcher(debounce=args.debounce, use_inotify=not args.polling)
+    watcher.set_paths(file_paths)
+    print(f"watching {len(file_paths)} files ({watcher.backend}), wrote {written} bytes to {args.output}",
+          file=sys.stderr)
+    
+    try:
+        while True:
+            time.sleep(min(watcher.interval, args.debounce) / 2)
+            changed = watcher.poll()
+            if not changed:
+                continue
+            try:
+                updated, written = output.update(changed)
+            except OSError as e:
+                print(f"write failed: {e}", file=sys.stderr)
+                continue
+            if updated:
+                print(f"{time.strftime('%H:%M:%S')} updated {updated} files, rewrote {written} bytes",
+                      file=sys.stderr)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        if reducer is not None:
+            reducer.close()
+    return 0
@@ -0,0 +1,353 @@
+# -*- coding: utf-8 -*-
+"""
+壓縮檔讀取
+將 .zip 與 .tar（含 .gz、.bz2、.xz）中的文字檔成員視為虛擬檔案，路徑格式為
+「壓縮檔路徑!/成員名稱」（例如 bundle.zip!/logs/app.log）。成員直接從壓縮檔
+串流讀取，不會解壓縮到暫存目錄；壓縮過的 tar 在開啟時整個解壓縮一次並保留
+（過大時存於匿名暫存檔），讀取任意順序的成員都不需從頭重新解壓縮。
+zipfile 與 tarfile 在第一次需要時才匯入
+"""
+
+import importlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Iterator, List, Optional, Tuple
+from utils.constants import (ARCHIVE_HANDLE_CACHE, ARCHIVE_MAX_MEMBER_SIZE, ARCHIVE_SEPARATOR,
+                             ARCHIVE_SPOOL_MAX_SIZE, ARCHIVE_SPOOL_MEMORY, SUPPORTED_TEXT_EXTENSIONS)
+
+
+# 支援的壓縮檔副檔名
+ZIP_EXTENSIONS = ('.zip',)
+TAR_EXTENSIONS = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+
+# 壓縮格式的開頭位元組 -> 模組名稱（提供 open(file, 'rb')）
+_COMPRESSION_MAGIC = ((b'\x1f\x8b', 'gzip'), (b'BZh', 'bz2'), (b'\xfd7zXZ\x00', 'lzma'))
+
+# 壓縮檔路徑 -> (stat 簽章, 開啟的 ZipFile/TarFile, 成員名稱 -> 成員資訊, 解壓縮後的 tar 或 None)
+_handles = OrderedDict()
+_handles_lock = threading.Lock()
+
+
+def is_archive(file_path: str) -> bool:
+    """
+    依副檔名判斷是否為支援的壓縮檔
+    
+    Args:
+        file_path (str): 檔案路徑
+        
+    Returns:
+        bool: 是支援的壓縮檔時為True
+    """
+    lower = file_path.lower()
+    return lower.endswith(ZIP_EXTENSIONS) or lower.endswith(TAR_EXTENSIONS)
+
+
+def make_virtual_path(archive_path: str, member: str) -> str:
+    """
+    組合壓縮檔成員的虛擬路徑
+    
+    Args:
+        archive_path (str): 壓縮檔路徑
+        member (str): 成員名稱
+        
+    Returns:
+        str: 虛擬路徑
+    """
+    return archive_path + ARCHIVE_SEPARATOR + member
+
+
+def split_virtual_path(file_path: str) -> Optional[Tuple[str, str]]:
+    """
+    拆解虛擬路徑
+    
+    Args:
+        file_path (str): 檔案路徑
+        
+    Returns:
+        Optional[Tuple[str, str]]: (壓縮檔路徑, 成員名稱)，不是虛擬路徑時返回None
+    """
+    index = file_path.find(ARCHIVE_SEPARATOR)
+    while index != -1:
+        archive_path = file_path[:index]
+        if is_archive(archive_path):
+            return archive_path, file_path[index + len(ARCHIVE_SEPARATOR):]
+        index = file_path.find(ARCHIVE_SEPARATOR, index + 1)
+    return None
+
+
+def real_path(file_path: str) -> str:
+    """
+    取得實際存在於磁碟上的路徑（虛擬路徑返回其壓縮檔）
+    
+    Args:
+        file_path (str): 檔案路徑
+        
+    Returns:
+        str: 磁碟上的路徑
+    """
+    parts = split_virtual_path(file_path)
+    return parts[0] if parts else file_path
+
+
+def path_exists(file_path: str) -> bool:
+    """
+    檔案是否存在（虛擬路徑只檢查壓縮檔，成員在讀取時才確認）
+    
+    Args:
+        file_path (str): 檔案路徑
+        
+    Returns:
+        bool: 存在時為True
+    """
+    return os.path.isfile(real_path(file_path))
+
+
+def is_text_member(member: str) -> bool:
+    """
+    成員名稱是否為支援的文字檔案（與 FileValidator 相同的副檔名規則）
+    
+    Args:
+        member (str): 成員名稱
+        
+    Returns:
+        bool: 是支援的文字檔案時為True
+    """
+    _, ext = os.path.splitext(member.lower())
+    return ext in SUPPORTED_TEXT_EXTENSIONS
+
+
+def list_members(archive_path: str) -> List[str]:
+    """
+    列出壓縮檔中的文字檔成員（只讀取目錄資訊，不讀取成員內容）
+    
+    Args:
+        archive_path (str): 壓縮檔路徑
+        
+    Returns:
+        List[str]: 成員的虛擬路徑（依壓縮檔中的順序）
+    """
+    with _handles_lock:
+        _, _, members, _ = _open_archive(archive_path)
+    return [make_virtual_path(archive_path, name) for name in members]
+
+
+def iter_members(archive_path: str) -> Iterator[Tuple[str, bytes]]:
+    """
+    依序串流讀取壓縮檔中所有的文字檔成員（壓縮檔只讀取一遍，一次只保留一個成員的內容）
+    
+    無法讀取的成員（例如加密或超過大小上限）會被略過。
+    
+    Args:
+        archive_path (str): 壓縮檔路徑
+        
+    Returns:
+        Iterator[Tuple[str, bytes]]: (成員的虛擬路徑, 成員內容)
+    """
+    if archive_path.lower().endswith(ZIP_EXTENSIONS):
+        import zipfile
+        with zipfile.ZipFile(archive_path) as archive:
+            for info in archive.infolist():
+                name = _normalize_member(info.filename)
+                if info.is_dir() or name is None or not is_text_member(name):
+                    continue
+                try:
+                    with archive.open(info) as member:
+                        data = _read_limited(member, info.file_size, name)
+                except Exception as e:
+                    print(f"讀取壓縮檔成員失敗 {name}: {e}")
+                    continue
+                yield make_virtual_path(archive_path, name), data
+    else:
+        import tarfile
+        # 串流模式：依序解壓縮，不需要可回溯的檔案
+        with tarfile.open(archive_path, 'r|*') as archive:
+            for info in archive:
+                name = _normalize_member(info.name)
+                if not info.isfile() or name is None or not is_text_member(name):
+                    continue
+                try:
+                    data = _read_limited(archive.extractfile(info), info.size, name)
+                except Exception as e:
+                    print(f"讀取壓縮檔成員失敗 {name}: {e}")
+                    continue
+                yield make_virtual_path(archive_path, name), data
+
+
+def read_member(file_path: str) -> bytes:
+    """
+    讀取單一成員的內容（壓縮檔保持開啟，讀取同一壓縮檔的其他成員時不需重新開啟）
+    
+    Args:
+        file_path (str): 成員的虛擬路徑
+        
+    Returns:
+        bytes: 成員內容
+        
+    Raises:
+        FileNotFoundError: 壓縮檔或成員不存在
+        ValueError: 不是虛擬路徑或成員超過大小上限
+    """
+    parts = split_virtual_path(file_path)
+    if parts is None:
+        raise ValueError(f"不是壓縮檔成員路徑: {file_path}")
+    archive_path, name = parts
+    # 同一個開啟的壓縮檔不能同時在多個執行緒中讀取
+    with _handles_lock:
+        _, archive, members, _ = _open_archive(archive_path)
+        info = members.get(name)
+        if info is None:
+            raise FileNotFoundError(f"壓縮檔中沒有此檔案: {file_path}")
+        if hasattr(archive, 'extractfile'):
+            return _read_limited(archive.extractfile(info), info.size, name)
+        with archive.open(info) as member:
+            return _read_limited(member, info.file_size, name)
+
+
+def close_all():
+    """關閉所有保持開啟的壓縮檔"""
+    with _handles_lock:
+        while _handles:
+            _, entry = _handles.popitem()
+            _close_entry(entry)
+
+
+def _open_archive(archive_path: str):
+    """
+    開啟壓縮檔並建立成員索引（依 stat 簽章重複使用已開啟的壓縮檔）
+    
+    Args:
+        archive_path (str): 壓縮檔路徑
+        
+    Returns:
+        tuple: (stat 簽章, ZipFile 或 TarFile, 成員名稱 -> 成員資訊, 解壓縮後的 tar 或 None)
+    """
+    stat = os.stat(archive_path)
+    signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+    cached = _handles.get(archive_path)
+    if cached is not None:
+        if cached[0] == signature:
+            _handles.move_to_end(archive_path)
+            return cached
+        _close_entry(cached)
+        del _handles[archive_path]
+    
+    members = {}
+    spool = None
+    if archive_path.lower().endswith(ZIP_EXTENSIONS):
+        import zipfile
+        archive = zipfile.ZipFile(archive_path)
+        for info in archive.infolist():
+            name = _normalize_member(info.filename)
+            if not info.is_dir() and name is not None and is_text_member(name):
+                members.setdefault(name, info)
+    else:
+        import tarfile
+        spool = _spool_decompressed(archive_path)
+        if spool is not None:
+            archive = tarfile.open(fileobj=spool, mode='r:')
+        else:
+            archive = tarfile.open(archive_path, 'r:*')
+        for info in archive.getmembers():
+            name = _normalize_member(info.name)
+            if info.isfile() and name is not None and is_text_member(name):
+                members.setdefault(name, info)
+    
+    entry = (signature, archive, members, spool)
+    _handles[archive_path] = entry
+    while len(_handles) > ARCHIVE_HANDLE_CACHE:
+        _, oldest = _handles.popitem(last=False)
+        _close_entry(oldest)
+    return entry
+
+
+def _spool_decompressed(archive_path: str):
+    """
+    將壓縮過的 tar 整個解壓縮一次，供隨機讀取成員
+    
+    tarfile 直接開啟壓縮過的 tar 時，讀取位置在目前位置之前的成員需要從頭重新解壓縮
+    （例如依調整後的列表順序還原工作階段），解壓縮後的 tar 可直接定位。
+    
+    Args:
+        archive_path (str): 壓縮檔路徑
+        
+    Returns:
+        解壓縮後的 tar（定位到開頭的檔案物件），未壓縮或超過 ARCHIVE_SPOOL_MAX_SIZE 時返回None
+    """
+    with open(archive_path, 'rb') as f:
+        head = f.read(6)
+    module_name = next((name for magic, name in _COMPRESSION_MAGIC if head.startswith(magic)), None)
+    if module_name is None:
+        return None
+    
+    module = importlib.import_module(module_name)
+    spool = tempfile.SpooledTemporaryFile(max_size=ARCHIVE_SPOOL_MEMORY)
+    try:
+        with module.open(archive_path, 'rb') as source:
+            while True:
+                chunk = source.read(1024 * 1024)
+                if not chunk:
+                    break
+                spool.write(chunk)
+                if spool.tell() > ARCHIVE_SPOOL_MAX_SIZE:
+                    # 過大：改為直接讀取壓縮檔
+                    spool.close()
+                    return None
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
+
+
+def _close_entry(entry: tuple):
+    """
+    關閉開啟的壓縮檔與解壓縮後的 tar
+    
+    Args:
+        entry (tuple): _open_archive 返回的項目
+    """
+    _, archive, _, spool = entry
+    archive.close()
+    if spool is not None:
+        spool.close()
+
+
+def _normalize_member(name: str) -> Optional[str]:
+    """
+    正規化成員名稱（去除開頭的 ./ 與 /），含有 .. 的名稱不使用
+    
+    Args:
+        name (str): 壓縮檔中的成員名稱
+        
+    Returns:
+        Optional[str]: 正規化後的名稱，不適用時返回None
+    """
+    parts = [part for part in name.replace('\\', '/').split('/') if part and part != '.']
+    if not parts or '..' in parts:
+        return None
+    return '/'.join(parts)
+
+
+def _read_limited(stream, size: int, name: str) -> bytes:
+    """
+    讀取成員內容，超過大小上限時拒絕（不相信壓縮檔中記錄的大小）
+    
+    Args:
+        stream: 成員的檔案物件
+        size (int): 壓縮檔中記錄的大小
+        name (str): 成員名稱（用於錯誤訊息）
+        
+    Returns:
+        bytes: 成員內容
+        
+    Raises:
+        ValueError: 超過大小上限
+    """
+    if size > ARCHIVE_MAX_MEMBER_SIZE:
+        raise ValueError(f"壓縮檔成員過大: {name}")
+    data = stream.read(ARCHIVE_MAX_MEMBER_SIZE + 1)
+    if len(data) > ARCHIVE_MAX_MEMBER_SIZE:
+        raise ValueError(f"壓縮檔成員過大: {name}")
+    return data
@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+"""
+預算內輸出
+將合併內容裁剪到位元組或 token 預算內：先依已知的檔案大小分配預算，
+再以單次走訪檔案快照，超出分配的檔案以省略標記取代中間或尾端
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Callable, Iterator, List, Optional, Tuple
+from core.output_formatters import OutputFormatter, get_formatter
+from core.text_stats import build_line_offsets
+
+
+# 預算分配策略
+STRATEGY_PROPORTIONAL = 'proportional'  # 依檔案大小等比例裁剪，保留開頭
+STRATEGY_PRIORITY = 'priority'  # 依列表順序完整保留，預算用完後的檔案省略
+STRATEGY_HEAD_TAIL = 'head_tail'  # 依檔案大小等比例裁剪，保留開頭與結尾（適合記錄檔）
+FIT_STRATEGIES = (STRATEGY_PROPORTIONAL, STRATEGY_PRIORITY, STRATEGY_HEAD_TAIL)
+
+# 省略標記
+ELISION_MARKER = "[... {} lines omitted ...]"
+OMITTED_FILES_MARKER = "[... {} files omitted ...]"
+
+# 分配到的預算低於此值（或低於省略標記本身）的檔案直接省略，避免只剩標題與標記
+MIN_FILE_ALLOWANCE = 16
+
+# 大小不可加總（例如 tiktoken）且需要裁剪時，結果超出預算後縮小預算重試的次數
+FIT_RETRIES = 3
+
+
+class BudgetFitter:
+    """預算內輸出 - 分配預算並產生裁剪後的合併內容"""
+    
+    def __init__(self, budget: int, measure: Callable[[str], int],
+                 strategy: str = STRATEGY_PROPORTIONAL,
+                 formatter: Optional[OutputFormatter] = None, additive: bool = False):
+        """
+        Args:
+            budget (int): 預算（與 measure 的單位相同）
+            measure (Callable[[str], int]): 計算文字大小的函數，例如 UTF-8 位元組數或 token 數
+            strategy (str): 預算分配策略（FIT_STRATEGIES 之一）
+            formatter (Optional[OutputFormatter]): 輸出格式，預設為純文字格式
+            additive (bool): 合併文字的大小是否一定不超過各片段大小的總和
+                （UTF-8 位元組數與啟發式估計為 True），是時不需量測整個結果
+        """
+        if strategy not in FIT_STRATEGIES:
+            raise ValueError(f"Unknown strategy: {strategy}")
+        self.budget = max(0, budget)
+        self.measure = measure
+        self.strategy = strategy
+        self.formatter = formatter or get_formatter()
+        self.additive = additive
+    
+    def iter_fitted(self, entries: List[Tuple[str, str]],
+                    sizes: Optional[List[Optional[int]]] = None) -> Iterator[str]:
+        """
+        產生符合預算的合併內容
+        
+        分配與裁剪都在第一次取值時才進行，可將產生器交給背景執行緒。
+        大小可加總或所有檔案都完整保留時，依分配結果直接串流（每個檔案不超過分配）；
+        大小不可加總且需要裁剪時，才量測整個結果並在超出預算時縮小預算重試。
+        
+        Args:
+            entries (List[Tuple[str, str]]): 檔案快照（路徑, 內容），依優先順序排列
+            sizes (Optional[List[Optional[int]]]): 已知的內容大小（例如快取的 token 數），
+                None 的項目會以 measure 計算
+                
+        Returns:
+            Iterator[str]: 合併內容的片段
+        """
+        wrappers = [self.formatter.get_wrapper(file_path, content) for file_path, content in entries]
+        if sizes is None or self.formatter.transforms_body:
+            # 會轉換內容的格式（例如 JSON 跳脫）無法使用原始內容的快取大小
+            sizes = [None] * len(entries)
+        sizes = [size if size is not None else self._measure_body(content)
+                 for size, (_, content) in zip(sizes, entries)]
+        
+        minimums = [max(MIN_FILE_ALLOWANCE, self._marker_cost(content)) for _, content in entries]
+        
+        allowances = self.allocate(wrappers, sizes, minimums)
+        # 連一個檔案都放不下時，不需產生結果就改為只輸出省略標記
+        kept = not entries or any(allowance is not None for allowance in allowances)
+        if kept and (self.additive or allowances == sizes):
+            yield from self._iter_fitted(entries, wrappers, sizes, allowances)
+            return
+        
+        if kept:
+            # 不可加總的大小：量測整個結果（最多 FIT_RETRIES 次）
+            slack = 0
+            for _ in range(FIT_RETRIES):
+                if slack:
+                    allowances = self.allocate(wrappers, sizes, minimums, slack)
+                pieces = list(self._iter_fitted(entries, wrappers, sizes, allowances))
+                overshoot = self.measure("".join(pieces)) - self.budget
+                if overshoot <= 0:
+                    yield from pieces
+                    return
+                slack += overshoot
+        
+        # 仍然超出預算：只輸出省略所有檔案的標記（放不下時不輸出）
+        marker = OMITTED_FILES_MARKER.format(len(entries)) if entries else ""
+        prologue, epilogue = self.formatter.prologue, self.formatter.epilogue
+        if marker and self.measure(prologue + marker + epilogue) <= self.budget:
+            for piece in (prologue, marker, epilogue):
+                if piece:
+                    yield piece
+    
+    def allocate(self, wrappers: List[Tuple[str, str]], sizes: List[int],
+                 minimums: Optional[List[int]] = None, slack: int = 0) -> List[Optional[int]]:
+        """
+        依策略分配每個檔案內容可使用的預算
+        
+        Args:
+            wrappers (List[Tuple[str, str]]): 每個檔案的標題與結尾
+            sizes (List[int]): 每個檔案內容的大小
+            minimums (Optional[List[int]]): 需要裁剪時每個檔案至少需要的預算（含省略標記），
+                預設為 MIN_FILE_ALLOWANCE
+            slack (int): 額外保留不分配的預算
+            
+        Returns:
+            List[Optional[int]]: 每個檔案的分配結果：等於原大小表示完整保留，
+                較小表示需要裁剪，None 表示省略整個檔案
+        """
+        separator = self.formatter.separator
+        separator_cost = self.measure(separator)
+        # 整個輸出的開頭與結尾（例如 XML 根元素）不論保留多少檔案都會輸出
+        budget = self.budget - slack - self.measure(self.formatter.prologue + self.formatter.epilogue)
+        overheads = [self.measure(header + footer) + separator_cost for header, footer in wrappers]
+        if sum(overheads) + sum(sizes) <= budget + separator_cost:
+            return list(sizes)
+        
+        # 超出預算：預留省略檔案的標記
+        available = budget - self.measure(separator + OMITTED_FILES_MARKER.format(len(sizes)))
+        if minimums is None:
+            minimums = [MIN_FILE_ALLOWANCE] * len(sizes)
+        
+        if self.strategy == STRATEGY_PRIORITY:
+            return self._allocate_priority(overheads, sizes, minimums, available)
+        return self._allocate_proportional(overheads, sizes, minimums, available)
+    
+    def _allocate_priority(self, overheads: List[int], sizes: List[int], minimums: List[int],
+                           available: int) -> List[Optional[int]]:
+        """依列表順序完整保留，預算不足的第一個檔案裁剪，之後的檔案省略"""
+        allowances = []
+        remaining = available
+        for overhead, size, minimum in zip(overheads, sizes, minimums):
+            if overhead + size <= remaining:
+                allowances.append(size)
+                remaining -= overhead + size
+            elif remaining - overhead >= minimum:
+                allowances.append(remaining - overhead)
+                remaining = 0
+            else:
+                allowances.append(None)
+        return allowances
+    
+    def _allocate_proportional(self, overheads: List[int], sizes: List[int], minimums: List[int],
+                               available: int) -> List[Optional[int]]:
+        """依檔案大小等比例分配，分配過少的檔案省略並將預算重新分配給其他檔案"""
+        included = [True] * len(sizes)
+        while True:
+            content_budget = available - sum(o for o, keep in zip(overheads, included) if keep)
+            total_size = sum(s for s, keep in zip(sizes, included) if keep)
+            if not any(included):
+                return [None] * len(sizes)
+            if content_budget < 0:
+                # 連標題都放不下：從最後一個檔案開始省略
+                included[len(included) - 1 - included[::-1].index(True)] = False
+                continue
+            if total_size <= content_budget:
+                return [s if keep else None for s, keep in zip(sizes, included)]
+            
+            ratio = content_budget / total_size
+            allowances = [int(s * ratio) if keep else None for s, keep in zip(sizes, included)]
+            
+            # 省略分配過少的檔案（完整保留的小檔案除外）後重新分配
+            dropped = False
+            for i, allowance in enumerate(allowances):
+                if allowance is not None and allowance < sizes[i] and allowance < minimums[i]:
+                    included[i] = False
+                    dropped = True
+            if not dropped:
+                return allowances
+    
+    def _iter_fitted(self, entries: List[Tuple[str, str]], wrappers: List[Tuple[str, str]],
+                     sizes: List[int], allowances: List[Optional[int]]) -> Iterator[str]:
+        """依分配結果依序產生每個檔案的標題、（裁剪後的）內容與結尾"""
+        separator = self.formatter.separator
+        if self.formatter.prologue:
+            yield self.formatter.prologue
+        first = True
+        omitted_files = 0
+        for (_, content), (header, footer), size, allowance in zip(entries, wrappers, sizes, allowances):
+            if allowance is None:
+                omitted_files += 1
+                continue
+            
+            if not first:
+                yield separator
+            first = False
+            
+            yield header
+            body = content
+            if allowance < size:
+                body = self._truncate(content, size, allowance)
+                if self._measure_body(body) > allowance:
+                    # 裁剪後仍超出分配：只保留省略標記（分配不少於標記的大小）
+                    body = ELISION_MARKER.format(content.count('\n') + 1)
+            if body:
+                yield self.formatter.format_body(body)
+            if footer:
+                yield footer
+        
+        if omitted_files:
+            if not first:
+                yield separator
+            yield OMITTED_FILES_MARKER.format(omitted_files)
+        if self.formatter.epilogue:
+            yield self.formatter.epilogue
+    
+    def _truncate(self, content: str, size: int, allowance: int) -> str:
+        """
+        將單一檔案內容裁剪到分配的預算內，盡量在行邊界切斷
+        
+        Args:
+            content (str): 檔案內容
+            size (int): 內容大小
+            allowance (int): 分配的預算（包含省略標記）
+            
+        Returns:
+            str: 裁剪後的內容（含省略標記）
+        """
+        offsets = build_line_offsets(content)
+        allowance -= self._marker_cost(content)
+        keep_tail = self.strategy == STRATEGY_HEAD_TAIL
+        
+        # 依內容的字元數與大小比例換算可保留的字元數，超出時縮小再試
+        char_budget = int(len(content) * max(0, allowance) / size) if size else 0
+        for _ in range(4):
+            head, omitted, tail = self._cut(content, offsets, char_budget, keep_tail)
+            used = (self._measure_body(head) if head else 0) + (self._measure_body(tail) if tail else 0)
+            if used <= allowance or char_budget == 0:
+                break
+            char_budget = int(char_budget * allowance / used * 0.95)
+        else:
+            # 估計一直偏高：只保留省略標記
+            head, omitted, tail = "", len(offsets) - 1, ""
+        
+        if not tail and len(head) == len(content):
+            return head
+        
+        parts = []
+        if head:
+            parts.append(head)
+        parts.append(ELISION_MARKER.format(omitted))
+        if tail:
+            parts.append(tail)
+        return "\n".join(parts)
+    
+    def _marker_cost(self, content: str) -> int:
+        """
+        計算裁剪內容時省略標記（含前後換行）的大小上限
+        
+        Args:
+            content (str): 檔案內容
+            
+        Returns:
+            int: 以全部行數計算的標記大小（實際省略的行數不會更多）
+        """
+        line_count = content.count('\n') + 1
+        return self._measure_body("\n" + ELISION_MARKER.format(line_count) + "\n")
+    
+    def _measure_body(self, text: str) -> int:
+        """計算內容經輸出格式轉換後的大小"""
+        if self.formatter.transforms_body:
+            text = self.formatter.format_body(text)
+        return self.measure(text)
+    
+    @staticmethod
+    def _cut(content: str, offsets, char_budget: int, keep_tail: bool) -> Tuple[str, int, str]:
+        """
+        在行邊界切出開頭（與結尾）
+        
+        Args:
+            content (str): 檔案內容
+            offsets: 行偏移表
+            char_budget (int): 可保留的字元數
+            keep_tail (bool): 是否同時保留結尾
+            
+        Returns:
+            Tuple[str, int, str]: (開頭, 省略的行數, 結尾)
+        """
+        line_count = len(offsets) - 1
+        head_budget = char_budget // 2 if keep_tail else char_budget
+        tail_budget = char_budget - head_budget
+        
+        # 開頭保留的完整行數：第 k 行結束於 offsets[k + 1] - 1
+        head_lines = bisect_right(offsets, head_budget + 1) - 1
+        tail_start = line_count
+        if keep_tail and tail_budget > 0:
+            tail_start = max(head_lines, bisect_left(offsets, len(content) - tail_budget))
+        
+        if head_lines == 0 and tail_start == line_count:
+            # 第一行就超出預算（例如壓縮過的單行檔案）：在字元處切斷，
+            # 保留了部分內容的第一行不算在省略的行數內
+            if head_budget == 0:
+                return "", line_count, ""
+            return content[:head_budget], line_count - 1, ""
+        
+        head = content[:offsets[head_lines] - 1] if head_lines else ""
+        tail = content[offsets[tail_start]:] if tail_start < line_count else ""
+        return head, tail_start - head_lines, tail
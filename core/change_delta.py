@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+變更輸出
+比較目前的檔案與上次複製或匯出時的快照，只輸出新增與修改的檔案
+（修改的檔案可改為輸出統一差異格式），並列出被移除的檔案
+"""
+
+import os
+from typing import Dict, List, Optional, Tuple
+
+
+# 輸出模式：全部內容、只輸出變更的檔案、變更的檔案只輸出差異
+DELTA_MODES = ('all', 'changed', 'diff')
+
+CHANGED_MARKER = "[changed since last copy: showing unified diff]"
+SUMMARY_PATH = "(changes since last copy)"  # 摘要項目的路徑（列出移除的檔案）
+REMOVED_LINE = "removed: {}"
+NO_CHANGES_LINE = "no changes"
+
+
+def build_delta(entries: List[Tuple[str, str]], previous: Dict[str, Optional[str]],
+                removed: List[str], diff: bool) -> List[Tuple[str, str]]:
+    """
+    產生變更輸出的檔案快照
+    
+    Args:
+        entries (List[Tuple[str, str]]): 新增與修改的檔案（路徑, 內容）
+        previous (Dict[str, Optional[str]]): 檔案路徑 -> 上次輸出時的內容（新增的檔案為None）
+        removed (List[str]): 上次輸出後被移除的檔案路徑
+        diff (bool): 修改的檔案是否只輸出差異
+        
+    Returns:
+        List[Tuple[str, str]]: 輸出的快照，最後附上摘要（有移除的檔案或沒有任何變更時）
+    """
+    results = []
+    for file_path, content in entries:
+        old_content = previous.get(file_path)
+        if diff and old_content is not None:
+            content = _unified_diff(file_path, old_content, content)
+        results.append((file_path, content))
+    
+    if removed or not results:
+        summary = [REMOVED_LINE.format(file_path) for file_path in removed] or [NO_CHANGES_LINE]
+        results.append((SUMMARY_PATH, "\n".join(summary)))
+    return results
+
+
+def _unified_diff(file_path: str, old_content: str, content: str) -> str:
+    """
+    產生相對於上次內容的統一差異（差異比原內容還長時返回原內容）
+    
+    Args:
+        file_path (str): 檔案路徑
+        old_content (str): 上次輸出時的內容
+        content (str): 目前的內容
+        
+    Returns:
+        str: 差異或原內容
+    """
+    # 只在輸出差異時才載入 difflib
+    import difflib
+    
+    name = os.path.basename(file_path)
+    diff = list(difflib.unified_diff(old_content.split('\n'), content.split('\n'),
+                                     f"a/{name}", f"b/{name}", n=2, lineterm=''))
+    compact = "\n".join([CHANGED_MARKER] + diff)
+    return compact if len(compact) < len(content) else content
@@ -3,14 +3,41 @@ import os
 import tempfile
 import time
 from typing import List, Tuple, Optional
-import pyperclip
+from core import metrics
 
-try:
-    import win32clipboard
-    import win32con
-    WINDOWS_CLIPBOARD_AVAILABLE = True
-except ImportError:
-    WINDOWS_CLIPBOARD_AVAILABLE = False
+# 剪貼簿後端（pyperclip、win32clipboard）在第一次使用時才載入，不影響程式啟動時間
+_win32_modules = None  # (win32clipboard, win32con)，無法使用時為 False
+
+
+def _get_win32_clipboard():
+    """
+    載入 Windows 剪貼簿模組
+    
+    Returns:
+        Optional[tuple]: (win32clipboard, win32con)，無法使用時返回None
+    """
+    global _win32_modules
+    if _win32_modules is None:
+        try:
+            import win32clipboard
+            import win32con
+            _win32_modules = (win32clipboard, win32con)
+        except ImportError:
+            _win32_modules = False
+    return _win32_modules or None
+
+
+@metrics.timed('clipboard.copy')
+def copy_text(text: str):
+    """
+    將文字複製到剪貼簿（第一次呼叫時載入 pyperclip）
+    
+    Args:
+        text (str): 文字內容
+    """
+    metrics.increment('clipboard.copied_chars', len(text))
+    import pyperclip
+    pyperclip.copy(text)
 
 
 class ClipboardHandler:
@@ -19,7 +46,8 @@ class ClipboardHandler:
     def __init__(self):
         self.temp_dir = tempfile.gettempdir()
         self.paste_count = 0  # 用於生成唯一的貼上檔案名稱
-        
+    
+    @metrics.timed('clipboard.analyze')
     def analyze_clipboard(self) -> Tuple[str, List[str], Optional[str]]:
         """
         分析剪貼簿內容
@@ -47,8 +75,10 @@ class ClipboardHandler:
         Returns:
             List[str]: 檔案路徑列表
         """
-        if not WINDOWS_CLIPBOARD_AVAILABLE:
+        modules = _get_win32_clipboard()
+        if modules is None:
             return []
+        win32clipboard, win32con = modules
         
         try:
             win32clipboard.OpenClipboard()
@@ -65,7 +95,7 @@ class ClipboardHandler:
                             file_paths.append(file_path)
                 
                 return file_paths
-            
+        
         except Exception as e:
             print(f"讀取剪貼簿檔案失敗: {e}")
         finally:
@@ -84,6 +114,7 @@ class ClipboardHandler:
             Optional[str]: 文字內容，如果沒有則返回None
         """
         try:
+            import pyperclip
             return pyperclip.paste()
         except Exception as e:
             print(f"讀取剪貼簿文字失敗: {e}")
@@ -116,7 +147,7 @@ class ClipboardHandler:
                 f.write(text_content)
             
             return file_path
-            
+        
         except Exception as e:
             raise Exception(f"創建文字檔案失敗: {e}")
     
@@ -158,6 +189,6 @@ class ClipboardHandler:
                             os.remove(file_path)
                     except Exception as e:
                         print(f"清理檔案失敗 {filename}: {e}")
-                        
+        
         except Exception as e:
             print(f"清理舊檔案失敗: {e}") 
\ No newline at end of file
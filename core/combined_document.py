@@ -0,0 +1,370 @@
+# -*- coding: utf-8 -*-
+"""
+合併文件模型
+以區段保存每個檔案的內容，並維護行偏移索引，
+讓檢視器只需取出可見範圍的行，而不必組出完整字串
+"""
+
+from bisect import bisect_right
+from typing import Dict, List, Optional, Tuple
+from core.text_stats import build_line_offsets, compute_text_stats, utf8_length
+
+
+class CombinedDocument:
+    """合併文件模型 - 區段列表與行偏移索引"""
+    
+    def __init__(self):
+        self.segments = []  # 每個區段: {'header', 'content', 'line_count', 'bytes', 'line_offsets'}
+        self.segment_starts = []  # 各區段在文件中的起始行號（遞增排序）
+        self.total_lines = 0
+        self.total_chars = 0
+        self.total_bytes = 0
+        self._body_chars = 0  # 所有區段標題與內容的字元數（不含分隔符號）
+        self._body_bytes = 0  # 所有區段標題與內容的 UTF-8 位元組數（不含分隔符號）
+    
+    def insert_segment(self, index: int, header: Optional[str], content: str,
+                       stats: Optional[Dict[str, int]] = None) -> Tuple[int, int, int]:
+        """
+        在指定位置插入區段
+        
+        Args:
+            index (int): 插入位置
+            header (Optional[str]): 區段標題行（不含換行），None 表示沒有標題
+            content (str): 區段內容
+            stats (Optional[Dict[str, int]]): 已快取的內容統計，省略時重新計算
+            
+        Returns:
+            Tuple[int, int, int]: 行變更 (起始行, 原行數, 新行數)
+        """
+        old_total = self.total_lines
+        segment = {
+            'header': header,
+            'content': content,
+            'line_offsets': None  # 第一次需要取行時才建立
+        }
+        self._set_stats(segment, stats or compute_text_stats(content))
+        self.segments.insert(index, segment)
+        self._add_body(segment, 1)
+        self._rebuild_index(index)
+        return self.segment_starts[index], 0, self.total_lines - old_total
+    
+    def append_segment(self, header: Optional[str], content: str,
+                       stats: Optional[Dict[str, int]] = None) -> Tuple[int, int, int]:
+        """
+        在文件尾端新增區段
+        
+        Args:
+            header (Optional[str]): 區段標題行
+            content (str): 區段內容
+            stats (Optional[Dict[str, int]]): 已快取的內容統計
+            
+        Returns:
+            Tuple[int, int, int]: 行變更 (起始行, 原行數, 新行數)
+        """
+        return self.insert_segment(len(self.segments), header, content, stats)
+    
+    def remove_segment(self, index: int) -> Tuple[int, int, int]:
+        """
+        移除指定區段
+        
+        Args:
+            index (int): 區段索引
+            
+        Returns:
+            Tuple[int, int, int]: 行變更 (起始行, 原行數, 新行數)
+        """
+        old_total = self.total_lines
+        start = self.segment_starts[index]
+        self._add_body(self.segments[index], -1)
+        del self.segments[index]
+        self._rebuild_index(index)
+        return start, old_total - self.total_lines, 0
+    
+    def replace_segment(self, index: int, content: str,
+                        stats: Optional[Dict[str, int]] = None) -> Tuple[int, int, int]:
+        """
+        替換指定區段的內容（標題不變）
+        
+        Args:
+            index (int): 區段索引
+            content (str): 新內容
+            stats (Optional[Dict[str, int]]): 已快取的內容統計
+            
+        Returns:
+            Tuple[int, int, int]: 行變更 (起始行, 原行數, 新行數)
+        """
+        segment = self.segments[index]
+        old_lines = self._segment_lines(index)
+        self._add_body(segment, -1)
+        segment['content'] = content
+        segment['line_offsets'] = None
+        self._set_stats(segment, stats or compute_text_stats(content))
+        self._add_body(segment, 1)
+        self._rebuild_index(index)
+        return self.segment_starts[index], old_lines, self._segment_lines(index)
+    
+    def extend_segment(self, index: int, text: str) -> Tuple[int, int, int]:
+        """
+        在區段內容尾端加上文字（只更新增加的部分，不重新計算整個區段）
+        
+        Args:
+            index (int): 區段索引
+            text (str): 加上的文字
+            
+        Returns:
+            Tuple[int, int, int]: 行變更 (起始行, 原行數, 新行數)，起始行為原本的最後一行
+        """
+        segment = self.segments[index]
+        last_line = self.content_start_line(index) + segment['line_count'] - 1
+        added_lines = text.count('\n')
+        
+        self._add_body(segment, -1)
+        old_length = len(segment['content'])
+        segment['content'] += text
+        segment['line_count'] += added_lines
+        segment['chars'] += len(text)
+        segment['bytes'] += utf8_length(text)
+        
+        # 已建立的行偏移表只補上新的行
+        offsets = segment['line_offsets']
+        if offsets is not None:
+            offsets.pop()
+            position = text.find('\n')
+            while position != -1:
+                offsets.append(old_length + position + 1)
+                position = text.find('\n', position + 1)
+            offsets.append(len(segment['content']) + 1)
+        
+        self._add_body(segment, 1)
+        self._rebuild_index(index)
+        return last_line, 1, 1 + added_lines
+    
+    def move_segment(self, src: int, dst: int) -> Tuple[int, int, int]:
+        """
+        移動區段位置（內容與已建立的行偏移不變）
+        
+        移動只會重排 src 與 dst 之間的區段，總行數不變，
+        因此以單一行變更描述受影響的範圍。
+        
+        Args:
+            src (int): 原位置
+            dst (int): 新位置（移除原區段後的索引）
+            
+        Returns:
+            Tuple[int, int, int]: 行變更 (起始行, 原行數, 新行數)
+        """
+        low, high = min(src, dst), max(src, dst)
+        start = self.segment_starts[low]
+        end = self.segment_starts[high] + self._segment_lines(high)
+        
+        segment = self.segments.pop(src)
+        self.segments.insert(dst, segment)
+        self._rebuild_index(low)
+        return start, end - start, end - start
+    
+    def clear(self) -> Tuple[int, int, int]:
+        """
+        清空文件
+        
+        Returns:
+            Tuple[int, int, int]: 行變更 (起始行, 原行數, 新行數)
+        """
+        old_total = self.total_lines
+        self.segments.clear()
+        self._body_chars = 0
+        self._body_bytes = 0
+        self._rebuild_index()
+        return 0, old_total, 0
+    
+    def segment_count(self) -> int:
+        """
+        取得區段數量
+        
+        Returns:
+            int: 區段數量
+        """
+        return len(self.segments)
+    
+    def line_count(self) -> int:
+        """
+        取得文件總行數
+        
+        Returns:
+            int: 總行數
+        """
+        return self.total_lines
+    
+    def segment_at_line(self, line: int) -> int:
+        """
+        以二分搜尋找出某一行所屬的區段
+        
+        Args:
+            line (int): 文件行號（從0開始）
+            
+        Returns:
+            int: 區段索引，文件為空時返回-1
+        """
+        if not self.segments:
+            return -1
+        return max(0, bisect_right(self.segment_starts, line) - 1)
+    
+    def segment_header_line(self, index: int) -> int:
+        """
+        取得區段標題行在文件中的行號（跳過前置的分隔空白行）
+        
+        Args:
+            index (int): 區段索引
+            
+        Returns:
+            int: 文件行號
+        """
+        return self.segment_starts[index] + self._lead_lines(index)
+    
+    def content_start_line(self, index: int) -> int:
+        """
+        取得區段第一行內容在文件中的行號（跳過分隔行與標題行）
+        
+        Args:
+            index (int): 區段索引
+            
+        Returns:
+            int: 文件行號
+        """
+        header_lines = 1 if self.segments[index]['header'] is not None else 0
+        return self.segment_header_line(index) + header_lines
+    
+    def get_lines(self, start: int, end: int) -> List[str]:
+        """
+        取得文件中 [start, end) 範圍的行
+        
+        Args:
+            start (int): 起始行號（從0開始）
+            end (int): 結束行號（不含）
+            
+        Returns:
+            List[str]: 行內容列表（不含換行符號）
+        """
+        start = max(0, start)
+        end = min(end, self.total_lines)
+        if start >= end:
+            return []
+        
+        lines = []
+        index = self.segment_at_line(start)
+        line = start
+        while line < end and index < len(self.segments):
+            segment = self.segments[index]
+            seg_start = self.segment_starts[index]
+            lead = self._lead_lines(index)
+            local = line - seg_start
+            
+            # 區段之間的空白分隔行
+            if local < lead:
+                lines.append("")
+                line += 1
+                continue
+            
+            # 標題行
+            if segment['header'] is not None:
+                if local == lead:
+                    lines.append(segment['header'])
+                    line += 1
+                    continue
+                local -= 1
+            
+            # 內容行：一次切出連續範圍
+            first = local - lead
+            last = min(segment['line_count'], first + (end - line))
+            lines.extend(self._content_lines(segment, first, last))
+            line += last - first
+            index += 1
+        
+        return lines
+    
+    def get_text(self) -> str:
+        """
+        取得完整文件文字（僅供小型文件或除錯使用）
+        
+        Returns:
+            str: 完整文字
+        """
+        return "\n".join(self.get_lines(0, self.total_lines))
+    
+    def _lead_lines(self, index: int) -> int:
+        """區段前的分隔空白行數（第一個區段沒有）"""
+        return 1 if index > 0 else 0
+    
+    def _segment_lines(self, index: int) -> int:
+        """區段在文件中佔用的行數"""
+        segment = self.segments[index]
+        header_lines = 1 if segment['header'] is not None else 0
+        return self._lead_lines(index) + header_lines + segment['line_count']
+    
+    @staticmethod
+    def _set_stats(segment: dict, stats: Dict[str, int]):
+        """將內容統計寫入區段"""
+        segment['line_count'] = stats['lines']
+        segment['chars'] = stats['chars']
+        segment['bytes'] = stats['bytes']
+    
+    def _add_body(self, segment: dict, sign: int):
+        """
+        將區段的標題與內容計入（或扣除）字元數與位元組數總計
+        
+        Args:
+            segment (dict): 區段
+            sign (int): 1 表示加入，-1 表示扣除
+        """
+        chars = segment['chars']
+        size = segment['bytes']
+        if segment['header'] is not None:
+            chars += len(segment['header']) + 1
+            size += utf8_length(segment['header']) + 1
+        self._body_chars += sign * chars
+        self._body_bytes += sign * size
+    
+    def _rebuild_index(self, from_index: int = 0):
+        """
+        從指定區段開始重建起始行號表與總計
+        
+        Args:
+            from_index (int): 第一個受影響的區段索引，之前的起始行號保持不變
+        """
+        from_index = min(from_index, len(self.segment_starts))
+        starts = self.segment_starts
+        del starts[from_index:]
+        
+        line = 0
+        if from_index > 0:
+            line = starts[from_index - 1] + self._segment_lines(from_index - 1)
+        for i in range(from_index, len(self.segments)):
+            starts.append(line)
+            line += self._segment_lines(i)
+        
+        self.total_lines = line
+        separators = 2 * (len(self.segments) - 1) if self.segments else 0
+        self.total_chars = self._body_chars + separators
+        self.total_bytes = self._body_bytes + separators
+    
+    @staticmethod
+    def _content_lines(segment: dict, first: int, last: int) -> List[str]:
+        """
+        取得區段內容的 [first, last) 行
+        
+        Args:
+            segment (dict): 區段
+            first (int): 起始內容行
+            last (int): 結束內容行（不含）
+            
+        Returns:
+            List[str]: 行內容列表
+        """
+        if first >= last:
+            return []
+        
+        offsets = segment['line_offsets']
+        if offsets is None:
+            offsets = build_line_offsets(segment['content'])
+            segment['line_offsets'] = offsets
+        
+        return segment['content'][offsets[first]:offsets[last] - 1].split('\n')
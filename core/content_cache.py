@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+檔案內容快取
+依路徑保留解碼後的內容與統計，每次取用時以 os.stat 的（修改時間, 大小, inode）
+判斷檔案是否變更，只有變更的檔案才重新讀取與解碼
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from core.file_handler import FileHandler
+from core.file_signature import stat_signature
+from utils.constants import CONTENT_CACHE_SIZE
+
+
+class ContentCache:
+    """檔案內容快取 - 以 stat 簽章判斷是否需要重新讀取（可在任何執行緒使用）"""
+    
+    def __init__(self, max_entries: int = CONTENT_CACHE_SIZE):
+        """
+        Args:
+            max_entries (int): 最多保留的檔案數，超過時移除最久未使用的檔案
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # 檔案路徑 -> (簽章, 內容, 統計)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, file_path: str) -> Tuple[str, Dict[str, int]]:
+        """
+        取得檔案內容，檔案未變更時直接使用快取（與 FileHandler.load_file 相同的返回值）
+        
+        Args:
+            file_path (str): 檔案路徑
+            
+        Returns:
+            Tuple[str, Dict[str, int]]: (檔案內容, 統計)
+            
+        Raises:
+            OSError: 檔案不存在或無法讀取
+            UnicodeDecodeError: 無法解碼
+        """
+        signature = stat_signature(file_path)
+        if signature is None:
+            self.discard(file_path)
+            raise FileNotFoundError(file_path)
+        
+        with self._lock:
+            entry = self._entries.get(file_path)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(file_path)
+                self.hits += 1
+                return entry[1], entry[2]
+        
+        # 讀取期間檔案若再次變更，下次取用時簽章不同會重新讀取
+        content, stats = FileHandler.load_file(file_path)
+        with self._lock:
+            self.misses += 1
+            self._entries[file_path] = (signature, content, stats)
+            self._entries.move_to_end(file_path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return content, stats
+    
+    def get_signature(self, file_path: str) -> Optional[Tuple[int, int, int]]:
+        """
+        取得快取內容讀取時的 stat 簽章
+        
+        Args:
+            file_path (str): 檔案路徑
+            
+        Returns:
+            Optional[Tuple[int, int, int]]: stat 簽章，沒有快取時返回None
+        """
+        with self._lock:
+            entry = self._entries.get(file_path)
+        return entry[0] if entry is not None else None
+    
+    def discard(self, file_path: str):
+        """
+        移除檔案的快取
+        
+        Args:
+            file_path (str): 檔案路徑
+        """
+        with self._lock:
+            self._entries.pop(file_path, None)
+    
+    def clear(self):
+        """清除所有快取"""
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
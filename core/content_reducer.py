@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+"""
+內容精簡
+在檔案內容與輸出之間套用可選的轉換步驟：移除行尾空白、合併連續空行、
+移除註解與授權標頭、合併重複的記錄行。步驟依副檔名選擇，
+大量內容以行程池平行處理，結果依（內容雜湊, 步驟）快取
+"""
+
+import itertools
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Tuple
+from core.file_signature import content_hash
+from utils.constants import (DEFAULT_REDUCTION_OPTIONS, REDUCTION_CACHE_SIZE,
+                             REDUCTION_POOL_MIN_CHARS)
+
+
+# 使用者可開關的精簡選項
+OPTION_TRAILING_WHITESPACE = 'trailing_whitespace'
+OPTION_BLANK_LINES = 'blank_lines'
+OPTION_COMMENTS = 'comments'
+OPTION_LICENSE_HEADER = 'license_header'
+OPTION_LOG_REPEATS = 'log_repeats'
+REDUCTION_OPTIONS = (OPTION_TRAILING_WHITESPACE, OPTION_BLANK_LINES, OPTION_COMMENTS,
+                     OPTION_LICENSE_HEADER, OPTION_LOG_REPEATS)
+
+# 依副檔名決定註解語法
+HASH_COMMENT_EXTENSIONS = {
+    '.py', '.sh', '.rb', '.pl', '.r', '.yaml', '.yml', '.conf', '.cfg', '.ps1', '.tcl'
+}
+C_COMMENT_EXTENSIONS = {
+    '.c', '.h', '.cpp', '.hpp', '.java', '.js', '.cs', '.go', '.rs', '.swift',
+    '.kt', '.scala', '.php', '.m', '.mm'
+}
+BLOCK_COMMENT_EXTENSIONS = {'.css'}
+LOG_EXTENSIONS = {'.log'}
+
+# 合併重複記錄行時的標記
+REPEAT_MARKER = "[... {} similar lines omitted ...]"
+
+_TRAILING_WHITESPACE = re.compile(r'[ \t]+$', re.MULTILINE)
+_BLANK_LINES = re.compile(r'\n{3,}')
+_HASH_COMMENT_LINE = re.compile(r'^[ \t]*#(?![!]).*\n?', re.MULTILINE)
+# 字串常值與註解一起比對，只移除註解，避免誤刪字串中的 // 或 /*
+_C_COMMENT = re.compile(
+    r'("(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'|`(?:\\.|[^`\\])*`)|(/\*.*?\*/|//[^\n]*)',
+    re.DOTALL)
+_BLOCK_COMMENT = re.compile(r'("(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\')|(/\*.*?\*/)', re.DOTALL)
+# 檔案開頭的註解區塊（可在 shebang 或編碼宣告之後）
+_LEADING_COMMENT = re.compile(
+    r'\A((?:#![^\n]*\n)?(?:[ \t]*#[^\n]*coding[:=][^\n]*\n)?)'
+    r'(\s*(?:/\*.*?\*/[ \t]*\n?|(?:[ \t]*(?://|#)[^\n]*\n?)+))',
+    re.DOTALL)
+_LICENSE_WORDS = re.compile(r'copyright|license|licence|spdx', re.IGNORECASE)
+_LOG_VARIABLE = re.compile(r'\d+')
+
+
+def _strip_trailing_whitespace(text: str) -> str:
+    """移除行尾空白"""
+    return _TRAILING_WHITESPACE.sub('', text)
+
+
+def _collapse_blank_lines(text: str) -> str:
+    """將連續空行合併為一行"""
+    return _BLANK_LINES.sub('\n\n', text)
+
+
+def _strip_hash_comments(text: str) -> str:
+    """移除 # 整行註解"""
+    # 只移除整行註解，行內的 # 可能位於字串中
+    return _HASH_COMMENT_LINE.sub('', text)
+
+
+def _strip_c_comments(text: str) -> str:
+    """移除 // 與 /* */ 註解"""
+    return _C_COMMENT.sub(lambda m: m.group(1) or '', text)
+
+
+def _strip_block_comments(text: str) -> str:
+    """移除 /* */ 註解"""
+    return _BLOCK_COMMENT.sub(lambda m: m.group(1) or '', text)
+
+
+def _strip_license_header(text: str) -> str:
+    """移除檔案開頭包含授權或版權文字的註解區塊"""
+    match = _LEADING_COMMENT.match(text)
+    if not match or not _LICENSE_WORDS.search(match.group(2)):
+        return text
+    return match.group(1) + text[match.end():].lstrip('\n')
+
+
+def _collapse_log_repeats(text: str) -> str:
+    """將相鄰的相似記錄行合併為一行與省略標記"""
+    # 忽略數字（時間戳記、計數、位址）比較相鄰的行
+    lines = []
+    for _, group in itertools.groupby(text.split('\n'), key=lambda line: _LOG_VARIABLE.sub('0', line)):
+        first = next(group)
+        lines.append(first)
+        repeats = sum(1 for _ in group)
+        if repeats:
+            lines.append(REPEAT_MARKER.format(repeats))
+    return '\n'.join(lines)
+
+
+# 步驟名稱 -> 轉換函數（名稱會寫入快取鍵並傳給工作行程）
+_STAGES = {
+    'license_header': _strip_license_header,
+    'hash_comments': _strip_hash_comments,
+    'c_comments': _strip_c_comments,
+    'block_comments': _strip_block_comments,
+    'log_repeats': _collapse_log_repeats,
+    'trailing_whitespace': _strip_trailing_whitespace,
+    'blank_lines': _collapse_blank_lines
+}
+
+
+def plan_stages(file_path: str, options: Iterable[str]) -> Tuple[str, ...]:
+    """
+    依副檔名與啟用的選項決定要套用的步驟
+    
+    Args:
+        file_path (str): 檔案路徑
+        options (Iterable[str]): 啟用的精簡選項（REDUCTION_OPTIONS 的子集合）
+        
+    Returns:
+        Tuple[str, ...]: 依序套用的步驟名稱
+    """
+    options = set(options)
+    ext = os.path.splitext(file_path)[1].lower()
+    comment_stage = None
+    if ext in HASH_COMMENT_EXTENSIONS:
+        comment_stage = 'hash_comments'
+    elif ext in C_COMMENT_EXTENSIONS:
+        comment_stage = 'c_comments'
+    elif ext in BLOCK_COMMENT_EXTENSIONS:
+        comment_stage = 'block_comments'
+    
+    stages = []
+    # 授權標頭需在註解移除之前判斷
+    if comment_stage and OPTION_LICENSE_HEADER in options:
+        stages.append('license_header')
+    if comment_stage and OPTION_COMMENTS in options:
+        stages.append(comment_stage)
+    if ext in LOG_EXTENSIONS and OPTION_LOG_REPEATS in options:
+        stages.append('log_repeats')
+    # 空白整理放在最後，清除前面步驟留下的空行
+    if OPTION_TRAILING_WHITESPACE in options:
+        stages.append('trailing_whitespace')
+    if OPTION_BLANK_LINES in options:
+        stages.append('blank_lines')
+    return tuple(stages)
+
+
+def apply_stages(text: str, stages: Tuple[str, ...]) -> str:
+    """
+    依序套用步驟（模組層級函數，可在工作行程中執行）
+    
+    Args:
+        text (str): 原始內容
+        stages (Tuple[str, ...]): 步驟名稱
+        
+    Returns:
+        str: 精簡後的內容
+    """
+    for stage in stages:
+        text = _STAGES[stage](text)
+    return text
+
+
+class ContentReducer:
+    """內容精簡 - 依副檔名套用步驟，以行程池處理並快取結果"""
+    
+    def __init__(self, options: Optional[Iterable[str]] = None, max_workers: Optional[int] = None,
+                 task_executor=None):
+        """
+        Args:
+            options (Optional[Iterable[str]]): 啟用的精簡選項，預設為 DEFAULT_REDUCTION_OPTIONS
+            max_workers (Optional[int]): 行程池大小，預設依 CPU 數量
+            task_executor (Optional[TaskExecutor]): 共用其行程池的背景工作執行器，預設自行建立行程池
+        """
+        self.options = frozenset(DEFAULT_REDUCTION_OPTIONS if options is None else options)
+        self.max_workers = max_workers
+        self.task_executor = task_executor
+        self._executor = None  # 第一次需要時才建立行程池
+        self._executor_lock = threading.Lock()
+        
+        # (內容雜湊, 步驟) -> 精簡後的內容，可在任何執行緒存取
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+    
+    def set_options(self, options: Iterable[str]):
+        """
+        設定啟用的精簡選項（快取鍵包含步驟，不需清除快取）
+        
+        Args:
+            options (Iterable[str]): 精簡選項
+        """
+        self.options = frozenset(options)
+    
+    def reduce_entries(self, entries: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        """
+        精簡檔案快照的內容（可在背景執行緒呼叫）
+        
+        Args:
+            entries (List[Tuple[str, str]]): 檔案快照（路徑, 內容）
+            
+        Returns:
+            List[Tuple[str, str]]: 精簡後的快照，順序不變
+        """
+        results = list(entries)
+        jobs = []  # (索引, 快取鍵, 內容, 步驟)
+        for i, (file_path, content) in enumerate(entries):
+            stages = plan_stages(file_path, self.options)
+            if not stages or not content:
+                continue
+            key = (content_hash(content), stages)
+            with self._cache_lock:
+                reduced = self._cache.get(key)
+                if reduced is not None:
+                    self._cache.move_to_end(key)
+            if reduced is not None:
+                results[i] = (file_path, reduced)
+            else:
+                jobs.append((i, key, content, stages))
+        
+        if not jobs:
+            return results
+        
+        contents = [job[2] for job in jobs]
+        stage_lists = [job[3] for job in jobs]
+        reduced_list = None
+        if len(jobs) > 1 and sum(len(content) for content in contents) >= REDUCTION_POOL_MIN_CHARS:
+            try:
+                reduced_list = list(self._get_executor().map(apply_stages, contents, stage_lists))
+            except Exception as e:
+                print(f"平行精簡內容失敗，改為逐一處理: {e}")
+        if reduced_list is None:
+            reduced_list = [apply_stages(content, stages) for content, stages in zip(contents, stage_lists)]
+        
+        with self._cache_lock:
+            for (i, key, _, _), reduced in zip(jobs, reduced_list):
+                results[i] = (results[i][0], reduced)
+                self._cache[key] = reduced
+                if len(self._cache) > REDUCTION_CACHE_SIZE:
+                    self._cache.popitem(last=False)
+        return results
+    
+    def close(self):
+        """關閉行程池"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+    
+    def _get_executor(self):
+        """取得（必要時建立）行程池"""
+        if self.task_executor is not None:
+            return self.task_executor.get_process_pool()
+        with self._executor_lock:
+            if self._executor is None:
+                # multiprocessing 載入較慢，只在第一次需要時載入
+                from concurrent.futures import ProcessPoolExecutor
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._executor
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+拖拽資料解析
+將拖拽事件的資料（tkdnd 的 {路徑} 清單、純文字路徑、多行或空格分隔的路徑）
+解析為存在的檔案路徑；不依賴 GUI，沒有顯示器時也可使用（例如效能測試）
+"""
+
+import os
+import re
+from typing import List
+
+
+def parse_drop_files(data: str) -> List[str]:
+    """
+    解析拖拽的檔案資料
+    
+    Args:
+        data (str): 拖拽事件的資料
+        
+    Returns:
+        List[str]: 檔案路徑列表
+    """
+    files = []
+    
+    # 清理資料
+    data = data.strip()
+    
+    # 處理不同格式的拖拽資料
+    if not data:
+        return files
+    
+    # 方法1: 處理標準檔案路徑格式
+    if data.startswith('{') and data.endswith('}'):
+        # 單個檔案格式: {file}
+        if data.count('{') == 1 and data.count('}') == 1:
+            clean_path = data[1:-1].strip().strip('"')
+            if clean_path and os.path.exists(clean_path):
+                files = [clean_path]
+        else:
+            # 多個檔案的格式: {file1} {file2} ...
+            # 使用正則表達式或簡單分割
+            pattern = r'\{([^}]+)\}'
+            matches = re.findall(pattern, data)
+            for match in matches:
+                clean_path = match.strip().strip('"')
+                if clean_path and os.path.exists(clean_path):
+                    files.append(clean_path)
+    
+    # 方法2: 處理純文字路徑（從其他程式拖拽出來的路徑）
+    elif os.path.exists(data):
+        files = [data]
+    
+    # 方法3: 處理多行文字路徑
+    elif '\n' in data or '\r' in data:
+        lines = data.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+        for line in lines:
+            line = line.strip().strip('"').strip("'")
+            if line and os.path.exists(line):
+                files.append(line)
+    
+    # 方法4: 處理空格分隔的路徑
+    elif ' ' in data:
+        parts = data.split()
+        for part in parts:
+            part = part.strip().strip('"').strip("'")
+            if part and os.path.exists(part):
+                files.append(part)
+    
+    # 方法5: 單個檔案路徑
+    else:
+        clean_path = data.strip().strip('{}').strip('"').strip("'")
+        if clean_path and os.path.exists(clean_path):
+            files = [clean_path]
+    
+    # 去除重複並驗證檔案存在
+    unique_files = []
+    for file_path in files:
+        if file_path not in unique_files and os.path.isfile(file_path):
+            unique_files.append(file_path)
+    
+    return unique_files
@@ -0,0 +1,385 @@
+# -*- coding: utf-8 -*-
+"""
+相似檔案偵測
+監聽檔案模型變更，在背景為每個檔案計算一次 MinHash（bottom-k）簽章，
+以倒排索引找出候選配對並估計 Jaccard 相似度，將相似的檔案分組（分組也在背景執行）。
+也提供只輸出代表檔案完整內容、其他檔案只輸出差異的精簡輸出
+"""
+
+import heapq
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+from core.file_handler import EVENT_CLEARED, EVENT_INSERTED, EVENT_REMOVED, EVENT_REPLACED
+from core.task_executor import TaskExecutor
+from utils.constants import DUPLICATE_MAX_POSTINGS, DUPLICATE_SIGNATURE_SIZE, DUPLICATE_THRESHOLD
+
+
+# 相似檔案以差異輸出時的說明行
+DUPLICATE_MARKER = "[near-duplicate of {}: showing changed lines only]"
+
+# 比較前將數字（時間戳記、計數、版本）正規化，讓輪替的記錄檔也能比對
+_NUMBERS = re.compile(r'\d+')
+
+
+class DuplicateDetector:
+    """相似檔案偵測 - 每個檔案的簽章與相似分組"""
+    
+    def __init__(self, file_handler, threshold: float = DUPLICATE_THRESHOLD,
+                 signature_size: int = DUPLICATE_SIGNATURE_SIZE, executor: Optional[TaskExecutor] = None):
+        """
+        Args:
+            file_handler (FileHandler): 檔案模型
+            threshold (float): 視為相似的 Jaccard 相似度下限（0~1）
+            signature_size (int): 每個簽章保留的最小雜湊數量
+            executor (Optional[TaskExecutor]): 共用的背景工作執行器（由擁有者呼叫其 poll）
+        """
+        self.file_handler = file_handler
+        self.threshold = threshold
+        self.signature_size = signature_size
+        self._owns_executor = executor is None
+        self._executor = executor or TaskExecutor(background_workers=1)
+        self._results = []  # 完成回呼收集的 (檔案路徑, 版本, 簽章)
+        
+        # 以下只在UI執行緒存取
+        self._signatures = {}  # 檔案路徑 -> 簽章（遞增排序的雜湊值 tuple）
+        self._versions = {}  # 檔案路徑 -> 最新的計算版本，用於捨棄過期的結果
+        self._next_version = 0
+        self._tasks = {}  # 檔案路徑 -> 進行中的簽章計算（內容變更時取消）
+        self._labels = {}  # 檔案路徑 -> 分組編號（從1開始，0表示沒有相似檔案）
+        self._clusters = []  # 分組列表，每組為依列表順序排列的檔案路徑
+        self._dirty = False  # 簽章已變更、需要重新分組
+        self._cluster_task = None  # 進行中的背景分組（簽章再次變更時取消）
+        self._cluster_version = 0  # 最新的分組版本，用於捨棄過期的結果
+        self._cluster_result = None  # 完成回呼收到、尚未套用的分組結果
+        
+        # 為已載入的檔案計算簽章，並監聽之後的變更
+        for file_path, content in file_handler.get_entries():
+            self._submit(file_path, content)
+        file_handler.add_observer(self)
+    
+    def on_files_changed(self, event: dict):
+        """
+        檔案模型變更通知（觀察者模式）
+        
+        Args:
+            event (dict): 變更事件
+        """
+        event_type = event['type']
+        if event_type in (EVENT_INSERTED, EVENT_REPLACED):
+            self._submit(event['path'], self.file_handler.file_contents[event['index']])
+        elif event_type == EVENT_REMOVED:
+            self._cancel(event['path'])
+            self._versions.pop(event['path'], None)
+            self._signatures.pop(event['path'], None)
+            self._labels.pop(event['path'], None)
+            self._dirty = True
+        elif event_type == EVENT_CLEARED:
+            for file_path in list(self._tasks):
+                self._cancel(file_path)
+            self._cancel_clustering()
+            self._versions.clear()
+            self._signatures.clear()
+            self._labels.clear()
+            self._dirty = True
+    
+    def poll(self, limit: int = 500) -> Dict[str, int]:
+        """
+        套用背景完成的簽章與分組，所有簽章完成後在背景重新分組（在UI執行緒呼叫）
+        
+        Args:
+            limit (int): 單次最多處理的結果數
+            
+        Returns:
+            Dict[str, int]: 分組編號有變更的檔案（檔案路徑 -> 分組編號，0表示沒有相似檔案）
+        """
+        if self._owns_executor:
+            self._executor.poll()
+        results, self._results = self._results[:limit], self._results[limit:]
+        for file_path, version, signature in results:
+            if self._versions.get(file_path) != version:
+                continue
+            self._tasks.pop(file_path, None)
+            self._signatures[file_path] = signature
+            self._dirty = True
+        
+        if self._dirty and not self._tasks:
+            self._dirty = False
+            self._submit_clustering()
+        if self._cluster_result is None or self._dirty:
+            return {}
+        
+        old_labels = self._labels
+        self._clusters, self._cluster_result = self._cluster_result, None
+        self._labels = {file_path: 0 for file_path in self._signatures}
+        for number, cluster in enumerate(self._clusters, 1):
+            for file_path in cluster:
+                self._labels[file_path] = number
+        
+        return {file_path: label for file_path, label in self._labels.items()
+                if old_labels.get(file_path) != label}
+    
+    def get_label(self, file_path: str) -> Optional[int]:
+        """
+        取得檔案的分組編號
+        
+        Args:
+            file_path (str): 檔案路徑
+            
+        Returns:
+            Optional[int]: 分組編號，0表示沒有相似檔案，尚未計算完成時為None
+        """
+        if file_path not in self._signatures or self._dirty or self._cluster_task is not None:
+            return None
+        return self._labels.get(file_path, 0)
+    
+    def get_clusters(self) -> List[List[str]]:
+        """
+        取得相似檔案分組
+        
+        Returns:
+            List[List[str]]: 每組至少兩個檔案路徑，依列表順序排列
+        """
+        return [list(cluster) for cluster in self._clusters]
+    
+    def pending_count(self) -> int:
+        """
+        取得尚未完成的簽章數量
+        
+        Returns:
+            int: 計算中的檔案數
+        """
+        return len(self._tasks)
+    
+    def close(self):
+        """停止監聽並取消進行中的計算（自行建立的執行器一併關閉）"""
+        self.file_handler.remove_observer(self)
+        for file_path in list(self._tasks):
+            self._cancel(file_path)
+        self._cancel_clustering()
+        if self._owns_executor:
+            self._executor.shutdown()
+    
+    @staticmethod
+    def compute_signature(content: str, size: int = DUPLICATE_SIGNATURE_SIZE) -> Tuple[int, ...]:
+        """
+        計算內容的 bottom-k MinHash 簽章（以正規化後的非空白行為特徵）
+        
+        Args:
+            content (str): 檔案內容
+            size (int): 保留的最小雜湊數量
+            
+        Returns:
+            Tuple[int, ...]: 遞增排序的雜湊值（不同的行少於 size 時為全部）
+        """
+        # 以（行, 第幾次出現）為特徵，重複的行也會計入差異
+        occurrences = {}
+        hashes = set()
+        for line in _NUMBERS.sub('0', content).split('\n'):
+            line = line.strip()
+            if not line:
+                continue
+            count = occurrences.get(line, 0)
+            occurrences[line] = count + 1
+            hashes.add(hash((line, count)))
+        return tuple(heapq.nsmallest(size, hashes))
+    
+    @staticmethod
+    def estimate_similarity(first: Tuple[int, ...], second: Tuple[int, ...],
+                            size: int = DUPLICATE_SIGNATURE_SIZE) -> float:
+        """
+        以兩個簽章估計 Jaccard 相似度
+        
+        Args:
+            first (Tuple[int, ...]): 第一個簽章
+            second (Tuple[int, ...]): 第二個簽章
+            size (int): 簽章大小
+            
+        Returns:
+            float: 相似度（0~1）
+        """
+        if not first or not second:
+            return 0.0
+        first_set, second_set = set(first), set(second)
+        union = heapq.nsmallest(size, first_set | second_set)
+        shared = sum(1 for value in union if value in first_set and value in second_set)
+        return shared / len(union)
+    
+    @staticmethod
+    def find_clusters(signatures: Dict[str, Tuple[int, ...]], file_list: List[str],
+                      threshold: float = DUPLICATE_THRESHOLD, size: int = DUPLICATE_SIGNATURE_SIZE,
+                      task=None) -> List[List[str]]:
+        """
+        以倒排索引找出共用雜湊值的候選配對，估計相似度後以聯集-尋找（union-find）分組
+        （只使用傳入的快照，可在背景執行緒呼叫）
+        
+        Args:
+            signatures (Dict[str, Tuple[int, ...]]): 檔案路徑 -> 簽章
+            file_list (List[str]): 列表順序（不在列表中的檔案不分組）
+            threshold (float): 視為相似的 Jaccard 相似度下限
+            size (int): 簽章大小
+            task (Optional[Task]): 背景工作，用於檢查取消
+            
+        Returns:
+            List[List[str]]: 相似檔案分組
+            
+        Raises:
+            TaskCancelled: 工作已取消
+        """
+        order = {file_path: i for i, file_path in enumerate(file_list)}
+        paths = [file_path for file_path in signatures if file_path in order]
+        
+        parents = {file_path: file_path for file_path in paths}
+        
+        def find(file_path):
+            while parents[file_path] != file_path:
+                parents[file_path] = parents[parents[file_path]]
+                file_path = parents[file_path]
+            return file_path
+        
+        # 簽章完全相同的檔案直接合併，之後每組只需以一個檔案比對
+        identical = {}
+        for file_path in paths:
+            signature = signatures[file_path]
+            if not signature:
+                continue
+            first = identical.setdefault(signature, file_path)
+            if first != file_path:
+                parents[file_path] = first
+        
+        postings = {}
+        for signature, file_path in identical.items():
+            for value in signature:
+                postings.setdefault(value, []).append(file_path)
+        
+        # 計算每對檔案共用的雜湊值數量（略過幾乎每個檔案都有的行）
+        shared = {}
+        for members in postings.values():
+            if len(members) < 2 or len(members) > DUPLICATE_MAX_POSTINGS:
+                continue
+            if task is not None:
+                task.token.check()
+            for i, first in enumerate(members):
+                for second in members[i + 1:]:
+                    pair = (first, second)
+                    shared[pair] = shared.get(pair, 0) + 1
+        
+        if task is not None:
+            task.token.check()
+        for (first, second), count in shared.items():
+            first_signature = signatures[first]
+            second_signature = signatures[second]
+            smaller = min(len(first_signature), len(second_signature))
+            if count < smaller * threshold / 2:
+                continue
+            if DuplicateDetector.estimate_similarity(first_signature, second_signature, size) >= threshold:
+                parents[find(first)] = find(second)
+        
+        groups = {}
+        for file_path in sorted(paths, key=order.get):
+            groups.setdefault(find(file_path), []).append(file_path)
+        return [group for group in groups.values() if len(group) > 1]
+    
+    def _submit(self, file_path: str, content: str):
+        """
+        提交背景簽章計算
+        
+        Args:
+            file_path (str): 檔案路徑
+            content (str): 檔案內容
+        """
+        self._cancel(file_path)
+        self._next_version += 1
+        version = self._next_version
+        self._versions[file_path] = version
+        self._signatures.pop(file_path, None)
+        self._dirty = True
+        
+        def work():
+            try:
+                return self.compute_signature(content, self.signature_size)
+            except Exception as e:
+                print(f"計算相似度簽章失敗: {e}")
+                return ()
+        
+        self._tasks[file_path] = self._executor.submit(
+            work, background=True,
+            on_done=lambda signature: self._results.append((file_path, version, signature)))
+    
+    def _submit_clustering(self):
+        """以目前簽章的快照提交背景分組（取代進行中的分組）"""
+        self._cancel_clustering()
+        self._cluster_version += 1
+        version = self._cluster_version
+        signatures = dict(self._signatures)
+        file_list = list(self.file_handler.file_list)
+        
+        def done(clusters):
+            if version == self._cluster_version:
+                self._cluster_task = None
+                self._cluster_result = clusters
+        
+        def failed(error):
+            print(f"相似檔案分組失敗: {error}")
+            if version == self._cluster_version:
+                self._cluster_task = None
+        
+        self._cluster_task = self._executor.submit(
+            lambda task: self.find_clusters(signatures, file_list, self.threshold, self.signature_size, task),
+            background=True, pass_task=True, on_done=done, on_error=failed)
+    
+    def _cancel_clustering(self):
+        """取消進行中的分組並捨棄尚未套用的結果"""
+        if self._cluster_task is not None:
+            self._cluster_task.cancel()
+            self._cluster_task = None
+        self._cluster_result = None
+    
+    def _cancel(self, file_path: str):
+        """
+        取消檔案進行中的簽章計算
+        
+        Args:
+            file_path (str): 檔案路徑
+        """
+        task = self._tasks.pop(file_path, None)
+        if task is not None:
+            task.cancel()
+
+
+def diff_duplicates(entries: List[Tuple[str, str]], clusters: List[List[str]]) -> List[Tuple[str, str]]:
+    """
+    將相似檔案改為相對於代表檔案的差異（每組在快照中的第一個檔案為代表，保留完整內容）
+    
+    Args:
+        entries (List[Tuple[str, str]]): 檔案快照（路徑, 內容）
+        clusters (List[List[str]]): 相似檔案分組
+        
+    Returns:
+        List[Tuple[str, str]]: 轉換後的快照，差異比原內容還長的檔案保持不變
+    """
+    # 只在輸出差異時才載入 difflib，不影響啟動時間
+    import difflib
+    
+    cluster_of = {}
+    for number, cluster in enumerate(clusters):
+        for file_path in cluster:
+            cluster_of[file_path] = number
+    
+    representatives = {}  # 分組編號 -> (路徑, 內容行)
+    results = []
+    for file_path, content in entries:
+        number = cluster_of.get(file_path)
+        if number is None:
+            results.append((file_path, content))
+            continue
+        if number not in representatives:
+            representatives[number] = (file_path, content.split('\n'))
+            results.append((file_path, content))
+            continue
+        
+        representative, representative_lines = representatives[number]
+        diff = list(difflib.unified_diff(representative_lines, content.split('\n'), n=0, lineterm=''))
+        compact = "\n".join([DUPLICATE_MARKER.format(os.path.basename(representative))] + diff[2:])
+        results.append((file_path, compact if len(compact) < len(content) else content))
+    return results
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+檔案列表篩選器
+以預先計算的小寫路徑索引做子字串或模糊比對，
+查詢字串延長時只在上一次的結果中繼續比對
+"""
+
+import re
+from typing import List, Optional
+from core.file_handler import EVENT_CLEARED, EVENT_INSERTED, EVENT_MOVED, EVENT_REMOVED
+
+
+class FileFilter:
+    """檔案列表篩選器 - 監聽檔案模型變更並維護小寫路徑索引"""
+    
+    def __init__(self, file_handler):
+        self.file_handler = file_handler
+        self._paths = [self._normalize(path) for path in file_handler.file_list]
+        
+        # 上一次的查詢與結果，查詢延長時可縮小比對範圍
+        self._last_query = None
+        self._last_fuzzy = False
+        self._last_matches = None
+        
+        file_handler.add_observer(self)
+    
+    def on_files_changed(self, event: dict):
+        """
+        檔案模型變更通知（觀察者模式）
+        
+        Args:
+            event (dict): 變更事件
+        """
+        event_type = event['type']
+        index = event['index']
+        if event_type == EVENT_INSERTED:
+            self._paths.insert(index, self._normalize(event['path']))
+        elif event_type == EVENT_REMOVED:
+            del self._paths[index]
+        elif event_type == EVENT_MOVED:
+            self._paths.insert(index, self._paths.pop(event['from_index']))
+        elif event_type == EVENT_CLEARED:
+            self._paths.clear()
+        else:
+            return
+        
+        # 索引位置已改變，上一次的結果不再適用
+        self._last_matches = None
+    
+    def match(self, query: str, fuzzy: bool = False) -> Optional[List[int]]:
+        """
+        取得符合查詢的檔案索引
+        
+        Args:
+            query (str): 查詢字串（不分大小寫，比對完整路徑與檔案名稱）
+            fuzzy (bool): 是否使用模糊比對（字元依序出現即可，不需連續）
+            
+        Returns:
+            Optional[List[int]]: 依列表順序的檔案索引，查詢為空時返回None（不篩選）
+        """
+        query = self._normalize(query.strip())
+        if not query:
+            self._last_matches = None
+            return None
+        
+        # 查詢延長時，結果必定是上一次結果的子集合
+        if (self._last_matches is not None and fuzzy == self._last_fuzzy
+                and query.startswith(self._last_query)):
+            candidates = self._last_matches
+        else:
+            candidates = range(len(self._paths))
+        
+        paths = self._paths
+        if fuzzy:
+            # 每個字元前只允許「不是該字元」的字元，比對時不需回溯
+            pattern = ''.join('[^{0}]*{0}'.format(re.escape(char)) for char in query)
+            match = re.compile(pattern).match
+            matches = [i for i in candidates if match(paths[i])]
+        else:
+            matches = [i for i in candidates if query in paths[i]]
+        
+        self._last_query = query
+        self._last_fuzzy = fuzzy
+        self._last_matches = matches
+        return matches
+    
+    def close(self):
+        """移除觀察者"""
+        self.file_handler.remove_observer(self)
+    
+    @staticmethod
+    def _normalize(path: str) -> str:
+        """轉為小寫並統一路徑分隔符號"""
+        return path.replace('\\', '/').lower()
@@ -1,23 +1,53 @@
 # -*- coding: utf-8 -*-
 import os
-from typing import List, Tuple
+from collections import deque
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from core import archive_reader, metrics
+from core.combined_document import CombinedDocument
+from core.file_signature import content_hash, stat_signature
 from core.file_validator import FileValidator
+from core.output_formatters import OutputFormatter, get_formatter
 from core.state_manager import StateManager
+from core.text_stats import compute_text_stats
 from utils.i18n import i18n
 
 
+# 檔案模型變更事件類型
+EVENT_INSERTED = 'inserted'
+EVENT_REMOVED = 'removed'
+EVENT_REPLACED = 'replaced'
+EVENT_MOVED = 'moved'
+EVENT_CLEARED = 'cleared'
+
+
 class FileHandler:
     """檔案處理器，負責檔案的讀取和管理"""
     
-    def __init__(self):
+    def __init__(self, load_state: bool = True):
+        """
+        Args:
+            load_state (bool): 是否立即載入上次的狀態；GUI 會在第一次繪製後
+                以 iter_load_previous_state 分批載入
+        """
         self.file_list = []  # 儲存檔案路徑列表
         self.file_contents = []  # 儲存檔案內容列表
+        self.file_stats = []  # 儲存每個檔案載入時計算的統計（行數、字元數、位元組數、編碼）
+        self.total_stats = {'lines': 0, 'chars': 0, 'bytes': 0}  # 所有檔案統計的累計值
         self.deleted_files = []  # 儲存被刪除的檔案（用於復原功能）
+        self.document = CombinedDocument()  # 合併文件模型（供檢視器虛擬化顯示）
+        self.observers = []  # 觀察者列表，用於通知檔案模型變更
         self.state_manager = StateManager()  # 狀態管理器
+        self._restoring = deque()  # 上次狀態中尚未載入的檔案路徑
+        self._clear_count = 0  # 清空次數，載入狀態期間清空時停止載入
+        self._loaded_signatures = {}  # 檔案路徑 -> 讀取前的 stat 簽章（判斷磁碟上的檔案是否變更）
+        self._copied = {}  # 檔案路徑 -> 上次複製或匯出時的 {'signature', 'content', 'hash'}
         
         # 載入上次的狀態
-        self._load_previous_state()
+        if load_state:
+            for _ in self.iter_load_previous_state():
+                pass
     
+    @metrics.timed('file_handler.add_file')
     def add_file(self, file_path: str) -> Tuple[bool, str]:
         """
         新增檔案到列表
@@ -28,6 +58,10 @@ class FileHandler:
         Returns:
             Tuple[bool, str]: (是否成功, 訊息)
         """
+        # 壓縮檔：加入其中所有的文字檔
+        if FileValidator.is_archive_file(file_path):
+            return self.add_archive(file_path)
+        
         # 檢查檔案是否為文字檔案
         if not FileValidator.is_text_file(file_path):
             return False, i18n.get_text("invalid_file")
@@ -37,12 +71,11 @@ class FileHandler:
             return False, i18n.get_text("file_exists")
         
         try:
-            # 讀取檔案內容
-            content = self._read_file_content(file_path)
+            # 讀取檔案內容（同時計算統計）
+            content, stats = self._load_entry(file_path)
             
             # 新增到列表
-            self.file_list.append(file_path)
-            self.file_contents.append(content)
+            self._insert_entry(len(self.file_list), file_path, content, stats)
             
             # 保存狀態
             self._save_current_state()
@@ -51,6 +84,42 @@ class FileHandler:
         except Exception as e:
             return False, i18n.get_text("read_file_error", str(e))
     
+    def add_archive(self, archive_path: str) -> Tuple[bool, str]:
+        """
+        將壓縮檔中的文字檔以虛擬路徑（壓縮檔!/成員）加入列表
+        
+        壓縮檔只串流讀取一遍，不會解壓縮到磁碟；已在列表中的成員會被略過。
+        
+        Args:
+            archive_path (str): 壓縮檔路徑
+            
+        Returns:
+            Tuple[bool, str]: (是否有新增任何檔案, 訊息)
+        """
+        added = 0
+        signature = stat_signature(archive_path)
+        try:
+            for file_path, raw in archive_reader.iter_members(archive_path):
+                if file_path in self.file_list:
+                    continue
+                try:
+                    content, stats = self.decode_content(raw)
+                except Exception as e:
+                    print(f"讀取壓縮檔成員失敗 {file_path}: {e}")
+                    continue
+                self._loaded_signatures[file_path] = signature
+                self._insert_entry(len(self.file_list), file_path, content, stats)
+                added += 1
+        except Exception as e:
+            if not added:
+                return False, i18n.get_text("read_file_error", str(e))
+            print(f"讀取壓縮檔失敗 {archive_path}: {e}")
+        
+        if not added:
+            return False, i18n.get_text("archive_empty")
+        self._save_current_state()
+        return True, i18n.get_text("archive_added", added)
+    
     def remove_file(self, index: int) -> bool:
         """
         從列表中移除檔案
@@ -66,13 +135,14 @@ class FileHandler:
             deleted_file = {
                 'path': self.file_list[index],
                 'content': self.file_contents[index],
+                'stats': self.file_stats[index],
+                'signature': self._loaded_signatures.get(self.file_list[index]),
                 'index': index
             }
             self.deleted_files.append(deleted_file)
             
             # 從列表中移除
-            del self.file_list[index]
-            del self.file_contents[index]
+            self._remove_entry(index)
             
             # 保存狀態
             self._save_current_state()
@@ -80,6 +150,139 @@ class FileHandler:
             return True
         return False
     
+    def reload_file(self, index: int) -> bool:
+        """
+        重新讀取指定檔案的內容（例如檔案在磁碟上已變更）
+        
+        Args:
+            index (int): 檔案在列表中的索引
+            
+        Returns:
+            bool: 是否成功重新讀取
+        """
+        if not 0 <= index < len(self.file_list):
+            return False
+        
+        try:
+            content, stats = self._load_entry(self.file_list[index])
+        except Exception as e:
+            print(f"重新讀取檔案失敗 {self.file_list[index]}: {e}")
+            return False
+        
+        self._replace_content(index, content, stats)
+        return True
+    
+    def apply_reloaded(self, reloaded: Dict[str, tuple], hashes: Optional[Dict[str, tuple]] = None):
+        """
+        將背景重新讀取的內容與計算的快照雜湊套用到模型（讀取後已被移除或變更的檔案不套用）
+        
+        Args:
+            reloaded (Dict[str, tuple]): 檔案路徑 -> (讀取前模型中的內容, 內容, 統計, stat 簽章)
+            hashes (Optional[Dict[str, tuple]]): 檔案路徑 -> (上次快照的內容, 雜湊)
+        """
+        for file_path, (content, value) in (hashes or {}).items():
+            record = self._copied.get(file_path)
+            if record is not None and record['content'] is content:
+                record['hash'] = value
+        for file_path, (old_content, content, stats, signature) in reloaded.items():
+            try:
+                index = self.file_list.index(file_path)
+            except ValueError:
+                continue
+            if self.file_contents[index] is not old_content:
+                continue
+            self._loaded_signatures[file_path] = signature
+            self._replace_content(index, content, stats)
+    
+    def _replace_content(self, index: int, content: str, stats: Dict[str, int]):
+        """
+        以新的內容取代指定檔案並通知觀察者
+        
+        Args:
+            index (int): 檔案在列表中的索引
+            content (str): 檔案內容
+            stats (Dict[str, int]): 統計資訊
+        """
+        self._update_totals(self.file_stats[index], -1)
+        self.file_contents[index] = content
+        self.file_stats[index] = stats
+        self._update_totals(stats, 1)
+        lines = self.document.replace_segment(index, content, stats)
+        self._notify_observers(EVENT_REPLACED, index, self.file_list[index], lines)
+    
+    def append_content(self, index: int, text: str, max_lines: Optional[int] = None) -> bool:
+        """
+        在檔案內容尾端加上文字（例如跟隨記錄檔新增的內容），超過行數上限時移除開頭的行
+        
+        未超過上限時只更新增加的部分；超過時一次移除到上限的 90%，
+        之後的多次加入不需每次都重新處理整個檔案。
+        
+        Args:
+            index (int): 檔案在列表中的索引
+            text (str): 加上的文字
+            max_lines (Optional[int]): 保留的行數上限，None 表示不限制
+            
+        Returns:
+            bool: 內容是否有變更
+        """
+        if not 0 <= index < len(self.file_list):
+            return False
+        
+        old_stats = self.file_stats[index]
+        total_lines = old_stats['lines'] + text.count('\n')
+        if max_lines is None or total_lines <= max_lines:
+            if not text:
+                return False
+            lines = self.document.extend_segment(index, text)
+            segment = self.document.segments[index]
+            stats = {'lines': segment['line_count'], 'chars': segment['chars'],
+                     'bytes': segment['bytes'], 'encoding': old_stats.get('encoding')}
+            content = segment['content']
+        else:
+            content = self.file_contents[index] + text
+            drop = total_lines - max(1, max_lines - max_lines // 10)
+            position = -1
+            for _ in range(drop):
+                position = content.find('\n', position + 1)
+            content = content[position + 1:]
+            stats = compute_text_stats(content)
+            stats['encoding'] = old_stats.get('encoding')
+            lines = self.document.replace_segment(index, content, stats)
+        
+        self._update_totals(old_stats, -1)
+        self.file_contents[index] = content
+        self.file_stats[index] = stats
+        self._update_totals(stats, 1)
+        self._notify_observers(EVENT_REPLACED, index, self.file_list[index], lines)
+        return True
+    
+    def move(self, src: int, dst: int) -> bool:
+        """
+        移動檔案在列表中的位置（不重新讀取內容）
+        
+        Args:
+            src (int): 原位置
+            dst (int): 新位置（移除原項目後的索引）
+            
+        Returns:
+            bool: 是否成功移動
+        """
+        count = len(self.file_list)
+        if not (0 <= src < count and 0 <= dst < count):
+            return False
+        if src == dst:
+            return True
+        
+        for items in (self.file_list, self.file_contents, self.file_stats):
+            items.insert(dst, items.pop(src))
+        lines = self.document.move_segment(src, dst)
+        self._notify_observers(EVENT_MOVED, dst, self.file_list[dst], lines, from_index=src)
+        
+        # 保存狀態
+        self._save_current_state()
+        
+        return True
+    
     def restore_last_deleted(self) -> bool:
         """
         復原最後一個被刪除的檔案
@@ -95,14 +298,57 @@ class FileHandler:
         
         # 復原到原來的位置
         insert_index = min(deleted_file['index'], len(self.file_list))
-        self.file_list.insert(insert_index, deleted_file['path'])
-        self.file_contents.insert(insert_index, deleted_file['content'])
+        if deleted_file.get('signature') is not None:
+            self._loaded_signatures[deleted_file['path']] = deleted_file['signature']
+        self._insert_entry(insert_index, deleted_file['path'], deleted_file['content'],
+                           deleted_file.get('stats'))
         
         # 保存狀態
         self._save_current_state()
         
         return True
     
+    def get_entries(self) -> List[Tuple[str, str]]:
+        """
+        取得目前所有檔案的快照（路徑, 內容）
+        
+        只複製參照而不複製內容本身，可安全地交給背景執行緒使用。
+        
+        Returns:
+            List[Tuple[str, str]]: (檔案路徑, 檔案內容) 列表
+        """
+        return list(zip(self.file_list, self.file_contents))
+    
+    def iter_combined_content(self, entries: Optional[List[Tuple[str, str]]] = None,
+                              formatter: Optional[OutputFormatter] = None) -> Iterator[str]:
+        """
+        以串流方式逐段產生合併內容
+        
+        Args:
+            entries (Optional[List[Tuple[str, str]]]): 檔案快照，預設為目前的檔案列表
+            formatter (Optional[OutputFormatter]): 輸出格式，預設為純文字格式
+            
+        Returns:
+            Iterator[str]: 合併內容的片段
+        """
+        if entries is None:
+            entries = self.get_entries()
+        return (formatter or get_formatter()).iter_format(entries)
+    
+    @staticmethod
+    def format_header(file_path: str) -> str:
+        """
+        產生檔案在合併內容中的標題行
+        
+        Args:
+            file_path (str): 檔案路徑
+            
+        Returns:
+            str: 標題行（不含換行）
+        """
+        return f"=== {os.path.basename(file_path)} ==="
+    
+    @metrics.timed('file_handler.get_combined_content')
     def get_combined_content(self) -> str:
         """
         取得所有檔案的合併內容
@@ -110,18 +356,50 @@ class FileHandler:
         Returns:
             str: 合併後的內容
         """
-        if not self.file_contents:
-            return ""
+        return "".join(self.iter_combined_content())
+    
+    @metrics.timed('file_handler.export_combined_content')
+    def export_combined_content(self, file_path: str,
+                                entries: Optional[List[Tuple[str, str]]] = None,
+                                formatter: Optional[OutputFormatter] = None) -> int:
+        """
+        將合併內容以串流方式寫入檔案，不需先組出完整字串
         
-        combined = []
-        for i, (file_path, content) in enumerate(zip(self.file_list, self.file_contents)):
-            file_name = os.path.basename(file_path)
-            combined.append(f"=== {file_name} ===\n")
-            combined.append(content)
-            if i < len(self.file_contents) - 1:
-                combined.append("\n\n")
+        Args:
+            file_path (str): 匯出檔案路徑
+            entries (Optional[List[Tuple[str, str]]]): 檔案快照，預設為目前的檔案列表
+            formatter (Optional[OutputFormatter]): 輸出格式，預設為純文字格式
+            
+        Returns:
+            int: 寫入的字元數
+        """
+        written = 0
+        with open(file_path, 'w', encoding='utf-8', newline='') as f:
+            for chunk in self.iter_combined_content(entries, formatter):
+                f.write(chunk)
+                written += len(chunk)
+        return written
+    
+    def get_file_stats(self, index: int) -> Dict[str, int]:
+        """
+        取得檔案載入時快取的統計資訊
+        
+        Args:
+            index (int): 檔案索引
+            
+        Returns:
+            Dict[str, int]: {'lines', 'chars', 'bytes', 'encoding'}
+        """
+        return self.file_stats[index]
+    
+    def get_total_stats(self) -> Dict[str, int]:
+        """
+        取得所有檔案統計的累計值（新增與移除時即時更新）
         
-        return "".join(combined)
+        Returns:
+            Dict[str, int]: {'lines', 'chars', 'bytes'}
+        """
+        return dict(self.total_stats)
     
     def get_file_list(self) -> List[str]:
         """
@@ -136,11 +414,225 @@ class FileHandler:
         """清空所有檔案"""
         self.file_list.clear()
         self.file_contents.clear()
+        self.file_stats.clear()
+        self.total_stats = {'lines': 0, 'chars': 0, 'bytes': 0}
         self.deleted_files.clear()
+        self._restoring.clear()
+        self._clear_count += 1
+        self._loaded_signatures.clear()
+        lines = self.document.clear()
+        self._notify_observers(EVENT_CLEARED, 0, None, lines)
         
         # 清除保存的狀態
         self.state_manager.clear_state()
     
+    def add_observer(self, observer):
+        """
+        添加觀察者
+        
+        Args:
+            observer: 觀察者物件，需要有 on_files_changed(event) 方法
+        """
+        if observer not in self.observers:
+            self.observers.append(observer)
+    
+    def remove_observer(self, observer):
+        """移除觀察者"""
+        if observer in self.observers:
+            self.observers.remove(observer)
+    
+    def _insert_entry(self, index: int, file_path: str, content: str,
+                      stats: Optional[Dict[str, int]] = None):
+        """
+        在指定位置插入檔案，並同步更新合併文件模型
+        
+        Args:
+            index (int): 插入位置
+            file_path (str): 檔案路徑
+            content (str): 檔案內容
+            stats (Optional[Dict[str, int]]): 已計算的檔案統計，省略時重新計算
+        """
+        if stats is None:
+            stats = compute_text_stats(content)
+        
+        self.file_list.insert(index, file_path)
+        self.file_contents.insert(index, content)
+        self.file_stats.insert(index, stats)
+        self._update_totals(stats, 1)
+        lines = self.document.insert_segment(index, self.format_header(file_path), content, stats)
+        self._notify_observers(EVENT_INSERTED, index, file_path, lines)
+    
+    def _remove_entry(self, index: int):
+        """
+        移除指定位置的檔案，並同步更新合併文件模型
+        
+        Args:
+            index (int): 檔案索引
+        """
+        file_path = self.file_list[index]
+        self._update_totals(self.file_stats[index], -1)
+        self._loaded_signatures.pop(file_path, None)
+        del self.file_list[index]
+        del self.file_contents[index]
+        del self.file_stats[index]
+        lines = self.document.remove_segment(index)
+        self._notify_observers(EVENT_REMOVED, index, file_path, lines)
+    
+    def _update_totals(self, stats: Dict[str, int], sign: int):
+        """
+        將單一檔案的統計計入（或扣除）累計值
+        
+        Args:
+            stats (Dict[str, int]): 檔案統計
+            sign (int): 1 表示加入，-1 表示扣除
+        """
+        for key in self.total_stats:
+            self.total_stats[key] += sign * stats[key]
+    
+    def _notify_observers(self, event_type: str, index: int, file_path: Optional[str],
+                          lines: Tuple[int, int, int], **extra):
+        """
+        通知所有觀察者檔案模型已變更
+        
+        Args:
+            event_type (str): 事件類型（EVENT_INSERTED / EVENT_REMOVED / EVENT_REPLACED /
+                EVENT_MOVED / EVENT_CLEARED）
+            index (int): 受影響的檔案索引（移動時為新位置）
+            file_path (Optional[str]): 受影響的檔案路徑（清空時為None）
+            lines (Tuple[int, int, int]): 合併文件的行變更 (起始行, 原行數, 新行數)
+            **extra: 事件的其他欄位（例如移動事件的 from_index）
+        """
+        if not self.observers:
+            return
+        
+        event = {
+            'type': event_type,
+            'index': index,
+            'path': file_path,
+            'lines': lines
+        }
+        event.update(extra)
+        for observer in self.observers:
+            try:
+                observer.on_files_changed(event)
+            except Exception as e:
+                print(f"Error notifying observer: {e}")
+    
+    def mark_copied(self, entries: List[Tuple[str, str]]):
+        """
+        記錄複製或匯出的檔案快照，之後的變更輸出以此比較
+        
+        只記錄內容的參照與讀取時的 stat 簽章，雜湊在需要比較時才計算；
+        已不在列表中的檔案會從快照移除（它們已在這次輸出中列為移除）。
+        
+        Args:
+            entries (List[Tuple[str, str]]): 輸出的檔案快照（路徑, 內容）
+        """
+        current = set(self.file_list)
+        snapshot = {file_path: record for file_path, record in self._copied.items() if file_path in current}
+        for file_path, content in entries:
+            record = snapshot.get(file_path)
+            if record is not None and record['content'] is content:
+                continue
+            snapshot[file_path] = {
+                'signature': self._loaded_signatures.get(file_path),
+                'content': content,
+                'hash': None
+            }
+        self._copied = snapshot
+    
+    def has_copied(self) -> bool:
+        """
+        是否有上次複製或匯出的快照
+        
+        Returns:
+            bool: 有快照時為True
+        """
+        return bool(self._copied)
+    
+    def prepare_changes(self, skip_reload=()) -> Callable[[], tuple]:
+        """
+        在UI執行緒取得比對所需的快照，回傳可在背景執行緒找出變更的函數
+        
+        Args:
+            skip_reload (Iterable[str]): 不重新讀取的檔案（例如跟隨中的記錄檔）
+            
+        Returns:
+            Callable[[], tuple]: 回傳 (新增或修改的檔案路徑集合, 檔案路徑 -> 上次的內容（新增的檔案為None）,
+                移除的檔案路徑, 重新讀取的檔案, 計算的快照雜湊（後兩者供 apply_reloaded 套用）) 的函數
+        """
+        skip_reload = set(skip_reload)
+        items = [(file_path, self.file_contents[index], self._copied.get(file_path), file_path in skip_reload)
+                 for index, file_path in enumerate(self.file_list)]
+        current = set(self.file_list)
+        removed = [file_path for file_path in self._copied if file_path not in current]
+        return lambda: self._detect_changes(items, removed)
+    
+    @staticmethod
+    def _detect_changes(items: List[tuple], removed: List[str]) -> tuple:
+        """
+        找出上次複製或匯出後新增與修改的檔案（不修改模型，可在背景執行緒呼叫）
+        
+        內容與快照相同的檔案先比對 stat 簽章，磁碟上已變更時才重新讀取；
+        內容不同時才計算雜湊比較，只是重新讀取而內容相同的檔案不算修改；
+        快照記錄與UI執行緒共用，新計算的快照雜湊另外回傳，不寫入記錄。
+        
+        Args:
+            items (List[tuple]): (檔案路徑, 目前的內容, 上次的快照記錄, 是否不重新讀取)
+            removed (List[str]): 移除的檔案路徑
+            
+        Returns:
+            tuple: 與 prepare_changes 回傳的函數相同
+        """
+        changed = set()
+        previous = {}
+        reloaded = {}
+        hashes = {}
+        for file_path, content, record, skip_reload in items:
+            if record is None:
+                changed.add(file_path)
+                previous[file_path] = None
+                continue
+            
+            if content is record['content']:
+                if skip_reload:
+                    continue
+                signature = stat_signature(file_path)
+                if signature == record['signature']:
+                    continue
+                try:
+                    new_content, stats = FileHandler.load_file(file_path)
+                except Exception as e:
+                    print(f"重新讀取檔案失敗 {file_path}: {e}")
+                    continue
+                reloaded[file_path] = (content, new_content, stats, signature)
+                content = new_content
+            
+            copied_hash = record['hash']
+            if copied_hash is None:
+                copied_hash = content_hash(record['content'])
+                hashes[file_path] = (record['content'], copied_hash)
+            if content_hash(content) != copied_hash:
+                changed.add(file_path)
+                previous[file_path] = record['content']
+        return changed, previous, removed, reloaded, hashes
+    
+    def _load_entry(self, file_path: str) -> Tuple[str, Dict[str, int]]:
+        """
+        讀取列表中的檔案，並記錄讀取前的 stat 簽章
+        
+        Args:
+            file_path (str): 檔案路徑
+            
+        Returns:
+            Tuple[str, Dict[str, int]]: (檔案內容, 統計)
+        """
+        signature = stat_signature(file_path)
+        content, stats = self.load_file(file_path)
+        self._loaded_signatures[file_path] = signature
+        return content, stats
+    
+    @metrics.timed('file_handler.read_file_content')
     def _read_file_content(self, file_path: str) -> str:
         """
         讀取檔案內容
@@ -151,57 +643,137 @@ class FileHandler:
         Returns:
             str: 檔案內容
         """
+        return self.load_file(file_path)[0]
+    
+    @staticmethod
+    @metrics.timed('file_handler.load_file')
+    def load_file(file_path: str) -> Tuple[str, Dict[str, int]]:
+        """
+        讀取檔案內容並計算統計資訊
+        
+        檔案只讀取一次，再依序嘗試各種編碼解碼。不會加入檔案列表，
+        命令列模式也以此讀取檔案。虛擬路徑（壓縮檔!/成員）直接從壓縮檔讀取。
+        
+        Args:
+            file_path (str): 檔案路徑
+            
+        Returns:
+            Tuple[str, Dict[str, int]]: (檔案內容, {'lines', 'chars', 'bytes', 'encoding', 'size'}),
+                size 為讀取的原始位元組數
+        """
+        if archive_reader.split_virtual_path(file_path) is not None:
+            return FileHandler.decode_content(archive_reader.read_member(file_path))
+        
+        with open(file_path, 'rb') as file:
+            raw = file.read()
+        return FileHandler.decode_content(raw)
+    
+    @staticmethod
+    @metrics.timed('file_handler.decode_content')
+    def decode_content(raw: bytes) -> Tuple[str, Dict[str, int]]:
+        """
+        依序嘗試各種編碼解碼檔案內容並計算統計資訊
+        
+        Args:
+            raw (bytes): 檔案內容
+            
+        Returns:
+            Tuple[str, Dict[str, int]]: (檔案內容, {'lines', 'chars', 'bytes', 'encoding', 'size'}),
+                size 為讀取的原始位元組數
+        """
         encodings = ['utf-8', 'utf-8-sig', 'gbk', 'big5', 'latin-1']
         
         for encoding in encodings:
             try:
-                with open(file_path, 'r', encoding=encoding) as file:
-                    return file.read()
+                content = raw.decode(encoding)
             except UnicodeDecodeError:
                 continue
-            except Exception as e:
-                raise e
+            
+            # 與文字模式讀取相同的換行處理
+            if '\r' in content:
+                content = content.replace('\r\n', '\n').replace('\r', '\n')
+            
+            stats = compute_text_stats(content)
+            stats['encoding'] = encoding
+            stats['size'] = len(raw)
+            return content, stats
         
         raise UnicodeDecodeError(i18n.get_text("read_file_error", "無法使用任何編碼讀取檔案"))
     
     def _save_current_state(self):
-        """保存目前狀態"""
+        """保存目前狀態（延遲寫入，連續的變更只寫入一次）"""
         deleted_file_paths = [f['path'] for f in self.deleted_files]
-        self.state_manager.save_state(self.file_list, deleted_file_paths)
+        # 上次狀態尚未載入完成時，保留還沒載入的檔案
+        file_paths = self.file_list + [path for path in self._restoring if path not in self.file_list]
+        self.state_manager.save_state_later(file_paths, deleted_file_paths)
+    
+    def flush_state(self):
+        """立即寫入尚未保存的狀態（例如程式結束前）"""
+        self.state_manager.flush()
     
-    def _load_previous_state(self):
-        """載入上次的狀態"""
+    def iter_load_previous_state(self) -> Iterator[int]:
+        """
+        逐一載入上次的狀態，每處理一個檔案產生一次
+        
+        呼叫端可在每次產生後交還控制權（例如分批在Tk事件迴圈中執行），
+        載入的檔案會以變更事件通知觀察者。
+        
+        Returns:
+            Iterator[int]: 已處理的檔案數
+        """
         try:
             state_data = self.state_manager.load_state()
-            if not state_data:
-                return
-            
-            # 載入檔案列表
-            for file_path in state_data.get("file_paths", []):
-                if os.path.exists(file_path):
-                    try:
-                        content = self._read_file_content(file_path)
-                        self.file_list.append(file_path)
-                        self.file_contents.append(content)
-                    except Exception as e:
-                        print(f"載入檔案失敗 {file_path}: {e}")
-            
-            # 載入已刪除檔案列表（用於復原功能）
-            for file_path in state_data.get("deleted_files", []):
-                if os.path.exists(file_path):
-                    try:
-                        content = self._read_file_content(file_path)
-                        deleted_file = {
-                            'path': file_path,
-                            'content': content,
-                            'index': len(self.file_list)  # 預設插入到最後
-                        }
-                        self.deleted_files.append(deleted_file)
-                    except Exception as e:
-                        print(f"載入已刪除檔案失敗 {file_path}: {e}")
-                        
         except Exception as e:
             print(f"載入狀態失敗: {e}")
+            return
+        if not state_data:
+            return
+        
+        self._restoring.extend(state_data.get("file_paths", []))
+        clear_count = self._clear_count
+        processed = 0
+        
+        # 載入檔案列表
+        while self._restoring:
+            file_path = self._restoring.popleft()
+            if file_path not in self.file_list and archive_reader.path_exists(file_path):
+                try:
+                    content, stats = self._load_entry(file_path)
+                    self._insert_entry(len(self.file_list), file_path, content, stats)
+                except Exception as e:
+                    print(f"載入檔案失敗 {file_path}: {e}")
+            processed += 1
+            yield processed
+        
+        # 載入已刪除檔案列表（用於復原功能），排在載入期間刪除的檔案之前
+        restored_deleted = 0
+        for file_path in state_data.get("deleted_files", []):
+            if self._clear_count != clear_count:
+                return
+            if archive_reader.path_exists(file_path):
+                try:
+                    content, stats = self.load_file(file_path)
+                    deleted_file = {
+                        'path': file_path,
+                        'content': content,
+                        'stats': stats,
+                        'index': len(self.file_list)  # 預設插入到最後
+                    }
+                    self.deleted_files.insert(restored_deleted, deleted_file)
+                    restored_deleted += 1
+                except Exception as e:
+                    print(f"載入已刪除檔案失敗 {file_path}: {e}")
+            processed += 1
+            yield processed
+    
+    def is_restoring(self) -> bool:
+        """
+        上次的狀態是否仍在載入中
+        
+        Returns:
+            bool: 還有尚未載入的檔案時為True
+        """
+        return bool(self._restoring)
     
     def get_file_paths(self) -> List[str]:
         """
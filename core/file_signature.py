@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""
+檔案簽章
+以 os.stat 的（修改時間, 大小, inode）判斷檔案是否變更，以及以雜湊比較內容，
+供檔案處理、內容快取、檔案監看、token 計數與內容精簡共用（不依賴其他核心模組）
+"""
+
+import hashlib
+import os
+from typing import Optional, Tuple
+from core.archive_reader import real_path
+
+
+def stat_signature(file_path: str) -> Optional[Tuple[int, int, int]]:
+    """
+    取得檔案的變更簽章
+    
+    Args:
+        file_path (str): 檔案路徑（壓縮檔成員使用壓縮檔的簽章）
+        
+    Returns:
+        Optional[Tuple[int, int, int]]: (修改時間 ns, 大小, inode)，檔案不存在時返回None
+    """
+    try:
+        stat = os.stat(real_path(file_path))
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+def content_hash(content: str) -> bytes:
+    """
+    計算內容雜湊
+    
+    Args:
+        content (str): 檔案內容
+        
+    Returns:
+        bytes: 雜湊值
+    """
+    return hashlib.blake2b(content.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
@@ -1,4 +1,5 @@
 import os
+from core.archive_reader import is_archive, is_text_member, split_virtual_path
 from utils.constants import SUPPORTED_TEXT_EXTENSIONS
 
 
@@ -16,14 +17,33 @@ class FileValidator:
         Returns:
             bool: 如果是支援的文字檔案返回True，否則返回False
         """
+        # 壓縮檔成員（虛擬路徑）：壓縮檔存在且成員為支援的文字檔案
+        archive_member = split_virtual_path(file_path)
+        if archive_member is not None:
+            archive_path, member = archive_member
+            return os.path.isfile(archive_path) and is_text_member(member)
+        
         if not os.path.isfile(file_path):
             return False
-            
+        
         # 取得檔案副檔名
         _, ext = os.path.splitext(file_path.lower())
         
         return ext in SUPPORTED_TEXT_EXTENSIONS
     
+    @staticmethod
+    def is_archive_file(file_path):
+        """
+        檢查檔案是否為支援的壓縮檔（其中的文字檔可作為虛擬檔案加入）
+        
+        Args:
+            file_path (str): 檔案路徑
+            
+        Returns:
+            bool: 如果是支援的壓縮檔返回True，否則返回False
+        """
+        return is_archive(file_path) and os.path.isfile(file_path)
+    
     @staticmethod
     def get_file_extension(file_path):
         """
@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+"""
+檔案監看
+在背景執行緒監看一組檔案，Linux 上以 inotify（透過 ctypes）監看檔案所在的目錄，
+其他平台或 inotify 無法使用時改為定期比對 stat。連續的變更在安靜一段時間後
+才一次回報，且只回報 stat 簽章確實改變的檔案
+"""
+
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from typing import Iterable, List
+from core.file_signature import stat_signature
+from utils.constants import WATCH_DEBOUNCE, WATCH_POLL_INTERVAL
+
+
+# inotify 常數（linux/inotify.h）
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+# 監看目錄時關心的事件（編輯器常以改名方式覆寫檔案，因此監看目錄而非檔案）
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+              IN_CREATE | IN_DELETE)
+
+_EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, len
+
+
+class _Inotify:
+    """inotify 的 ctypes 包裝"""
+    
+    def __init__(self):
+        """
+        Raises:
+            OSError: 平台不支援或無法建立 inotify
+        """
+        if not sys.platform.startswith('linux'):
+            raise OSError("inotify is only available on Linux")
+        import ctypes
+        try:
+            libc = ctypes.CDLL('libc.so.6', use_errno=True)
+        except OSError:
+            import ctypes.util
+            libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self._libc = libc
+        self._errno = ctypes.get_errno
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(self._errno(), "inotify_init1 failed")
+    
+    def add_watch(self, directory: str) -> int:
+        """
+        監看目錄
+        
+        Args:
+            directory (str): 目錄路徑
+            
+        Returns:
+            int: 監看識別碼
+            
+        Raises:
+            OSError: 無法監看（例如超過 max_user_watches）
+        """
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            errno = self._errno()
+            raise OSError(errno, os.strerror(errno), directory)
+        return wd
+    
+    def remove_watch(self, wd: int):
+        """停止監看"""
+        self._libc.inotify_rm_watch(self.fd, wd)
+    
+    def read_events(self) -> List[tuple]:
+        """
+        讀取目前所有的事件（非阻塞）
+        
+        Returns:
+            List[tuple]: (監看識別碼, 事件遮罩, 檔案名稱) 列表
+        """
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(data):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b'\0')
+                offset += length
+                events.append((wd, mask, os.fsdecode(name)))
+        return events
+    
+    def close(self):
+        """關閉 inotify"""
+        os.close(self.fd)
+
+
+class FileWatcher:
+    """檔案監看 - 背景偵測變更，poll() 回報已穩定的變更檔案"""
+    
+    def __init__(self, interval: float = WATCH_POLL_INTERVAL, debounce: float = WATCH_DEBOUNCE,
+                 use_inotify: bool = True):
+        """
+        Args:
+            interval (float): stat 比對的間隔（秒）
+            debounce (float): 最後一次變更後需安靜的秒數，之後才回報
+            use_inotify (bool): 是否嘗試使用 inotify
+        """
+        self.interval = interval
+        self.debounce = debounce
+        self._lock = threading.Lock()
+        self._paths = set()  # 監看中的檔案路徑
+        self._seen = {}  # 檔案路徑 -> 背景比對時最後看到的 stat 簽章
+        self._reported = {}  # 檔案路徑 -> 最後一次回報時的 stat 簽章
+        self._pending = set()  # 可能已變更、等待回報的檔案
+        self._last_event = 0.0
+        
+        # inotify：目錄 -> 監看識別碼，監看識別碼 -> 目錄，目錄 -> 其中監看的檔案名稱
+        self._inotify = None
+        self._dir_watches = {}
+        self._watch_dirs = {}
+        self._dir_names = {}
+        self._polled = set()  # 無法以 inotify 監看、改為比對 stat 的檔案
+        if use_inotify:
+            try:
+                self._inotify = _Inotify()
+            except (OSError, AttributeError) as e:
+                print(f"無法使用 inotify，改為定期比對檔案狀態: {e}")
+        
+        self._stop = threading.Event()
+        self._wake_read, self._wake_write = os.pipe()  # 關閉時喚醒等待中的 select
+        self._thread = threading.Thread(target=self._run, name="FileWatcher", daemon=True)
+        self._thread.start()
+    
+    @property
+    def backend(self) -> str:
+        """目前使用的監看方式（'inotify' 或 'polling'）"""
+        return 'inotify' if self._inotify is not None else 'polling'
+    
+    def set_paths(self, file_paths: Iterable[str]):
+        """
+        設定監看的檔案（只處理新增與移除的部分）
+        
+        Args:
+            file_paths (Iterable[str]): 檔案路徑
+        """
+        file_paths = set(file_paths)
+        with self._lock:
+            added = file_paths - self._paths
+            removed = self._paths - file_paths
+            self._paths = file_paths
+            for file_path in removed:
+                self._seen.pop(file_path, None)
+                self._reported.pop(file_path, None)
+                self._pending.discard(file_path)
+                self._polled.discard(file_path)
+                self._unwatch(file_path)
+            for file_path in added:
+                signature = stat_signature(file_path)
+                self._seen[file_path] = signature
+                self._reported[file_path] = signature
+                self._watch(file_path)
+    
+    def poll(self) -> List[str]:
+        """
+        取得最後一次變更後已安靜 debounce 秒的變更檔案
+        
+        Returns:
+            List[str]: stat 簽章與上次回報時不同的檔案路徑（包含被刪除的檔案）
+        """
+        with self._lock:
+            if not self._pending or time.monotonic() - self._last_event < self.debounce:
+                return []
+            pending, self._pending = self._pending, set()
+        
+        changed = []
+        for file_path in pending:
+            signature = stat_signature(file_path)
+            with self._lock:
+                if file_path not in self._paths or self._reported.get(file_path) == signature:
+                    continue
+                self._reported[file_path] = signature
+                self._seen[file_path] = signature
+            changed.append(file_path)
+        return sorted(changed)
+    
+    def close(self):
+        """停止監看"""
+        self._stop.set()
+        os.write(self._wake_write, b'\0')
+        self._thread.join(timeout=self.interval * 2)
+        os.close(self._wake_read)
+        os.close(self._wake_write)
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+    
+    def _watch(self, file_path: str):
+        """開始監看檔案所在的目錄（需持有鎖）"""
+        if self._inotify is None:
+            return
+        directory, name = os.path.split(file_path)
+        if directory not in self._dir_watches:
+            try:
+                wd = self._inotify.add_watch(directory)
+            except OSError:
+                # 目錄不存在或監看數量已達上限
+                self._polled.add(file_path)
+                return
+            self._dir_watches[directory] = wd
+            self._watch_dirs[wd] = directory
+            self._dir_names[directory] = set()
+        self._dir_names[directory].add(name)
+    
+    def _unwatch(self, file_path: str):
+        """目錄中沒有監看的檔案時停止監看該目錄（需持有鎖）"""
+        if self._inotify is None:
+            return
+        directory, name = os.path.split(file_path)
+        names = self._dir_names.get(directory)
+        if names is None:
+            return
+        names.discard(name)
+        if not names:
+            wd = self._dir_watches.pop(directory)
+            del self._watch_dirs[wd]
+            del self._dir_names[directory]
+            self._inotify.remove_watch(wd)
+    
+    def _mark(self, file_paths: Iterable[str]):
+        """記錄可能已變更的檔案（需持有鎖）"""
+        for file_path in file_paths:
+            self._pending.add(file_path)
+            self._last_event = time.monotonic()
+    
+    def _run(self):
+        """背景執行緒：讀取 inotify 事件，並比對無法以 inotify 監看的檔案"""
+        while not self._stop.is_set():
+            inotify = self._inotify
+            if inotify is not None:
+                try:
+                    ready = select.select([inotify.fd, self._wake_read], [], [], self.interval)[0]
+                except (OSError, ValueError):
+                    break  # 已關閉
+                if self._stop.is_set():
+                    break
+                if inotify.fd in ready:
+                    self._handle_events(inotify.read_events())
+                with self._lock:
+                    polled = list(self._polled)
+            else:
+                self._stop.wait(self.interval)
+                with self._lock:
+                    polled = list(self._paths)
+            
+            for file_path in polled:
+                signature = stat_signature(file_path)
+                with self._lock:
+                    if file_path in self._seen and self._seen[file_path] != signature:
+                        self._seen[file_path] = signature
+                        self._mark([file_path])
+    
+    def _handle_events(self, events: List[tuple]):
+        """
+        將 inotify 事件對應到監看的檔案
+        
+        Args:
+            events (List[tuple]): (監看識別碼, 事件遮罩, 檔案名稱) 列表
+        """
+        with self._lock:
+            for wd, mask, name in events:
+                if mask & IN_Q_OVERFLOW:
+                    # 事件遺失，交由 stat 比對判斷
+                    self._mark(self._paths)
+                    continue
+                directory = self._watch_dirs.get(wd)
+                if directory is None:
+                    continue
+                if mask & IN_IGNORED:
+                    # 目錄已被刪除，其中的檔案改為比對 stat
+                    for missing in self._dir_names.pop(directory, ()):
+                        file_path = os.path.join(directory, missing)
+                        self._polled.add(file_path)
+                        self._mark([file_path])
+                    del self._watch_dirs[wd]
+                    del self._dir_watches[directory]
+                    continue
+                if name in self._dir_names.get(directory, ()):
+                    self._mark([os.path.join(directory, name)])
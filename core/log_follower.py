@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+記錄檔跟隨
+記住每個跟隨中檔案已讀取的位元組位置與 inode，之後只讀取新增的位元組；
+檔案被截斷（大小小於已讀取位置）或輪替（inode 改變）時通知呼叫端重新載入
+"""
+
+import codecs
+import os
+from typing import List, Optional, Tuple
+
+
+class LogFollower:
+    """記錄檔跟隨 - 每個檔案的讀取位置與增量解碼器"""
+    
+    def __init__(self):
+        self._follows = {}  # 檔案路徑 -> {'inode', 'offset', 'decoder', 'pending_cr'}
+    
+    def follow(self, file_path: str, encoding: Optional[str] = None, offset: Optional[int] = None) -> bool:
+        """
+        從已載入的位置開始跟隨（呼叫端應已載入到該位置為止的內容）
+        
+        Args:
+            file_path (str): 檔案路徑
+            encoding (Optional[str]): 檔案載入時偵測到的編碼，預設為 UTF-8
+            offset (Optional[int]): 已讀取的位元組數，載入後新增的內容會在下次輪詢時讀取；
+                None 表示從檔案目前的結尾開始
+                
+        Returns:
+            bool: 是否成功開始跟隨
+        """
+        try:
+            stat = os.stat(file_path)
+        except OSError as e:
+            print(f"跟隨檔案失敗 {file_path}: {e}")
+            return False
+        
+        # BOM 只會出現在檔案開頭，之後新增的內容以一般 UTF-8 解碼
+        if not encoding or encoding == 'utf-8-sig':
+            encoding = 'utf-8'
+        try:
+            decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        except LookupError:
+            decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        
+        self._follows[file_path] = {
+            'inode': stat.st_ino,
+            'offset': stat.st_size if offset is None else offset,
+            'decoder': decoder,
+            'pending_cr': False  # 上次讀到的結尾是 \r，可能與下一次的 \n 組成一個換行
+        }
+        return True
+    
+    def unfollow(self, file_path: str):
+        """
+        停止跟隨檔案
+        
+        Args:
+            file_path (str): 檔案路徑
+        """
+        self._follows.pop(file_path, None)
+    
+    def clear(self):
+        """停止跟隨所有檔案"""
+        self._follows.clear()
+    
+    def is_following(self, file_path: str) -> bool:
+        """
+        檔案是否跟隨中
+        
+        Args:
+            file_path (str): 檔案路徑
+            
+        Returns:
+            bool: 跟隨中時為True
+        """
+        return file_path in self._follows
+    
+    def get_paths(self) -> List[str]:
+        """
+        取得跟隨中的檔案
+        
+        Returns:
+            List[str]: 檔案路徑列表
+        """
+        return list(self._follows)
+    
+    def read_appended(self, file_path: str) -> Tuple[Optional[str], bool]:
+        """
+        讀取上次之後新增的內容
+        
+        Args:
+            file_path (str): 檔案路徑
+            
+        Returns:
+            Tuple[Optional[str], bool]: (新增的文字，沒有新增時為None, 是否需要重新載入整個檔案)
+        """
+        state = self._follows.get(file_path)
+        if state is None:
+            return None, False
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            # 輪替期間檔案可能暫時不存在
+            return None, False
+        
+        if stat.st_ino != state['inode'] or stat.st_size < state['offset']:
+            return None, True
+        if stat.st_size == state['offset']:
+            return None, False
+        
+        try:
+            with open(file_path, 'rb') as file:
+                file.seek(state['offset'])
+                data = file.read(stat.st_size - state['offset'])
+        except OSError as e:
+            print(f"讀取新增內容失敗 {file_path}: {e}")
+            return None, False
+        state['offset'] += len(data)
+        
+        text = state['decoder'].decode(data)
+        if state['pending_cr']:
+            text = '\r' + text
+        state['pending_cr'] = text.endswith('\r')
+        if state['pending_cr']:
+            text = text[:-1]
+        # 與 FileHandler.load_file 相同的換行處理
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        return (text or None), False
+    
+    def poll(self) -> List[Tuple[str, Optional[str], bool]]:
+        """
+        檢查所有跟隨中的檔案（每個檔案只做一次 stat，有新增時才讀取）
+        
+        Returns:
+            List[Tuple[str, Optional[str], bool]]: 有變化的檔案 (檔案路徑, 新增的文字, 是否需要重新載入)
+        """
+        changes = []
+        for file_path in list(self._follows):
+            text, reset = self.read_appended(file_path)
+            if text is not None or reset:
+                changes.append((file_path, text, reset))
+        return changes
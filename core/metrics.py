@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+效能數據
+在熱點（檔案讀取與解碼、合併、狀態存取、文字顯示、剪貼簿）記錄耗時與計數，
+可在除錯面板查看百分位數，或以 JSON 輸出。預設停用，停用時每次呼叫只多一次
+旗標檢查，不取時間也不加鎖
+"""
+
+import functools
+import json
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+from utils.constants import METRICS_MAX_SAMPLES, METRICS_PERCENTILES
+
+_enabled = False
+_lock = threading.Lock()
+_timers = {}  # 名稱 -> {'count', 'total', 'max', 'samples'}（samples 只保留最近的耗時）
+_counters = {}  # 名稱 -> 累計值
+
+
+def enable(flag: bool = True):
+    """
+    啟用或停用記錄（停用時保留已記錄的數據）
+    
+    Args:
+        flag (bool): 是否啟用
+    """
+    global _enabled
+    _enabled = flag
+
+
+def is_enabled() -> bool:
+    """
+    是否正在記錄
+    
+    Returns:
+        bool: 啟用時為True
+    """
+    return _enabled
+
+
+def timed(name: str) -> Callable:
+    """
+    記錄函數耗時的裝飾器
+    
+    Args:
+        name (str): 數據名稱
+        
+    Returns:
+        Callable: 裝飾器
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+
+class _Measure:
+    """記錄區塊耗時的 with 敘述"""
+    
+    __slots__ = ('name', 'started')
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.perf_counter()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        record(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class _NullMeasure:
+    """停用時使用的 with 敘述（不做任何事）"""
+    
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_MEASURE = _NullMeasure()
+
+
+def measure(name: str):
+    """
+    記錄區塊耗時（with metrics.measure('name'): ...）
+    
+    Args:
+        name (str): 數據名稱
+        
+    Returns:
+        with 敘述物件
+    """
+    return _Measure(name) if _enabled else _NULL_MEASURE
+
+
+def record(name: str, seconds: float):
+    """
+    記錄一次耗時
+    
+    Args:
+        name (str): 數據名稱
+        seconds (float): 耗時（秒）
+    """
+    with _lock:
+        timer = _timers.get(name)
+        if timer is None:
+            timer = _timers[name] = {'count': 0, 'total': 0.0, 'max': 0.0,
+                                     'samples': deque(maxlen=METRICS_MAX_SAMPLES)}
+        timer['count'] += 1
+        timer['total'] += seconds
+        if seconds > timer['max']:
+            timer['max'] = seconds
+        timer['samples'].append(seconds)
+
+
+def increment(name: str, amount: int = 1):
+    """
+    累加計數（停用時不記錄）
+    
+    Args:
+        name (str): 數據名稱
+        amount (int): 增加量
+    """
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def reset():
+    """清除所有已記錄的數據"""
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+
+
+def snapshot() -> Dict[str, Any]:
+    """
+    取得目前的數據（耗時以毫秒表示，百分位數依最近的樣本計算）
+    
+    Returns:
+        Dict[str, Any]: {'enabled', 'timers': {名稱: {'count', 'total_ms', 'mean_ms', 'p50_ms', ..., 'max_ms'}},
+                         'counters': {名稱: 累計值}}
+    """
+    with _lock:
+        timers = {name: (timer['count'], timer['total'], timer['max'], list(timer['samples']))
+                  for name, timer in _timers.items()}
+        counters = dict(_counters)
+    
+    results = {}
+    for name, (count, total, longest, samples) in sorted(timers.items()):
+        samples.sort()
+        result = {'count': count, 'total_ms': _ms(total), 'mean_ms': _ms(total / count)}
+        for percentile in METRICS_PERCENTILES:
+            result[f'p{percentile}_ms'] = _ms(_percentile(samples, percentile))
+        result['max_ms'] = _ms(longest)
+        results[name] = result
+    return {'enabled': _enabled, 'timers': results, 'counters': dict(sorted(counters.items()))}
+
+
+def dump(file_path: Optional[str] = None, stream=None):
+    """
+    以 JSON 輸出目前的數據
+    
+    Args:
+        file_path (Optional[str]): 輸出檔案路徑
+        stream: 未指定檔案時的輸出（具有 write 方法），例如標準錯誤
+    """
+    text = json.dumps(snapshot(), indent=2, ensure_ascii=False)
+    if file_path:
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+    elif stream is not None:
+        stream.write(text + "\n")
+
+
+def _percentile(samples, percentile: int) -> float:
+    """
+    取得已排序樣本的百分位數（最近秩法）
+    
+    Args:
+        samples: 已排序的樣本
+        percentile (int): 百分位（0-100）
+        
+    Returns:
+        float: 百分位數，沒有樣本時為0
+    """
+    if not samples:
+        return 0.0
+    index = max(0, -(-len(samples) * percentile // 100) - 1)
+    return samples[min(index, len(samples) - 1)]
+
+
+def _ms(seconds: float) -> float:
+    """秒轉換為毫秒（保留三位小數）"""
+    return round(seconds * 1000, 3)
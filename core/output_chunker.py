@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+"""
+分段輸出
+將合併內容切成多段，每段不超過位元組或 token 上限，
+優先在檔案邊界、其次在行邊界切斷。先以一次走訪決定切點，
+再以產生器逐段產生，不需組出完整內容
+"""
+
+from bisect import bisect_right
+from typing import Callable, Iterable, Iterator, List, Tuple
+from core.text_stats import build_line_offsets
+
+
+# 每段開頭的標題
+PART_HEADER = "--- part {}/{} ---"
+
+# 預設的檔案分隔（來源中與分隔相同的片段視為檔案邊界）
+SEPARATOR = "\n\n"
+
+
+class OutputChunker:
+    """分段輸出 - 規劃切點並逐段產生內容"""
+    
+    def __init__(self, make_source: Callable[[], Iterable[str]], limit: int,
+                 measure: Callable[[str], int], separator: str = SEPARATOR,
+                 prologue: str = "", epilogue: str = ""):
+        """
+        Args:
+            make_source (Callable[[], Iterable[str]]): 每次呼叫回傳一個新的內容片段串流
+                （需為同一份快照，會呼叫兩次：規劃與產生）
+            limit (int): 每段的上限（與 measure 的單位相同，包含段落標題）
+            measure (Callable[[str], int]): 計算文字大小的函數
+            separator (str): 來源中檔案之間的分隔片段（依輸出格式而定）
+            prologue (str): 來源開頭的獨立片段（例如 XML 根元素的開始標籤），每段都會重複輸出
+                （檔案被切成多段時，該檔案所在的段落本身仍不是完整的檔案區塊）
+            epilogue (str): 來源結尾的獨立片段，每段都會重複輸出
+            
+        Raises:
+            ValueError: 上限不大於段落標題與開頭、結尾的大小（無法放入任何內容）
+        """
+        self.make_source = make_source
+        self.limit = limit
+        self.measure = measure
+        self.separator = separator
+        self.prologue = prologue
+        self.epilogue = epilogue
+        # 每段固定的大小：段落標題（以最大的編號計算）與重複輸出的開頭與結尾
+        self._overhead = measure(PART_HEADER.format(99999, 99999) + "\n") + measure(prologue + epilogue)
+        if limit <= self._overhead:
+            raise ValueError(f"Part limit {limit} must be larger than the part header ({self._overhead})")
+        self._splits = None  # 各段（第一段除外）在串流中的起始字元位置
+    
+    def plan(self) -> int:
+        """
+        走訪一次來源並決定切點
+        
+        Returns:
+            int: 段數（來源為空時為0）
+        """
+        if self._splits is not None:
+            return self._part_count
+        
+        body_limit = self.limit - self._overhead
+        
+        splits = []
+        used = 0
+        offset = 0
+        for block in self._iter_blocks(self._iter_body(), self.separator):
+            size = sum(self.measure(piece) for piece in block)
+            length = sum(len(piece) for piece in block)
+            
+            if used + size <= body_limit:
+                used += size
+            elif size <= body_limit:
+                # 整個檔案可放進新的一段：在檔案邊界切斷
+                splits.append(offset)
+                used = size
+            else:
+                used = self._split_block("".join(block), offset, body_limit, used, splits)
+            offset += length
+        
+        self._splits = splits
+        self._part_count = len(splits) + 1 if offset else 0
+        return self._part_count
+    
+    def iter_parts(self) -> Iterator[Tuple[int, int, str]]:
+        """
+        逐段產生內容（第一次取值時規劃切點）
+        
+        Returns:
+            Iterator[Tuple[int, int, str]]: (段落編號（從1開始）, 總段數, 含標題的段落文字)
+        """
+        total = self.plan()
+        if not total:
+            return
+        
+        boundaries = self._splits + [None]
+        part = 1
+        pieces = []
+        offset = 0
+        for piece in self._iter_body():
+            start = 0
+            while boundaries[part - 1] is not None and boundaries[part - 1] < offset + len(piece):
+                cut = boundaries[part - 1] - offset
+                pieces.append(piece[start:cut])
+                yield part, total, self._format_part(part, total, pieces)
+                part += 1
+                pieces = []
+                start = cut
+            pieces.append(piece[start:] if start else piece)
+            offset += len(piece)
+        
+        yield part, total, self._format_part(part, total, pieces)
+    
+    def _format_part(self, part: int, total: int, pieces: List[str]) -> str:
+        """組合段落標題、開頭、內容與結尾（每段都是完整的輸出）"""
+        return PART_HEADER.format(part, total) + "\n" + self.prologue + "".join(pieces) + self.epilogue
+    
+    def _iter_body(self) -> Iterator[str]:
+        """
+        產生來源片段，略過開頭與結尾的片段（由 _format_part 在每段重複輸出）
+        
+        Returns:
+            Iterator[str]: 內容片段
+        """
+        pending = None
+        for i, piece in enumerate(self.make_source()):
+            if i == 0 and self.prologue and piece == self.prologue:
+                continue
+            if pending is not None:
+                yield pending
+            pending = piece
+        if pending is not None and not (self.epilogue and pending == self.epilogue):
+            yield pending
+    
+    @staticmethod
+    def _iter_blocks(source: Iterable[str], separator: str) -> Iterator[List[str]]:
+        """
+        將來源片段依檔案分組（每組以分隔片段結尾）
+        
+        Args:
+            source (Iterable[str]): 內容片段
+            separator (str): 檔案之間的分隔片段
+            
+        Returns:
+            Iterator[List[str]]: 每個檔案的片段列表
+        """
+        block = []
+        for piece in source:
+            block.append(piece)
+            if piece == separator:
+                yield block
+                block = []
+        if block:
+            yield block
+    
+    def _split_block(self, text: str, offset: int, body_limit: int, used: int,
+                     splits: List[int]) -> int:
+        """
+        將超過一段上限的檔案在行邊界（必要時在字元處）切成多段
+        
+        Args:
+            text (str): 檔案的完整輸出文字
+            offset (int): 檔案在串流中的起始字元位置
+            body_limit (int): 每段內容的上限
+            used (int): 目前這一段已使用的大小
+            splits (List[int]): 切點列表（就地新增）
+            
+        Returns:
+            int: 最後一段已使用的大小
+        """
+        offsets = build_line_offsets(text)
+        pos = 0
+        while pos < len(text):
+            end = self._largest_fit(text, offsets, pos, body_limit - used)
+            if end == len(text):
+                return used + self.measure(text[pos:])
+            
+            if end == pos:
+                if used:
+                    # 目前這一段放不下任何一行：從新的一段開始
+                    splits.append(offset + pos)
+                    used = 0
+                    continue
+                end = self._largest_char_fit(text, pos, body_limit)
+            
+            splits.append(offset + end)
+            used = 0
+            pos = end
+        return used
+    
+    def _search_limit(self, text: str, pos: int, budget: int) -> int:
+        """
+        以倍增找出從 pos 開始一定超過 budget 的位置（或文字結尾），
+        之後的二分搜尋只需量測這個範圍，不必每次量測整個剩餘內容
+        
+        Returns:
+            int: 搜尋範圍的結束位置
+        """
+        window = max(1, budget)
+        while pos + window < len(text) and self.measure(text[pos:pos + window]) <= budget:
+            window *= 2
+        return min(len(text), pos + window)
+    
+    def _largest_fit(self, text: str, offsets, pos: int, budget: int) -> int:
+        """
+        以二分搜尋找出從 pos 開始、大小不超過 budget 的最後一個行邊界
+        
+        Returns:
+            int: 行邊界位置（下一行的起始位置）；剩餘內容全部放得下時為文字長度；
+                沒有任何完整行可放入時返回 pos
+        """
+        limit = self._search_limit(text, pos, budget)
+        if limit == len(text) and self.measure(text[pos:]) <= budget:
+            return len(text)
+        
+        low = bisect_right(offsets, pos)  # 第一個在 pos 之後開始的行
+        high = bisect_right(offsets, limit) - 1  # 最後一個在搜尋範圍內開始的行
+        best = pos
+        while low <= high:
+            middle = (low + high) // 2
+            if self.measure(text[pos:offsets[middle]]) <= budget:
+                best = offsets[middle]
+                low = middle + 1
+            else:
+                high = middle - 1
+        return best
+    
+    def _largest_char_fit(self, text: str, pos: int, budget: int) -> int:
+        """
+        以二分搜尋找出從 pos 開始、大小不超過 budget 的最長字元範圍（至少一個字元）
+        
+        Returns:
+            int: 結束位置
+        """
+        low, high = pos + 1, self._search_limit(text, pos, budget)
+        best = pos + 1
+        while low <= high:
+            middle = (low + high) // 2
+            if self.measure(text[pos:middle]) <= budget:
+                best = middle
+                low = middle + 1
+            else:
+                high = middle - 1
+        return best
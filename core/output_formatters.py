@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+"""
+輸出格式
+將檔案快照格式化為合併輸出：純文字標題、Markdown 程式碼區塊、
+XML 標籤與 JSONL。每個檔案的標題與結尾依路徑快取（數量有上限），
+切換格式時不需重新讀取或掃描檔案內容
+"""
+
+import html
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Iterator, List, Tuple
+from utils.constants import FORMATTER_CACHE_SIZE
+
+
+# 依副檔名推斷 Markdown 程式碼區塊的語言
+EXTENSION_LANGUAGES = {
+    '.py': 'python', '.cpp': 'cpp', '.c': 'c', '.h': 'c', '.hpp': 'cpp',
+    '.java': 'java', '.js': 'javascript', '.html': 'html', '.css': 'css',
+    '.xml': 'xml', '.json': 'json', '.md': 'markdown', '.mdc': 'markdown',
+    '.rst': 'rst', '.yaml': 'yaml', '.yml': 'yaml', '.ini': 'ini',
+    '.cfg': 'ini', '.conf': 'ini', '.sql': 'sql', '.sh': 'bash', '.bat': 'bat',
+    '.ps1': 'powershell', '.php': 'php', '.rb': 'ruby', '.go': 'go',
+    '.rs': 'rust', '.swift': 'swift', '.kt': 'kotlin', '.scala': 'scala',
+    '.r': 'r', '.m': 'objectivec', '.mm': 'objectivec', '.cs': 'csharp',
+    '.vb': 'vbnet', '.pl': 'perl', '.lua': 'lua', '.tcl': 'tcl',
+    '.asm': 'asm', '.s': 'asm', '.log': 'log'
+}
+
+# 內容中連續的反引號（決定 Markdown 區塊圍欄的長度）
+_BACKTICK_RUN = re.compile(r'`{3,}')
+
+
+class OutputFormatter:
+    """輸出格式基底類別 - 預設為原本的純文字格式"""
+    
+    name = 'plain'
+    extension = '.txt'
+    separator = "\n\n"  # 檔案之間的分隔
+    prologue = ""  # 整個輸出的開頭（例如 XML 的根元素），為獨立的片段
+    epilogue = ""  # 整個輸出的結尾，為獨立的片段
+    transforms_body = False  # format_body 是否會改變內容
+    
+    def __init__(self):
+        self._cache = OrderedDict()  # 快取鍵 -> (標題, 結尾)，最多 FORMATTER_CACHE_SIZE 筆
+        self._cache_lock = threading.Lock()  # 背景輸出與UI執行緒共用同一個格式物件
+    
+    def format_entry(self, file_path: str, content: str) -> Tuple[str, str, str]:
+        """
+        格式化單一檔案
+        
+        Args:
+            file_path (str): 檔案路徑
+            content (str): 檔案內容
+            
+        Returns:
+            Tuple[str, str, str]: (標題, 內容, 結尾)
+        """
+        header, footer = self.get_wrapper(file_path, content)
+        return header, self.format_body(content), footer
+    
+    def get_wrapper(self, file_path: str, content: str) -> Tuple[str, str]:
+        """
+        取得檔案的標題與結尾（不轉換內容，供預算分配計算額外大小）
+        
+        Args:
+            file_path (str): 檔案路徑
+            content (str): 檔案內容
+            
+        Returns:
+            Tuple[str, str]: (標題, 結尾)
+        """
+        return self._get_wrapper(file_path)
+    
+    def format_body(self, content: str) -> str:
+        """
+        轉換檔案內容（預設不變）
+        
+        Args:
+            content (str): 檔案內容
+            
+        Returns:
+            str: 輸出的內容
+        """
+        return content
+    
+    def iter_format(self, entries: List[Tuple[str, str]]) -> Iterator[str]:
+        """
+        以串流方式產生格式化後的合併輸出
+        
+        Args:
+            entries (List[Tuple[str, str]]): 檔案快照（路徑, 內容）
+            
+        Returns:
+            Iterator[str]: 輸出片段（分隔符號、開頭與結尾為獨立的片段）
+        """
+        if self.prologue:
+            yield self.prologue
+        for i, (file_path, content) in enumerate(entries):
+            if i:
+                yield self.separator
+            for piece in self.format_entry(file_path, content):
+                if piece:
+                    yield piece
+        if self.epilogue:
+            yield self.epilogue
+    
+    def clear_cache(self):
+        """清除快取的標題與結尾"""
+        with self._cache_lock:
+            self._cache.clear()
+    
+    def _get_wrapper(self, file_path: str, key=None) -> Tuple[str, str]:
+        """
+        取得快取的標題與結尾
+        
+        Args:
+            file_path (str): 檔案路徑
+            key: 快取鍵，預設為檔案路徑
+            
+        Returns:
+            Tuple[str, str]: (標題, 結尾)
+        """
+        key = file_path if key is None else key
+        with self._cache_lock:
+            wrapper = self._cache.get(key)
+            if wrapper is not None:
+                self._cache.move_to_end(key)
+                return wrapper
+        
+        wrapper = self._build_wrapper(file_path, key)
+        with self._cache_lock:
+            self._cache[key] = wrapper
+            while len(self._cache) > FORMATTER_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return wrapper
+    
+    def _build_wrapper(self, file_path: str, key) -> Tuple[str, str]:
+        """建立標題與結尾"""
+        return f"=== {os.path.basename(file_path)} ===\n", ""
+
+
+class MarkdownFormatter(OutputFormatter):
+    """Markdown 格式 - 每個檔案一個程式碼區塊，語言依副檔名推斷"""
+    
+    name = 'markdown'
+    extension = '.md'
+    
+    def get_wrapper(self, file_path: str, content: str) -> Tuple[str, str]:
+        # 內容本身含有圍欄時使用更長的圍欄
+        fence = 3
+        if '```' in content:
+            fence = max(len(run) for run in _BACKTICK_RUN.findall(content)) + 1
+        return self._get_wrapper(file_path, (file_path, fence))
+    
+    def _build_wrapper(self, file_path: str, key) -> Tuple[str, str]:
+        fence = '`' * key[1]
+        language = EXTENSION_LANGUAGES.get(os.path.splitext(file_path)[1].lower(), '')
+        return f"### {os.path.basename(file_path)}\n\n{fence}{language}\n", f"\n{fence}"
+
+
+class XmlFormatter(OutputFormatter):
+    """XML 格式 - <files> 根元素中每個檔案一個 <file path="..."> 區塊，內容放在 CDATA 中"""
+    
+    name = 'xml'
+    extension = '.xml'
+    separator = "\n"
+    prologue = "<files>\n"
+    epilogue = "\n</files>\n"
+    transforms_body = True
+    
+    def format_body(self, content: str) -> str:
+        # 內容中的 ]]> 會結束 CDATA：拆成兩個相鄰的 CDATA 區段
+        if ']]>' in content:
+            return content.replace(']]>', ']]]]><![CDATA[>')
+        return content
+    
+    def _build_wrapper(self, file_path: str, key) -> Tuple[str, str]:
+        return f'<file path="{html.escape(file_path)}">\n<![CDATA[', "]]>\n</file>"
+
+
+class JsonlFormatter(OutputFormatter):
+    """JSONL 格式 - 每個檔案一行 {"path": ..., "content": ...}（每行都以換行結尾）"""
+    
+    name = 'jsonl'
+    extension = '.jsonl'
+    separator = ""  # 換行屬於結尾，最後一筆也以換行結尾
+    transforms_body = True
+    
+    def format_body(self, content: str) -> str:
+        # 只取 JSON 字串的內部，前後的引號屬於標題與結尾
+        return json.dumps(content, ensure_ascii=False)[1:-1]
+    
+    def _build_wrapper(self, file_path: str, key) -> Tuple[str, str]:
+        return '{"path": ' + json.dumps(file_path, ensure_ascii=False) + ', "content": "', '"}\n'
+
+
+# 格式名稱 -> 共用的格式物件（保留快取；註冊時就地更新，匯入的模組都能看到新格式）
+_FORMATTERS = {}
+for _formatter_class in (OutputFormatter, MarkdownFormatter, XmlFormatter, JsonlFormatter):
+    _FORMATTERS[_formatter_class.name] = _formatter_class()
+
+
+def get_format_names() -> Tuple[str, ...]:
+    """
+    取得已註冊的輸出格式名稱
+    
+    Returns:
+        Tuple[str, ...]: 依註冊順序的格式名稱
+    """
+    return tuple(_FORMATTERS)
+
+
+def get_formatter(name: str = 'plain') -> OutputFormatter:
+    """
+    取得輸出格式
+    
+    Args:
+        name (str): 格式名稱（get_format_names() 之一）
+        
+    Returns:
+        OutputFormatter: 格式物件，名稱不存在時返回純文字格式
+    """
+    return _FORMATTERS.get(name, _FORMATTERS['plain'])
+
+
+def register_formatter(formatter: OutputFormatter):
+    """
+    註冊輸出格式
+    
+    Args:
+        formatter (OutputFormatter): 格式物件
+    """
+    _FORMATTERS[formatter.name] = formatter
@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+"""
+全文搜尋引擎
+為每個檔案在背景建立輕量三元組索引（大小依檔案的三元組數量而定），
+支援純文字與正規表示式搜尋，結果依檔案分組（行偏移表只為有命中的檔案建立）
+"""
+
+import re
+import threading
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional, Tuple
+from core.file_handler import EVENT_CLEARED, EVENT_INSERTED, EVENT_REMOVED, EVENT_REPLACED
+from core.task_executor import Task, TaskExecutor
+from core.text_stats import build_line_offsets
+from utils.constants import (MAX_SEARCH_HITS, TRIGRAM_BITS_PER_GRAM, TRIGRAM_MAX_BITS, TRIGRAM_MAX_CHARS,
+                             TRIGRAM_MIN_BITS)
+
+
+class _CaseFoldTable(dict):
+    """
+    str.translate 使用的逐字元大小寫對應表（第一次遇到的字元才計算）
+    
+    str.lower() 可能改變字串長度（例如 'İ' 變成兩個字元），re.IGNORECASE 則是逐字元比較，
+    並將 'ı'、'ſ' 等大寫相同的字元視為相同；先轉小寫、再轉大寫、再轉小寫（各取第一個字元）
+    可讓 re.IGNORECASE 視為相同的字元對應到同一個字元，且長度不變。
+    """
+    
+    def __missing__(self, code: int) -> str:
+        folded = chr(code).lower()[0].upper()[0].lower()[0]
+        self[code] = folded
+        return folded
+
+
+_CASE_FOLD = _CaseFoldTable()
+
+
+def _fold_case(text: str) -> str:
+    """
+    逐字元轉為不分大小寫的形式（與 re.IGNORECASE 一致，長度不變）
+    
+    Args:
+        text (str): 文字
+        
+    Returns:
+        str: 轉換後的文字
+    """
+    if text.isascii():
+        return text.lower()
+    return text.translate(_CASE_FOLD)
+
+
+class SearchEngine:
+    """全文搜尋引擎 - 監聽檔案模型變更並以增量方式維護索引"""
+    
+    def __init__(self, file_handler, executor: Optional[TaskExecutor] = None):
+        """
+        Args:
+            file_handler (FileHandler): 檔案模型
+            executor (Optional[TaskExecutor]): 共用的背景工作執行器，預設自行建立
+        """
+        self.file_handler = file_handler
+        self._indexes = {}  # 檔案路徑 -> {'content', 'trigrams'}
+        self._lock = threading.Lock()
+        self._owns_executor = executor is None
+        self._executor = executor or TaskExecutor(background_workers=1)
+        self._tasks = {}  # 檔案路徑 -> 進行中的索引工作（只在UI執行緒存取）
+        
+        # 為已載入的檔案建立索引，並監聽之後的變更
+        for file_path, content in file_handler.get_entries():
+            self._submit(file_path, content)
+        file_handler.add_observer(self)
+    
+    def on_files_changed(self, event: dict):
+        """
+        檔案模型變更通知（觀察者模式）
+        
+        Args:
+            event (dict): 變更事件
+        """
+        event_type = event['type']
+        if event_type in (EVENT_INSERTED, EVENT_REPLACED):
+            self._submit(event['path'], self.file_handler.file_contents[event['index']])
+        elif event_type == EVENT_REMOVED:
+            self._cancel(event['path'])
+            with self._lock:
+                self._indexes.pop(event['path'], None)
+        elif event_type == EVENT_CLEARED:
+            for file_path in list(self._tasks):
+                self._cancel(file_path)
+            with self._lock:
+                self._indexes.clear()
+    
+    def search(self, query: str, entries: List[Tuple[str, str]], use_regex: bool = False,
+               case_sensitive: bool = False, task: Optional[Task] = None) -> Dict[str, Any]:
+        """
+        在檔案快照中搜尋
+        
+        Args:
+            query (str): 搜尋字串或正規表示式
+            entries (List[Tuple[str, str]]): 檔案快照（路徑, 內容），可在背景執行緒中使用
+            use_regex (bool): 是否為正規表示式
+            case_sensitive (bool): 是否區分大小寫
+            task (Optional[Task]): 執行此搜尋的背景工作（每個檔案檢查一次取消並回報進度）
+            
+        Returns:
+            Dict[str, Any]: {'files': [{'path', 'hits': [{'line', 'column', 'length', 'text'}]}],
+                             'total_hits': 總命中數, 'truncated': 是否因數量上限而截斷}
+                             
+        Raises:
+            re.error: 正規表示式無效
+            TaskCancelled: 工作已取消
+        """
+        results = {'files': [], 'total_hits': 0, 'truncated': False}
+        if not query:
+            return results
+        
+        flags = 0 if case_sensitive else re.IGNORECASE
+        pattern = re.compile(query if use_regex else re.escape(query), flags)
+        query_grams = None if use_regex else self._query_trigrams(query)
+        
+        for number, (file_path, content) in enumerate(entries):
+            if task is not None:
+                task.token.check()
+                task.report(number, len(entries))
+            index = self._get_index(file_path, content)
+            
+            # 三元組索引判斷不可能包含時直接略過
+            if query_grams and index and index['trigrams'] is not None:
+                if not self._may_contain(index['trigrams'], query_grams):
+                    continue
+            
+            hits = []
+            offsets = None
+            for match in pattern.finditer(content):
+                if match.start() == match.end():
+                    continue
+                if results['total_hits'] + len(hits) >= MAX_SEARCH_HITS:
+                    # 超過上限的命中才標示為截斷
+                    results['truncated'] = True
+                    break
+                if offsets is None:
+                    offsets = build_line_offsets(content)
+                line = bisect_right(offsets, match.start()) - 1
+                line_start = offsets[line]
+                hits.append({
+                    'line': line,
+                    'column': match.start() - line_start,
+                    'length': match.end() - match.start(),
+                    'text': content[line_start:offsets[line + 1] - 1][:200]
+                })
+            
+            if hits:
+                results['files'].append({'path': file_path, 'hits': hits})
+                results['total_hits'] += len(hits)
+            if results['truncated']:
+                break
+        
+        return results
+    
+    def close(self):
+        """取消進行中的索引並移除觀察者（自行建立的執行器一併關閉）"""
+        self.file_handler.remove_observer(self)
+        for file_path in list(self._tasks):
+            self._cancel(file_path)
+        if self._owns_executor:
+            self._executor.shutdown()
+    
+    def _get_index(self, file_path: str, content: str) -> Optional[Dict[str, Any]]:
+        """
+        取得與目前內容一致的索引，尚未建立或已過期時返回None
+        
+        Args:
+            file_path (str): 檔案路徑
+            content (str): 目前內容
+            
+        Returns:
+            Optional[Dict[str, Any]]: 索引
+        """
+        with self._lock:
+            index = self._indexes.get(file_path)
+        if index is not None and index['content'] is content:
+            return index
+        return None
+    
+    def _submit(self, file_path: str, content: str):
+        """
+        排入檔案的背景索引（取代同一檔案尚未完成的索引）
+        
+        Args:
+            file_path (str): 檔案路徑
+            content (str): 檔案內容
+        """
+        self._cancel(file_path)
+        self._tasks[file_path] = self._executor.submit(
+            self._build_index, file_path, content, background=True, pass_task=True,
+            on_done=lambda _: self._tasks.pop(file_path, None))
+    
+    def _cancel(self, file_path: str):
+        """
+        取消檔案進行中的索引
+        
+        Args:
+            file_path (str): 檔案路徑
+        """
+        task = self._tasks.pop(file_path, None)
+        if task is not None:
+            task.cancel()
+    
+    def _build_index(self, task: Task, file_path: str, content: str):
+        """
+        建立檔案的索引（在背景執行緒執行）
+        
+        Args:
+            task (Task): 此索引工作（內容再次變更時會被取消）
+            file_path (str): 檔案路徑
+            content (str): 檔案內容
+        """
+        try:
+            index = {
+                'content': content,
+                'trigrams': self._build_trigrams(content)
+            }
+        except Exception as e:
+            print(f"建立搜尋索引失敗 {file_path}: {e}")
+            return
+        
+        # 已被較新的內容取代時不保存（檢查與保存都在鎖內，不會覆蓋較新的索引）
+        with self._lock:
+            if not task.cancelled:
+                self._indexes[file_path] = index
+    
+    @staticmethod
+    def _build_trigrams(content: str) -> Optional[bytearray]:
+        """
+        建立以位元集合表示的三元組索引（以 _fold_case 不分大小寫）
+        
+        集合大小為不同三元組數量乘以 TRIGRAM_BITS_PER_GRAM（取2的次方），
+        小檔案不佔用固定大小的集合，大檔案也不會因集合飽和而失去篩選效果。
+        過大的檔案不建立三元組索引，搜尋時直接掃描。
+        
+        Args:
+            content (str): 檔案內容
+            
+        Returns:
+            Optional[bytearray]: 位元集合（位元數為 len * 8）
+        """
+        if len(content) > TRIGRAM_MAX_CHARS:
+            return None
+        
+        lowered = _fold_case(content)
+        grams = set(zip(lowered, lowered[1:], lowered[2:]))
+        size = TRIGRAM_MIN_BITS
+        while size < len(grams) * TRIGRAM_BITS_PER_GRAM and size < TRIGRAM_MAX_BITS:
+            size <<= 1
+        mask = size - 1
+        bits = bytearray(size >> 3)
+        for gram in grams:
+            slot = hash(gram) & mask
+            bits[slot >> 3] |= 1 << (slot & 7)
+        return bits
+    
+    @staticmethod
+    def _query_trigrams(query: str) -> List[int]:
+        """取得搜尋字串的三元組雜湊值（比對時依各檔案的集合大小取位元位置）"""
+        lowered = _fold_case(query)
+        return [hash(gram) for gram in set(zip(lowered, lowered[1:], lowered[2:]))]
+    
+    @staticmethod
+    def _may_contain(bits: bytearray, hashes: List[int]) -> bool:
+        """檢查檔案的三元組位元集合是否包含搜尋字串的所有三元組"""
+        mask = len(bits) * 8 - 1
+        for value in hashes:
+            slot = value & mask
+            if not bits[slot >> 3] & (1 << (slot & 7)):
+                return False
+        return True
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+分段輸出檔案
+將每個檔案格式化後的輸出保存為一段，檔案變更時只重新讀取與格式化變更的檔案，
+並只改寫輸出檔案中從第一個變更段落開始的部分（長度不變時只改寫該段落）
+"""
+
+import os
+from typing import Iterable, List, Optional, Tuple
+from core.file_handler import FileHandler
+from core.output_formatters import OutputFormatter, get_formatter
+
+
+class SegmentedOutput:
+    """分段輸出檔案 - 監看模式中保持輸出檔案與來源檔案同步"""
+    
+    def __init__(self, output_path: str, formatter: Optional[OutputFormatter] = None,
+                 reducer=None, errors=None):
+        """
+        Args:
+            output_path (str): 輸出檔案路徑
+            formatter (Optional[OutputFormatter]): 輸出格式，預設為純文字
+            reducer (Optional[ContentReducer]): 內容精簡，None 表示不精簡
+            errors: 讀取失敗訊息的輸出（具有 write 方法），None 表示使用 print
+        """
+        self.output_path = output_path
+        self.formatter = formatter or get_formatter()
+        self.reducer = reducer
+        self.errors = errors
+        self._separator = self.formatter.separator.encode('utf-8')
+        self._prologue = self.formatter.prologue.encode('utf-8')
+        self._epilogue = self.formatter.epilogue.encode('utf-8')
+        self._paths = []  # 依輸出順序的檔案路徑
+        self._indices = {}  # 檔案路徑 -> 索引
+        self._segments = []  # 每個檔案格式化後的輸出（UTF-8，不含分隔符號；無法讀取時為空）
+    
+    def build(self, file_paths: Iterable[str]) -> int:
+        """
+        讀取所有檔案並寫入完整的輸出
+        
+        Args:
+            file_paths (Iterable[str]): 依輸出順序的檔案路徑
+            
+        Returns:
+            int: 寫入的位元組數
+        """
+        self._paths = list(file_paths)
+        self._indices = {file_path: i for i, file_path in enumerate(self._paths)}
+        self._segments = [self._render(file_path) for file_path in self._paths]
+        return self._write_from(0)
+    
+    def update(self, file_paths: Iterable[str]) -> Tuple[int, int]:
+        """
+        重新讀取變更的檔案並改寫輸出檔案中受影響的部分
+        
+        Args:
+            file_paths (Iterable[str]): 變更的檔案路徑（不在輸出中的路徑會被忽略）
+            
+        Returns:
+            Tuple[int, int]: (更新的檔案數, 寫入的位元組數)
+        """
+        old_layout = self._layout()
+        changed = []
+        for file_path in file_paths:
+            index = self._indices.get(file_path)
+            if index is None:
+                continue
+            segment = self._render(file_path)
+            if segment != self._segments[index]:
+                self._segments[index] = segment
+                changed.append(index)
+        if not changed:
+            return 0, 0
+        
+        # 輸出檔案被外部修改或刪除時重新寫入全部內容
+        body_end = old_layout[-1][0] + old_layout[-1][1] if old_layout else len(self._prologue)
+        expected_size = body_end + len(self._epilogue)
+        try:
+            intact = os.path.getsize(self.output_path) == expected_size
+        except OSError:
+            intact = False
+        if not intact:
+            return len(changed), self._write_from(0)
+        
+        new_layout = self._layout()
+        if all(new_layout[i] == old_layout[i] for i in changed):
+            # 每個變更段落的位置與長度都不變，只改寫這些段落
+            written = 0
+            with open(self.output_path, 'r+b') as output:
+                for index in sorted(changed):
+                    offset, _ = new_layout[index]
+                    output.seek(offset)
+                    output.write(self._segments[index])
+                    written += len(self._segments[index])
+            return len(changed), written
+        return len(changed), self._write_from(min(changed))
+    
+    def get_paths(self) -> List[str]:
+        """
+        取得輸出中的檔案路徑
+        
+        Returns:
+            List[str]: 依輸出順序的檔案路徑
+        """
+        return list(self._paths)
+    
+    def _render(self, file_path: str) -> bytes:
+        """
+        讀取並格式化單一檔案
+        
+        Args:
+            file_path (str): 檔案路徑
+            
+        Returns:
+            bytes: 格式化後的輸出，無法讀取時為空
+        """
+        try:
+            content, _ = FileHandler.load_file(file_path)
+        except Exception as e:
+            if self.errors is not None:
+                self.errors.write(f"skipped (read failed: {e}): {file_path}\n")
+            else:
+                print(f"讀取檔案失敗 {file_path}: {e}")
+            return b""
+        entries = [(file_path, content)]
+        if self.reducer is not None:
+            entries = self.reducer.reduce_entries(entries)
+        # 只格式化這個檔案，整個輸出的開頭與結尾由 _write_from 寫入
+        pieces = [piece for entry in entries for piece in self.formatter.format_entry(*entry)]
+        return "".join(pieces).encode('utf-8', 'surrogatepass')
+    
+    def _layout(self) -> List[Tuple[int, int]]:
+        """
+        計算每個段落在輸出檔案中的位置（段落在整個輸出的開頭之後，
+        分隔符號只出現在兩個非空段落之間）
+        
+        Returns:
+            List[Tuple[int, int]]: 每個段落的 (起始位置, 長度)，起始位置不含前方的分隔符號
+        """
+        layout = []
+        offset = len(self._prologue)
+        preceded = False
+        for segment in self._segments:
+            if segment and preceded:
+                offset += len(self._separator)
+            layout.append((offset, len(segment)))
+            offset += len(segment)
+            preceded = preceded or bool(segment)
+        return layout
+    
+    def _write_from(self, index: int) -> int:
+        """
+        從指定段落開始改寫輸出檔案（包含整個輸出的結尾）並截斷多餘的內容
+        
+        Args:
+            index (int): 第一個需要改寫的段落
+            
+        Returns:
+            int: 寫入的位元組數
+        """
+        layout = self._layout()
+        pieces = []
+        if index == 0 or not os.path.exists(self.output_path):
+            index, start = 0, 0
+            if self._prologue:
+                pieces.append(self._prologue)
+        else:
+            # 從前一個非空段落的結尾開始，包含變更段落前方的分隔符號
+            start = len(self._prologue)
+            for offset, length in reversed(layout[:index]):
+                if length:
+                    start = offset + length
+                    break
+        
+        preceded = start > len(self._prologue)
+        for segment in self._segments[index:]:
+            if not segment:
+                continue
+            if preceded:
+                pieces.append(self._separator)
+            pieces.append(segment)
+            preceded = True
+        if self._epilogue:
+            pieces.append(self._epilogue)
+        
+        mode = 'r+b' if start else 'wb'
+        with open(self.output_path, mode) as output:
+            output.seek(start)
+            for piece in pieces:
+                output.write(piece)
+            output.truncate()
+        return sum(len(piece) for piece in pieces)
@@ -2,8 +2,12 @@
 import json
 import os
 import tempfile
+import threading
 from typing import List, Dict, Any
 from datetime import datetime
+from core import metrics
+from core.archive_reader import make_virtual_path, path_exists, split_virtual_path
+from utils.constants import STATE_SAVE_DELAY
 
 
 class StateManager:
@@ -14,6 +18,12 @@ class StateManager:
         self.temp_dir = tempfile.gettempdir()
         self.state_file = os.path.join(self.temp_dir, "drag_n_paste_state.json")
         
+        # 延遲保存：短時間內的多次變更只寫入一次
+        self._save_lock = threading.Lock()
+        self._save_timer = None
+        self._pending_state = None  # (檔案路徑列表, 已刪除檔案路徑列表)
+    
+    @metrics.timed('state_manager.save_state')
     def save_state(self, file_paths: List[str], deleted_files: List[str] = None) -> bool:
         """
         保存程式狀態
@@ -29,8 +39,8 @@ class StateManager:
             state_data = {
                 "version": "1.0",
                 "timestamp": datetime.now().isoformat(),
-                "file_paths": file_paths,
-                "deleted_files": deleted_files or [],
+                "file_paths": [self._encode_path(path) for path in file_paths],
+                "deleted_files": [self._encode_path(path) for path in deleted_files or []],
                 "total_files": len(file_paths)
             }
             
@@ -42,11 +52,60 @@ class StateManager:
                 json.dump(state_data, f, ensure_ascii=False, indent=2)
             
             return True
-            
+        
         except Exception as e:
             print(f"保存狀態失敗: {e}")
             return False
     
+    def save_state_later(self, file_paths: List[str], deleted_files: List[str] = None,
+                         delay: float = STATE_SAVE_DELAY):
+        """
+        延遲保存程式狀態，期間內再次呼叫時只保留最新的狀態
+        
+        計時器為背景（daemon）執行緒，程式結束前需呼叫 flush。
+        
+        Args:
+            file_paths (List[str]): 目前的檔案路徑列表
+            deleted_files (List[str]): 已刪除的檔案路徑列表
+            delay (float): 延遲秒數
+        """
+        with self._save_lock:
+            # 複製列表，計時器執行緒不會看到之後的修改
+            self._pending_state = (list(file_paths), list(deleted_files or []))
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+            self._save_timer = threading.Timer(delay, self.flush)
+            # 不讓計時器延後程式結束，結束前由呼叫端以 flush 寫入尚未保存的狀態
+            self._save_timer.daemon = True
+            self._save_timer.start()
+    
+    def flush(self) -> bool:
+        """
+        立即寫入尚未保存的狀態
+        
+        Returns:
+            bool: 保存是否成功（沒有待保存的狀態時返回True）
+        """
+        with self._save_lock:
+            pending = self._pending_state
+            self._pending_state = None
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            
+            if pending is None:
+                return True
+            return self.save_state(*pending)
+    
+    def cancel_pending(self):
+        """取消尚未保存的狀態"""
+        with self._save_lock:
+            self._pending_state = None
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+    
+    @metrics.timed('state_manager.load_state')
     def load_state(self) -> Dict[str, Any]:
         """
         載入程式狀態
@@ -61,15 +120,17 @@ class StateManager:
             with open(self.state_file, 'r', encoding='utf-8') as f:
                 state_data = json.load(f)
             
-            # 驗證檔案是否仍然存在
+            # 驗證檔案是否仍然存在（壓縮檔成員只檢查壓縮檔）
             valid_files = []
             for file_path in state_data.get("file_paths", []):
-                if os.path.exists(file_path):
+                file_path = self._decode_path(file_path)
+                if path_exists(file_path):
                     valid_files.append(file_path)
             
             state_data["file_paths"] = valid_files
+            state_data["deleted_files"] = [self._decode_path(path) for path in state_data.get("deleted_files", [])]
             return state_data
-            
+        
         except Exception as e:
             print(f"載入狀態失敗: {e}")
             return {}
@@ -81,6 +142,9 @@ class StateManager:
         Returns:
             bool: 清除是否成功
         """
+        # 避免稍後的延遲保存把狀態寫回來
+        self.cancel_pending()
+        
         try:
             if os.path.exists(self.state_file):
                 os.remove(self.state_file)
@@ -105,4 +169,35 @@ class StateManager:
         Returns:
             bool: 是否存在保存的狀態
         """
-        return os.path.exists(self.state_file) 
\ No newline at end of file
+        return os.path.exists(self.state_file) 
+    
+    @staticmethod
+    def _encode_path(file_path: str) -> Any:
+        """
+        轉換為狀態檔案中的格式（壓縮檔成員保存為壓縮檔與成員名稱）
+        
+        Args:
+            file_path (str): 檔案路徑
+            
+        Returns:
+            Any: 一般檔案為路徑字串，壓縮檔成員為 {'archive', 'member'}
+        """
+        archive_member = split_virtual_path(file_path)
+        if archive_member is None:
+            return file_path
+        return {"archive": archive_member[0], "member": archive_member[1]}
+    
+    @staticmethod
+    def _decode_path(entry: Any) -> str:
+        """
+        將狀態檔案中的項目轉換為檔案路徑
+        
+        Args:
+            entry (Any): 路徑字串或 {'archive', 'member'}
+            
+        Returns:
+            str: 檔案路徑（壓縮檔成員為虛擬路徑）
+        """
+        if isinstance(entry, dict):
+            return make_virtual_path(entry["archive"], entry["member"])
+        return entry
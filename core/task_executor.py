@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+"""
+背景工作執行器
+使用者操作（複製、匯出、搜尋）與背景維護（索引、token 計數、簽章）各有一個
+執行緒池，CPU 密集的轉換可使用行程池。完成的結果放入單一佇列，由UI執行緒
+定期呼叫 poll() 取出並回呼，工作可以取消權杖中途停止並回報進度
+"""
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from utils.constants import TASK_BACKGROUND_WORKERS, TASK_WORKERS
+
+
+class TaskCancelled(Exception):
+    """工作已取消（由工作本身在檢查取消權杖時拋出）"""
+
+
+class CancellationToken:
+    """取消權杖 - 可在任何執行緒設定與檢查"""
+    
+    def __init__(self):
+        self._event = threading.Event()
+    
+    def cancel(self):
+        """要求取消"""
+        self._event.set()
+    
+    @property
+    def cancelled(self) -> bool:
+        """是否已要求取消"""
+        return self._event.is_set()
+    
+    def check(self):
+        """
+        已要求取消時拋出 TaskCancelled（供工作在迴圈中檢查）
+        
+        Raises:
+            TaskCancelled: 已要求取消
+        """
+        if self._event.is_set():
+            raise TaskCancelled()
+
+
+class Task:
+    """背景工作 - future、取消權杖與進度"""
+    
+    def __init__(self, label: Optional[str], token: CancellationToken, background: bool):
+        """
+        Args:
+            label (Optional[str]): 狀態列顯示的名稱，None 表示不顯示
+            token (CancellationToken): 取消權杖
+            background (bool): 是否為背景維護工作
+        """
+        self.label = label
+        self.token = token
+        self.background = background
+        self.future = None
+        self.done = 0  # 已完成的工作量（由工作回報）
+        self.total = None  # 總工作量，未知時為None
+    
+    @property
+    def cancelled(self) -> bool:
+        """是否已取消"""
+        return self.token.cancelled
+    
+    def cancel(self) -> bool:
+        """
+        取消工作：尚未開始的工作不會執行，執行中的工作在下次檢查權杖時停止，
+        已取消的工作不會回呼
+        
+        Returns:
+            bool: 工作尚未開始而被直接取消時為True
+        """
+        self.token.cancel()
+        return self.future is not None and self.future.cancel()
+    
+    def report(self, done: int, total: Optional[int] = None):
+        """
+        回報進度（在工作執行緒呼叫）
+        
+        Args:
+            done (int): 已完成的工作量
+            total (Optional[int]): 總工作量
+        """
+        self.done = done
+        if total is not None:
+            self.total = total
+
+
+class TaskExecutor:
+    """背景工作執行器 - 執行緒池、行程池與單一完成佇列"""
+    
+    def __init__(self, workers: int = TASK_WORKERS, background_workers: int = TASK_BACKGROUND_WORKERS,
+                 processes: Optional[int] = None):
+        """
+        Args:
+            workers (int): 使用者操作的執行緒數
+            background_workers (int): 背景維護工作的執行緒數（不會佔用使用者操作的執行緒）
+            processes (Optional[int]): 行程池大小，預設依 CPU 數量
+        """
+        self._pools = {
+            False: ThreadPoolExecutor(max_workers=workers, thread_name_prefix="task"),
+            True: ThreadPoolExecutor(max_workers=background_workers, thread_name_prefix="background")
+        }
+        self._processes = processes
+        self._process_pool = None  # 第一次需要時才建立行程池
+        self._process_lock = threading.Lock()
+        self._completions = queue.Queue()  # (工作, 回呼, 結果或例外)
+        self._tasks = set()  # 尚未完成的工作
+        self._lock = threading.Lock()
+    
+    def submit(self, fn: Callable, *args, on_done: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[Exception], None]] = None, label: Optional[str] = None,
+               token: Optional[CancellationToken] = None, background: bool = False,
+               pass_task: bool = False) -> Task:
+        """
+        在執行緒池執行工作，完成後於 poll() 中回呼
+        
+        Args:
+            fn (Callable): 工作函數
+            *args: 工作函數的參數
+            on_done (Optional[Callable]): 成功回呼，參數為工作的回傳值
+            on_error (Optional[Callable]): 失敗回呼，參數為例外；None 時只印出錯誤
+            label (Optional[str]): 狀態列顯示的名稱
+            token (Optional[CancellationToken]): 共用的取消權杖，預設建立新的權杖
+            background (bool): 是否為背景維護工作
+            pass_task (bool): 是否將 Task 作為第一個參數傳給工作（用於檢查取消與回報進度）
+            
+        Returns:
+            Task: 工作
+        """
+        task = Task(label, token or CancellationToken(), background)
+        with self._lock:
+            self._tasks.add(task)
+        task.future = self._pools[background].submit(self._run, task, fn, args, pass_task)
+        task.future.add_done_callback(lambda future: self._finish(task, future, on_done, on_error))
+        return task
+    
+    def submit_process(self, fn: Callable, *args, on_done: Optional[Callable[[Any], None]] = None,
+                       on_error: Optional[Callable[[Exception], None]] = None,
+                       label: Optional[str] = None) -> Task:
+        """
+        在行程池執行 CPU 密集的工作（fn 與參數必須可 pickle，只能在開始前取消）
+        
+        Args:
+            fn (Callable): 模組層級的工作函數
+            *args: 工作函數的參數
+            on_done (Optional[Callable]): 成功回呼
+            on_error (Optional[Callable]): 失敗回呼
+            label (Optional[str]): 狀態列顯示的名稱
+            
+        Returns:
+            Task: 工作
+        """
+        task = Task(label, CancellationToken(), False)
+        with self._lock:
+            self._tasks.add(task)
+        task.future = self.get_process_pool().submit(fn, *args)
+        task.future.add_done_callback(lambda future: self._finish(task, future, on_done, on_error))
+        return task
+    
+    def get_process_pool(self):
+        """
+        取得（必要時建立）行程池，也可直接以 map 處理批次工作
+        
+        Returns:
+            ProcessPoolExecutor: 行程池
+        """
+        with self._process_lock:
+            if self._process_pool is None:
+                # multiprocessing 載入較慢，只在第一次需要時載入
+                from concurrent.futures import ProcessPoolExecutor
+                self._process_pool = ProcessPoolExecutor(max_workers=self._processes)
+            return self._process_pool
+    
+    def poll(self, limit: int = 500) -> int:
+        """
+        執行已完成工作的回呼（在UI執行緒呼叫，例如以 root.after 定期呼叫）
+        
+        Args:
+            limit (int): 單次最多處理的結果數
+            
+        Returns:
+            int: 執行的回呼數
+        """
+        delivered = 0
+        for _ in range(limit):
+            try:
+                task, callback, value = self._completions.get_nowait()
+            except queue.Empty:
+                break
+            if task.cancelled:
+                continue
+            try:
+                callback(value)
+            except Exception as e:
+                print(f"背景工作回呼失敗 {task.label or ''}: {e}")
+            delivered += 1
+        return delivered
+    
+    def get_progress(self) -> Dict[str, Any]:
+        """
+        取得狀態列顯示的進度
+        
+        Returns:
+            Dict[str, Any]: {'running': 執行中的使用者操作數, 'background': 背景工作數,
+                             'label': 第一個有名稱的工作, 'done': 已完成量, 'total': 總量（未知時為None）}
+        """
+        with self._lock:
+            tasks = list(self._tasks)
+        progress = {'running': 0, 'background': 0, 'label': None, 'done': 0, 'total': None}
+        for task in tasks:
+            if task.background:
+                progress['background'] += 1
+                continue
+            progress['running'] += 1
+            if task.label and progress['label'] is None:
+                progress.update(label=task.label, done=task.done, total=task.total)
+        return progress
+    
+    def pending_count(self) -> int:
+        """
+        取得尚未完成的工作數
+        
+        Returns:
+            int: 工作數
+        """
+        with self._lock:
+            return len(self._tasks)
+    
+    def shutdown(self):
+        """取消所有尚未完成的工作並關閉執行緒池與行程池（不等待執行中的工作）"""
+        with self._lock:
+            tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        for pool in self._pools.values():
+            pool.shutdown(wait=False)
+        with self._process_lock:
+            if self._process_pool is not None:
+                self._process_pool.shutdown(wait=False)
+                self._process_pool = None
+    
+    @staticmethod
+    def _run(task: Task, fn: Callable, args: tuple, pass_task: bool):
+        """在工作執行緒中執行工作（開始前已取消時不執行）"""
+        task.token.check()
+        if pass_task:
+            return fn(task, *args)
+        return fn(*args)
+    
+    def _finish(self, task: Task, future, on_done: Optional[Callable], on_error: Optional[Callable]):
+        """工作完成（在工作執行緒中執行），將回呼放入完成佇列"""
+        with self._lock:
+            self._tasks.discard(task)
+        if future.cancelled() or task.cancelled:
+            return
+        error = future.exception()
+        if isinstance(error, TaskCancelled):
+            return
+        if error is not None:
+            if on_error is not None:
+                self._completions.put((task, on_error, error))
+            else:
+                print(f"背景工作失敗 {task.label or ''}: {error}")
+        elif on_done is not None:
+            self._completions.put((task, on_done, future.result()))
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+文字統計工具
+計算行數、字元數與 UTF-8 位元組數，供檔案載入時一次性計算並快取
+"""
+
+from array import array
+from itertools import accumulate
+from typing import Dict
+
+
+def utf8_length(text: str) -> int:
+    """
+    計算文字以 UTF-8 編碼後的位元組數
+    
+    Args:
+        text (str): 文字
+        
+    Returns:
+        int: 位元組數
+    """
+    # 純 ASCII 文字不需要實際編碼
+    if text.isascii():
+        return len(text)
+    return len(text.encode('utf-8', errors='surrogatepass'))
+
+
+def compute_text_stats(text: str) -> Dict[str, int]:
+    """
+    計算文字的統計資訊
+    
+    Args:
+        text (str): 文字
+        
+    Returns:
+        Dict[str, int]: {'lines': 行數, 'chars': 字元數, 'bytes': UTF-8 位元組數}
+    """
+    return {
+        'lines': text.count('\n') + 1,
+        'chars': len(text),
+        'bytes': utf8_length(text)
+    }
+
+
+def build_line_offsets(text: str) -> array:
+    """
+    建立每一行起始位置的偏移表
+    
+    Args:
+        text (str): 文字
+        
+    Returns:
+        array: 長度為行數+1 的偏移表，第 k 行為 text[offsets[k]:offsets[k + 1] - 1]
+    """
+    offsets = array('q', [0])
+    offsets.extend(accumulate(len(part) + 1 for part in text.split('\n')))
+    return offsets
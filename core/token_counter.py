@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""
+Token 計數引擎
+監聽檔案模型變更，以背景工作執行器計算每個檔案的 token 數，
+結果依內容雜湊快取，總數以增量方式累計
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from core.file_handler import EVENT_CLEARED, EVENT_INSERTED, EVENT_REMOVED, EVENT_REPLACED
+from core.file_signature import content_hash
+from core.task_executor import TaskExecutor
+from core.token_estimator import create_estimator
+from utils.constants import TOKEN_CACHE_SIZE
+
+
+class TokenCounter:
+    """Token 計數引擎 - 每個檔案的 token 數與總數"""
+    
+    def __init__(self, file_handler, estimator=None, max_workers: int = 2,
+                 executor: Optional[TaskExecutor] = None):
+        """
+        Args:
+            file_handler (FileHandler): 檔案模型
+            estimator: token 估計器，預設依 create_estimator 選擇
+            max_workers (int): 沒有共用的執行器時，自行建立的背景執行緒數
+            executor (Optional[TaskExecutor]): 共用的背景工作執行器（由擁有者呼叫其 poll）
+        """
+        self.file_handler = file_handler
+        self.estimator = estimator or create_estimator()
+        self._owns_executor = executor is None
+        self._executor = executor or TaskExecutor(background_workers=max_workers)
+        self._results = []  # 完成回呼收集的 (檔案路徑, 版本, token 數)
+        self._tasks = {}  # 檔案路徑 -> 進行中的工作（內容變更時取消）
+        
+        # (估計器名稱, 內容雜湊) -> token 數，工作執行緒共用
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        
+        # 以下只在UI執行緒存取
+        self._counts = {}  # 檔案路徑 -> token 數
+        self._versions = {}  # 檔案路徑 -> 最新的計算版本，用於捨棄過期的結果
+        self._next_version = 0
+        self.total_tokens = 0
+        
+        # 為已載入的檔案計數，並監聽之後的變更
+        for file_path, content in file_handler.get_entries():
+            self._submit(file_path, content)
+        file_handler.add_observer(self)
+    
+    def on_files_changed(self, event: dict):
+        """
+        檔案模型變更通知（觀察者模式）
+        
+        Args:
+            event (dict): 變更事件
+        """
+        event_type = event['type']
+        if event_type in (EVENT_INSERTED, EVENT_REPLACED):
+            self._discard(event['path'])
+            self._submit(event['path'], self.file_handler.file_contents[event['index']])
+        elif event_type == EVENT_REMOVED:
+            self._discard(event['path'])
+        elif event_type == EVENT_CLEARED:
+            self._cancel_all()
+            self._counts.clear()
+            self._versions.clear()
+            self.total_tokens = 0
+    
+    def poll(self, limit: int = 500) -> List[Tuple[str, int]]:
+        """
+        套用背景完成的計數並回傳有變更的檔案（在UI執行緒呼叫）
+        
+        Args:
+            limit (int): 單次最多處理的結果數
+            
+        Returns:
+            List[Tuple[str, int]]: (檔案路徑, token 數) 列表
+        """
+        if self._owns_executor:
+            self._executor.poll()
+        results, self._results = self._results[:limit], self._results[limit:]
+        
+        updates = []
+        for file_path, version, tokens in results:
+            # 檔案已移除或內容已再次變更
+            if self._versions.get(file_path) != version:
+                continue
+            
+            del self._versions[file_path]
+            self._tasks.pop(file_path, None)
+            self._counts[file_path] = tokens
+            self.total_tokens += tokens
+            updates.append((file_path, tokens))
+        return updates
+    
+    def get_count(self, file_path: str) -> Optional[int]:
+        """
+        取得檔案的 token 數
+        
+        Args:
+            file_path (str): 檔案路徑
+            
+        Returns:
+            Optional[int]: token 數，尚未計算完成時返回None
+        """
+        return self._counts.get(file_path)
+    
+    def get_counts(self) -> Dict[str, int]:
+        """
+        取得所有已計算完成的 token 數
+        
+        Returns:
+            Dict[str, int]: 檔案路徑 -> token 數
+        """
+        return dict(self._counts)
+    
+    def pending_count(self) -> int:
+        """
+        取得尚未計算完成的檔案數
+        
+        Returns:
+            int: 檔案數
+        """
+        return len(self._versions)
+    
+    def set_estimator(self, estimator):
+        """
+        更換估計器並重新計算所有檔案
+        
+        Args:
+            estimator: 具有 name 屬性與 count(text) 方法的估計器
+        """
+        self.estimator = estimator
+        self._cancel_all()
+        self._counts.clear()
+        self._versions.clear()
+        self.total_tokens = 0
+        for file_path, content in self.file_handler.get_entries():
+            self._submit(file_path, content)
+    
+    def count_text(self, text: str) -> int:
+        """
+        計算任意文字的 token 數（使用快取，可在任何執行緒呼叫）
+        
+        Args:
+            text (str): 文字
+            
+        Returns:
+            int: token 數
+        """
+        estimator = self.estimator
+        key = (estimator.name, content_hash(text))
+        with self._cache_lock:
+            tokens = self._cache.get(key)
+            if tokens is not None:
+                self._cache.move_to_end(key)
+                return tokens
+        
+        tokens = estimator.count(text)
+        with self._cache_lock:
+            self._cache[key] = tokens
+            if len(self._cache) > TOKEN_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return tokens
+    
+    def close(self):
+        """取消進行中的計數並移除觀察者（自行建立的執行器一併關閉）"""
+        self.file_handler.remove_observer(self)
+        self._cancel_all()
+        if self._owns_executor:
+            self._executor.shutdown()
+    
+    def _submit(self, file_path: str, content: str):
+        """
+        排入一個檔案的背景計數
+        
+        Args:
+            file_path (str): 檔案路徑
+            content (str): 檔案內容
+        """
+        version = self._next_version
+        self._next_version += 1
+        self._versions[file_path] = version
+        
+        self._tasks[file_path] = self._executor.submit(
+            self.count_text, content, background=True,
+            on_done=lambda tokens: self._results.append((file_path, version, tokens)),
+            on_error=lambda e: self._on_failed(file_path, version, e))
+    
+    def _on_failed(self, file_path: str, version: int, error: Exception):
+        """計數失敗回呼（在UI執行緒中執行）"""
+        print(f"計算 token 數失敗 {file_path}: {error}")
+        if self._versions.get(file_path) == version:
+            del self._versions[file_path]
+            self._tasks.pop(file_path, None)
+    
+    def _cancel_all(self):
+        """取消所有進行中的計數"""
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+    
+    def _discard(self, file_path: str):
+        """
+        從總數扣除檔案目前的計數，並捨棄進行中的計算
+        
+        Args:
+            file_path (str): 檔案路徑
+        """
+        self.total_tokens -= self._counts.pop(file_path, 0)
+        self._versions.pop(file_path, None)
+        task = self._tasks.pop(file_path, None)
+        if task is not None:
+            task.cancel()
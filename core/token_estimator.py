@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+Token 數量估計
+提供可替換的 token 估計器：預設使用離線的啟發式估計，
+安裝 tiktoken 時可改用精確的分詞器
+"""
+
+import re
+from typing import Callable, List, Optional
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+
+# 中日韓文字大約每個字元 1 個 token
+_CJK_PATTERN = re.compile(r'[぀-ヿ㐀-䶿一-鿿가-힯豈-﫿]')
+
+# 其他文字平均約每 4 個字元 1 個 token
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    估計文字的 token 數
+    
+    Args:
+        text (str): 文字
+        
+    Returns:
+        int: 估計的 token 數
+    """
+    if not text:
+        return 0
+    if text.isascii():
+        return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+    
+    cjk_chars = len(_CJK_PATTERN.findall(text))
+    other_chars = len(text) - cjk_chars
+    return cjk_chars + (other_chars + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+class HeuristicTokenEstimator:
+    """啟發式 token 估計器（離線，不需外部套件）"""
+    
+    name = 'heuristic'
+    exact = False
+    additive = True  # 合併文字的估計不超過各部分估計的總和
+    
+    def count(self, text: str) -> int:
+        """
+        計算文字的 token 數
+        
+        Args:
+            text (str): 文字
+            
+        Returns:
+            int: token 數
+        """
+        return estimate_tokens(text)
+
+
+class TiktokenEstimator:
+    """使用 tiktoken 的精確 token 計數器"""
+    
+    exact = True
+    additive = False  # 分詞可能跨越片段邊界，合併後的 token 數不一定不超過總和
+    
+    def __init__(self, encoding_name: str = 'cl100k_base'):
+        if not TIKTOKEN_AVAILABLE:
+            raise ImportError("tiktoken is not installed")
+        self.name = f"tiktoken:{encoding_name}"
+        self._encoding = tiktoken.get_encoding(encoding_name)
+    
+    def count(self, text: str) -> int:
+        """
+        計算文字的 token 數
+        
+        Args:
+            text (str): 文字
+            
+        Returns:
+            int: token 數
+        """
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+
+# 估計器名稱 -> 建立函數
+_ESTIMATORS = {'heuristic': HeuristicTokenEstimator}
+if TIKTOKEN_AVAILABLE:
+    _ESTIMATORS['tiktoken'] = TiktokenEstimator
+
+
+def register_estimator(name: str, factory: Callable):
+    """
+    註冊 token 估計器
+    
+    估計器需要有 name 屬性與 count(text) 方法，且可在多個執行緒中同時使用；
+    合併文字的計數一定不超過各部分計數的總和時，可設定 additive = True 讓預算內輸出直接串流。
+    
+    Args:
+        name (str): 估計器名稱
+        factory (Callable): 無參數的建立函數
+    """
+    _ESTIMATORS[name] = factory
+
+
+def get_available_estimators() -> List[str]:
+    """
+    取得可用的估計器名稱
+    
+    Returns:
+        List[str]: 估計器名稱列表
+    """
+    return list(_ESTIMATORS)
+
+
+def create_estimator(name: Optional[str] = None):
+    """
+    建立 token 估計器，建立失敗時改用啟發式估計
+    
+    Args:
+        name (Optional[str]): 估計器名稱，預設在安裝 tiktoken 時使用 tiktoken
+        
+    Returns:
+        具有 name 屬性與 count(text) 方法的估計器
+    """
+    if name is None:
+        name = 'tiktoken' if 'tiktoken' in _ESTIMATORS else 'heuristic'
+    
+    factory = _ESTIMATORS.get(name)
+    if factory is not None:
+        try:
+            return factory()
+        except Exception as e:
+            print(f"建立 token 估計器失敗 {name}: {e}")
+    return HeuristicTokenEstimator()
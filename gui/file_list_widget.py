@@ -1,12 +1,22 @@
 # -*- coding: utf-8 -*-
 import tkinter as tk
 from tkinter import ttk, messagebox
-from typing import Callable, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from utils.i18n import i18n
 
 
+# 檔案列表的欄位（第一欄 #0 為檔案名稱）
+FILE_COLUMNS = ('size', 'lines', 'encoding', 'tokens', 'similar')
+
+# 中繼資料尚未計算完成時顯示的文字
+PENDING_TEXT = "…"
+
+# 滑鼠移動超過此距離（像素）才開始拖曳排序，避免與點選衝突
+DRAG_THRESHOLD = 5
+
+
 class FileListWidget:
-    """檔案列表元件"""
+    """檔案列表元件 - 以 Treeview 顯示檔案與中繼資料，依模型變更增量更新"""
     
     def __init__(self, parent, on_delete_callback: Optional[Callable] = None):
         self.parent = parent
@@ -15,17 +25,69 @@ class FileListWidget:
         # 創建主框架
         self.frame = ttk.LabelFrame(parent, text=i18n.get_text("file_list_title"), padding="5")
         
+        # 創建篩選列
+        filter_bar = ttk.Frame(self.frame)
+        filter_bar.pack(fill=tk.X, pady=(0, 2))
+        
+        self.filter_label = ttk.Label(filter_bar, text=i18n.get_text("filter"))
+        self.filter_label.pack(side=tk.LEFT, padx=(0, 5))
+        
+        self.filter_var = tk.StringVar()
+        self.filter_entry = ttk.Entry(filter_bar, textvariable=self.filter_var)
+        self.filter_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.filter_entry.bind('<Escape>', lambda event: self.filter_var.set(""))
+        
+        self.filter_count_label = ttk.Label(filter_bar, text="")
+        self.filter_count_label.pack(side=tk.LEFT, padx=(5, 0))
+        
+        filter_options = ttk.Frame(self.frame)
+        filter_options.pack(fill=tk.X, pady=(0, 5))
+        
+        self.fuzzy_var = tk.BooleanVar(value=False)
+        self.fuzzy_check = ttk.Checkbutton(
+            filter_options,
+            text=i18n.get_text("filter_fuzzy"),
+            variable=self.fuzzy_var,
+            command=self._on_filter_changed
+        )
+        self.fuzzy_check.pack(side=tk.LEFT)
+        
+        self.restrict_output_var = tk.BooleanVar(value=False)
+        self.restrict_output_check = ttk.Checkbutton(
+            filter_options,
+            text=i18n.get_text("filter_restrict_output"),
+            variable=self.restrict_output_var
+        )
+        self.restrict_output_check.pack(side=tk.LEFT, padx=(10, 0))
+        
         # 創建列表框架
         list_frame = ttk.Frame(self.frame)
         list_frame.pack(fill=tk.BOTH, expand=True)
         
-        # 創建列表框和滾動條
-        self.listbox = tk.Listbox(list_frame, selectmode=tk.SINGLE)
-        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.listbox.yview)
-        self.listbox.configure(yscrollcommand=scrollbar.set)
+        # 創建樹狀列表和滾動條
+        self.tree = ttk.Treeview(list_frame, columns=FILE_COLUMNS, selectmode='browse')
+        self.tree.column('#0', width=160, minwidth=80, stretch=True)
+        self.tree.column('size', width=70, minwidth=50, anchor=tk.E, stretch=False)
+        self.tree.column('lines', width=60, minwidth=40, anchor=tk.E, stretch=False)
+        self.tree.column('encoding', width=70, minwidth=50, stretch=False)
+        self.tree.column('tokens', width=70, minwidth=50, anchor=tk.E, stretch=False)
+        self.tree.column('similar', width=50, minwidth=40, anchor=tk.CENTER, stretch=False)
+        self._update_headings()
+        
+        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        
+        # 目前在文字區域中可見的檔案（以背景色標示）
+        self.tree.tag_configure('current', background='#dbe9f9')
+        
+        # 拖曳排序時的放置目標
+        self.tree.tag_configure('drop_target', background='#f6e3a1')
         
-        # 佈局列表框和滾動條
-        self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        # 跟隨新增內容中的記錄檔
+        self.tree.tag_configure('following', foreground='#1a7f37')
+        
+        # 佈局列表和滾動條
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
         # 創建按鈕框架
@@ -52,14 +114,64 @@ class FileListWidget:
             text=i18n.get_text("clear"), 
             command=self._on_clear_clicked
         )
-        self.clear_btn.pack(side=tk.LEFT)
+        self.clear_btn.pack(side=tk.LEFT, padx=(0, 5))
+        
+        self.follow_btn = ttk.Button(
+            button_frame,
+            text=i18n.get_text("follow"),
+            command=self._on_follow_clicked
+        )
+        self.follow_btn.pack(side=tk.LEFT)
+        
+        self.watch_var = tk.BooleanVar(value=False)
+        self.watch_check = ttk.Checkbutton(
+            button_frame,
+            text=i18n.get_text("watch_files"),
+            variable=self.watch_var,
+            command=self._on_watch_toggled
+        )
+        self.watch_check.pack(side=tk.RIGHT)
         
         # 綁定雙擊事件
-        self.listbox.bind('<Double-Button-1>', self._on_double_click)
+        self.tree.bind('<Double-Button-1>', self._on_double_click)
+        
+        # 綁定選取事件（跳至檔案在文字區域中的位置）
+        self.tree.bind('<<TreeviewSelect>>', self._on_select)
+        
+        # 綁定拖曳排序事件
+        self.tree.bind('<ButtonPress-1>', self._on_drag_start, add='+')
+        self.tree.bind('<B1-Motion>', self._on_drag_motion, add='+')
+        self.tree.bind('<ButtonRelease-1>', self._on_drag_end, add='+')
         
         # 回調函數
         self.on_restore_callback = None
         self.on_clear_callback = None
+        self.on_select_callback = None
+        self.on_move_callback = None
+        self.on_filter_callback = None
+        self.on_watch_callback = None
+        self.on_follow_callback = None
+        
+        # 拖曳排序狀態
+        self._drag_item = None
+        self._drag_start_y = 0
+        self._dragging = False
+        self._drop_item = None
+        
+        # 項目識別碼（依模型順序），以及檔案路徑與項目識別碼的雙向對照
+        self._items = []
+        self._path_items = {}
+        self._item_paths = {}
+        self._next_item_id = 0
+        
+        # 目前標示的項目識別碼
+        self._current_item = None
+        
+        # 被篩選隱藏（從樹中分離）的項目識別碼
+        self._hidden = set()
+        
+        # 輸入篩選文字時更新列表
+        self.filter_var.trace_add('write', lambda *args: self._on_filter_changed())
         
         # 註冊為觀察者
         i18n.add_observer(self)
@@ -72,18 +184,83 @@ class FileListWidget:
         """包裝grid方法"""
         self.frame.grid(**kwargs)
     
-    def add_file(self, filename: str):
+    def add_file(self, filename: str, file_path: Optional[str] = None,
+                 info: Optional[Dict[str, Any]] = None):
+        """
+        新增檔案到列表尾端
+        
+        Args:
+            filename (str): 檔案名稱
+            file_path (Optional[str]): 檔案路徑，用於之後更新中繼資料
+            info (Optional[Dict[str, Any]]): 已知的中繼資料（bytes、lines、encoding、tokens）
+        """
+        self.insert_file(len(self._items), filename, file_path, info)
+    
+    def insert_file(self, index: int, filename: str, file_path: Optional[str] = None,
+                    info: Optional[Dict[str, Any]] = None):
         """
-        新增檔案到列表
+        在指定位置插入檔案
         
         Args:
+            index (int): 插入位置
             filename (str): 檔案名稱
+            file_path (Optional[str]): 檔案路徑，用於之後更新中繼資料
+            info (Optional[Dict[str, Any]]): 已知的中繼資料（bytes、lines、encoding、tokens）
+        """
+        item = f"file{self._next_item_id}"
+        self._next_item_id += 1
+        
+        self._items.insert(index, item)
+        if self._hidden:
+            # 篩選中：新項目先顯示，再依模型順序重新排列可見項目
+            self.tree.insert('', tk.END, iid=item, text=filename, values=self._format_values(info or {}))
+            self._sync_children()
+        else:
+            self.tree.insert('', index, iid=item, text=filename, values=self._format_values(info or {}))
+        if file_path is not None:
+            self._path_items[file_path] = item
+            self._item_paths[item] = file_path
+    
+    def remove_file(self, index: int):
+        """
+        移除指定位置的檔案
+        
+        Args:
+            index (int): 檔案索引
+        """
+        if not 0 <= index < len(self._items):
+            return
+        
+        item = self._items.pop(index)
+        self.tree.delete(item)
+        self._hidden.discard(item)
+        if item == self._current_item:
+            self._current_item = None
+        if item == self._drag_item:
+            self._end_drag()
+        elif item == self._drop_item:
+            self._drop_item = None
+        file_path = self._item_paths.pop(item, None)
+        if file_path is not None:
+            self._path_items.pop(file_path, None)
+    
+    def move_file(self, src: int, dst: int):
+        """
+        移動檔案位置
+        
+        Args:
+            src (int): 原位置
+            dst (int): 新位置（移除原項目後的索引）
         """
-        self.listbox.insert(tk.END, filename)
-        # 自動選中最新新增的項目
-        self.listbox.selection_clear(0, tk.END)
-        self.listbox.selection_set(tk.END)
-        self.listbox.see(tk.END)
+        if not (0 <= src < len(self._items) and 0 <= dst < len(self._items)) or src == dst:
+            return
+        
+        item = self._items.pop(src)
+        self._items.insert(dst, item)
+        if self._hidden:
+            self._sync_children()
+        else:
+            self.tree.move(item, '', dst)
     
     def remove_selected(self) -> Optional[int]:
         """
@@ -92,16 +269,50 @@ class FileListWidget:
         Returns:
             Optional[int]: 被移除項目的索引，如果沒有選中項目則返回None
         """
-        selection = self.listbox.curselection()
-        if selection:
-            index = selection[0]
-            self.listbox.delete(index)
-            return index
-        return None
+        index = self.get_selected_index()
+        if index is not None:
+            self.remove_file(index)
+        return index
     
     def clear_all(self):
         """清空所有項目"""
-        self.listbox.delete(0, tk.END)
+        if self._items:
+            self.tree.delete(*self._items)
+        self._items.clear()
+        self._path_items.clear()
+        self._item_paths.clear()
+        self._hidden.clear()
+        self._current_item = None
+        self._end_drag()
+    
+    def set_file_info(self, file_path: str, info: Dict[str, Any]):
+        """
+        更新檔案的中繼資料欄位（只更新提供的欄位）
+        
+        Args:
+            file_path (str): 檔案路徑
+            info (Dict[str, Any]): 中繼資料（bytes、lines、encoding、tokens、similar）
+        """
+        item = self._path_items.get(file_path)
+        if item is None:
+            return
+        
+        values = self._format_values(info)
+        for column, value in zip(FILE_COLUMNS, values):
+            if value != PENDING_TEXT:
+                self.tree.set(item, column, value)
+    
+    def set_following(self, file_path: str, following: bool):
+        """
+        標示檔案是否跟隨中
+        
+        Args:
+            file_path (str): 檔案路徑
+            following (bool): 是否跟隨中
+        """
+        item = self._path_items.get(file_path)
+        if item is not None:
+            self._set_item_tag(item, 'following', following)
     
     def get_selected_index(self) -> Optional[int]:
         """
@@ -110,8 +321,8 @@ class FileListWidget:
         Returns:
             Optional[int]: 選中項目的索引，如果沒有選中則返回None
         """
-        selection = self.listbox.curselection()
-        return selection[0] if selection else None
+        selection = self.tree.selection()
+        return self._items.index(selection[0]) if selection else None
     
     def get_item_count(self) -> int:
         """
@@ -120,17 +331,98 @@ class FileListWidget:
         Returns:
             int: 項目數量
         """
-        return self.listbox.size()
+        return len(self._items)
     
-    def insert_file(self, index: int, filename: str):
+    def set_current(self, index: Optional[int]):
         """
-        在指定位置插入檔案
+        標示目前在文字區域中可見的檔案（不改變選取狀態）
         
         Args:
-            index (int): 插入位置
-            filename (str): 檔案名稱
+            index (Optional[int]): 檔案索引，None 表示取消標示
         """
-        self.listbox.insert(index, filename)
+        item = self._items[index] if index is not None and 0 <= index < len(self._items) else None
+        if item == self._current_item:
+            return
+        
+        if self._current_item is not None:
+            self._set_item_tag(self._current_item, 'current', False)
+        
+        self._current_item = item
+        if item is not None:
+            self._set_item_tag(item, 'current', True)
+            if item not in self._hidden:
+                self.tree.see(item)
+    
+    def show_only(self, indices: Optional[List[int]]):
+        """
+        只顯示指定的檔案（篩選結果）
+        
+        Args:
+            indices (Optional[List[int]]): 要顯示的檔案索引，None 表示顯示全部
+        """
+        if indices is None:
+            if self._hidden:
+                self._hidden.clear()
+                self._sync_children()
+            self.filter_count_label.config(text="")
+            return
+        
+        visible = set(self._items[i] for i in indices)
+        self._hidden = set(item for item in self._items if item not in visible)
+        self._sync_children()
+        self.filter_count_label.config(text=i18n.get_text("filter_count", len(indices), len(self._items)))
+    
+    def get_filter(self) -> Tuple[str, bool]:
+        """
+        取得目前的篩選條件
+        
+        Returns:
+            Tuple[str, bool]: (篩選文字, 是否模糊比對)
+        """
+        return self.filter_var.get(), self.fuzzy_var.get()
+    
+    def restricts_output(self) -> bool:
+        """
+        複製與匯出是否只包含篩選結果
+        
+        Returns:
+            bool: 是否只輸出篩選結果
+        """
+        return self.restrict_output_var.get()
+    
+    def is_watching(self) -> bool:
+        """
+        是否監看檔案變更
+        
+        Returns:
+            bool: 已勾選監看時為True
+        """
+        return self.watch_var.get()
+    
+    def focus_filter(self):
+        """將焦點移到篩選欄位"""
+        self.filter_entry.focus_set()
+        self.filter_entry.select_range(0, tk.END)
+    
+    def set_follow_callback(self, callback: Callable):
+        """設定跟隨按鈕的回調函數"""
+        self.on_follow_callback = callback
+    
+    def set_watch_callback(self, callback: Callable):
+        """設定監看開關的回調函數（參數為是否監看）"""
+        self.on_watch_callback = callback
+    
+    def set_filter_callback(self, callback: Callable):
+        """設定篩選回調函數，參數為 (篩選文字, 是否模糊比對)"""
+        self.on_filter_callback = callback
+    
+    def set_select_callback(self, callback: Callable):
+        """設定選取回調函數，參數為選取的索引"""
+        self.on_select_callback = callback
+    
+    def set_move_callback(self, callback: Callable):
+        """設定拖曳排序回調函數，參數為 (原位置, 新位置)"""
+        self.on_move_callback = callback
     
     def set_restore_callback(self, callback: Callable):
         """設定復原回調函數"""
@@ -140,6 +432,84 @@ class FileListWidget:
         """設定清空回調函數"""
         self.on_clear_callback = callback
     
+    def _sync_children(self):
+        """依模型順序重新設定可見項目，被篩選的項目從樹中分離（單一 Tk 呼叫）"""
+        hidden = self._hidden
+        self.tree.set_children('', *[item for item in self._items if item not in hidden])
+    
+    def _on_watch_toggled(self):
+        """監看開關變更"""
+        if self.on_watch_callback:
+            self.on_watch_callback(self.watch_var.get())
+    
+    def _on_filter_changed(self):
+        """篩選文字或選項變更"""
+        if self.on_filter_callback:
+            self.on_filter_callback(*self.get_filter())
+    
+    def _set_item_tag(self, item: str, tag: str, enabled: bool):
+        """
+        加入或移除項目的標籤（保留其他標籤）
+        
+        Args:
+            item (str): 項目識別碼
+            tag (str): 標籤名稱
+            enabled (bool): True 表示加入，False 表示移除
+        """
+        tags = [t for t in self.tree.item(item, 'tags') if t != tag]
+        if enabled:
+            tags.append(tag)
+        self.tree.item(item, tags=tags)
+    
+    @staticmethod
+    def _format_values(info: Dict[str, Any]) -> tuple:
+        """
+        將中繼資料轉為欄位顯示文字，未知的欄位顯示為計算中
+        
+        Args:
+            info (Dict[str, Any]): 中繼資料
+            
+        Returns:
+            tuple: 依 FILE_COLUMNS 順序的顯示文字
+        """
+        size = info.get('bytes')
+        lines = info.get('lines')
+        tokens = info.get('tokens')
+        similar = info.get('similar')  # 相似檔案分組編號，0表示沒有相似檔案
+        return (
+            FileListWidget._format_size(size) if size is not None else PENDING_TEXT,
+            f"{lines:,}" if lines is not None else PENDING_TEXT,
+            info.get('encoding') or PENDING_TEXT,
+            f"{tokens:,}" if tokens is not None else PENDING_TEXT,
+            (f"≈{similar}" if similar else "") if similar is not None else PENDING_TEXT
+        )
+    
+    @staticmethod
+    def _format_size(size: int) -> str:
+        """
+        格式化位元組大小
+        
+        Args:
+            size (int): 位元組數
+            
+        Returns:
+            str: 例如 512 B、1.5 KB、2.3 MB
+        """
+        if size < 1024:
+            return f"{size} B"
+        if size < 1024 * 1024:
+            return f"{size / 1024:.1f} KB"
+        return f"{size / (1024 * 1024):.1f} MB"
+    
+    def _update_headings(self):
+        """更新欄位標題文字"""
+        self.tree.heading('#0', text=i18n.get_text("column_name"), anchor=tk.W)
+        self.tree.heading('size', text=i18n.get_text("column_size"))
+        self.tree.heading('lines', text=i18n.get_text("column_lines"))
+        self.tree.heading('encoding', text=i18n.get_text("column_encoding"))
+        self.tree.heading('tokens', text=i18n.get_text("column_tokens"))
+        self.tree.heading('similar', text=i18n.get_text("column_similar"))
+    
     def _on_delete_clicked(self):
         """刪除按鈕點擊事件"""
         if self.on_delete_callback:
@@ -150,6 +520,11 @@ class FileListWidget:
         if self.on_restore_callback:
             self.on_restore_callback()
     
+    def _on_follow_clicked(self):
+        """跟隨按鈕點擊事件"""
+        if self.on_follow_callback:
+            self.on_follow_callback()
+    
     def _on_clear_clicked(self):
         """清空按鈕點擊事件"""
         if self.get_item_count() > 0:
@@ -160,8 +535,67 @@ class FileListWidget:
             if result and self.on_clear_callback:
                 self.on_clear_callback()
     
+    def _on_select(self, event=None):
+        """選取事件處理"""
+        index = self.get_selected_index()
+        if index is not None and self.on_select_callback:
+            self.on_select_callback(index)
+    
+    def _on_drag_start(self, event):
+        """按下滑鼠時記錄可能被拖曳的項目"""
+        self._end_drag()
+        if self.tree.identify_region(event.x, event.y) in ('tree', 'cell'):
+            self._drag_item = self.tree.identify_row(event.y) or None
+            self._drag_start_y = event.y
+    
+    def _on_drag_motion(self, event):
+        """拖曳時標示放置目標，游標超出上下邊界時自動捲動"""
+        if self._drag_item is None:
+            return
+        
+        if not self._dragging:
+            if abs(event.y - self._drag_start_y) < DRAG_THRESHOLD:
+                return
+            self._dragging = True
+            self.tree.config(cursor='sb_v_double_arrow')
+        
+        if event.y < 0:
+            self.tree.yview_scroll(-1, 'units')
+        elif event.y > self.tree.winfo_height():
+            self.tree.yview_scroll(1, 'units')
+        
+        target = self.tree.identify_row(event.y) or None
+        if target != self._drop_item:
+            if self._drop_item is not None:
+                self._set_item_tag(self._drop_item, 'drop_target', False)
+            self._drop_item = target
+            if target is not None:
+                self._set_item_tag(target, 'drop_target', True)
+    
+    def _on_drag_end(self, event):
+        """放開滑鼠時把拖曳的項目移到放置目標的位置"""
+        drag_item, drop_item, dragging = self._drag_item, self._drop_item, self._dragging
+        self._end_drag()
+        
+        if dragging and drop_item is not None and drop_item != drag_item and self.on_move_callback:
+            self.on_move_callback(self._items.index(drag_item), self._items.index(drop_item))
+    
+    def _end_drag(self):
+        """結束拖曳並清除標示"""
+        if self._drop_item is not None and self.tree.exists(self._drop_item):
+            self._set_item_tag(self._drop_item, 'drop_target', False)
+        if self._dragging:
+            self.tree.config(cursor='')
+        self._drag_item = None
+        self._drop_item = None
+        self._dragging = False
+    
     def _on_double_click(self, event):
         """雙擊事件處理"""
+        # 雙擊標題列時不處理
+        if self.tree.identify_region(event.x, event.y) == 'heading':
+            return
+        
         # 雙擊時刪除項目
         if self.on_delete_callback:
             self.on_delete_callback()
@@ -171,12 +605,25 @@ class FileListWidget:
         # 更新框架標題
         self.frame.config(text=i18n.get_text("file_list_title"))
         
+        # 更新篩選列文字
+        self.filter_label.config(text=i18n.get_text("filter"))
+        self.fuzzy_check.config(text=i18n.get_text("filter_fuzzy"))
+        self.restrict_output_check.config(text=i18n.get_text("filter_restrict_output"))
+        if self._hidden or self.filter_count_label.cget('text'):
+            self.filter_count_label.config(text=i18n.get_text(
+                "filter_count", len(self._items) - len(self._hidden), len(self._items)))
+        
+        # 更新欄位標題
+        self._update_headings()
+        
         # 更新按鈕文字
         self.delete_btn.config(text=i18n.get_text("delete_selected"))
         self.restore_btn.config(text=i18n.get_text("restore"))
         self.clear_btn.config(text=i18n.get_text("clear"))
+        self.follow_btn.config(text=i18n.get_text("follow"))
+        self.watch_check.config(text=i18n.get_text("watch_files"))
     
     def destroy(self):
         """銷毀元件時移除觀察者"""
         i18n.remove_observer(self)
-        self.frame.destroy() 
\ No newline at end of file
+        self.frame.destroy()
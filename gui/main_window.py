@@ -1,17 +1,35 @@
 # -*- coding: utf-8 -*-
 import tkinter as tk
 from tkinter import ttk, messagebox
-import tkinterdnd2 as tkdnd
 import os
-import re
+import time
 from typing import List
 
-from core.file_handler import FileHandler
+from core.archive_reader import is_archive, split_virtual_path
+from core.file_handler import (FileHandler, EVENT_CLEARED, EVENT_INSERTED, EVENT_MOVED,
+                               EVENT_REMOVED, EVENT_REPLACED)
+from core.budget_fitter import BudgetFitter
+from core.change_delta import build_delta
+from core.content_reducer import ContentReducer
+from core.drop_parser import parse_drop_files
+from core.duplicate_detector import DuplicateDetector, diff_duplicates
+from core.file_filter import FileFilter
+from core.file_watcher import FileWatcher
+from core.log_follower import LogFollower
+from core.output_chunker import OutputChunker
+from core.output_formatters import get_formatter
+from core.text_stats import utf8_length
+from core.token_counter import TokenCounter
 from core.clipboard_handler import ClipboardHandler
+from core.search_engine import SearchEngine
+from core.task_executor import TaskExecutor
 from gui.file_list_widget import FileListWidget
 from gui.text_display_widget import TextDisplayWidget
 from gui.language_selector import LanguageSelector
-from utils.constants import WINDOW_SIZE, WINDOW_MIN_SIZE
+from gui.search_panel import SearchPanel
+from gui.token_budget_bar import TokenBudgetBar
+from utils.constants import (FOLLOW_MAX_LINES, FOLLOW_POLL_INTERVAL, STARTUP_SLICE, TASK_POLL_INTERVAL,
+                             WINDOW_SIZE, WINDOW_MIN_SIZE)
 from utils.i18n import i18n
 
 
@@ -19,14 +37,36 @@ class MainWindow:
     """主視窗類別"""
     
     def __init__(self):
-        # 初始化檔案處理器
-        self.file_handler = FileHandler()
+        # 初始化檔案處理器（上次的狀態在第一次繪製後才載入）
+        self.file_handler = FileHandler(load_state=False)
+        self.startup_times = {}  # 啟動階段 -> time.perf_counter()
+        self._restore_iterator = None
         
         # 初始化剪貼簿處理器
         self.clipboard_handler = ClipboardHandler()
         
-        # 創建主視窗
-        self.root = tkdnd.Tk()
+        # 背景工作執行器：所有背景工作的完成結果都由 _poll_tasks 在UI執行緒取出
+        self.task_executor = TaskExecutor()
+        
+        # 初始化搜尋引擎（在背景建立索引）
+        self.search_engine = SearchEngine(self.file_handler, self.task_executor)
+        
+        # 初始化檔案列表篩選器
+        self.file_filter = FileFilter(self.file_handler)
+        
+        # 初始化 token 計數引擎（在背景計算每個檔案的 token 數）
+        self.token_counter = TokenCounter(self.file_handler, executor=self.task_executor)
+        self.content_reducer = ContentReducer(task_executor=self.task_executor)
+        self.duplicate_detector = DuplicateDetector(self.file_handler, executor=self.task_executor)
+        self.file_watcher = None  # 勾選監看變更時才建立
+        self.log_follower = LogFollower()
+        self._follow_polling = False
+        self._output_entries = None  # 進行中的複製或匯出的檔案快照（完成後記錄為已複製）
+        self._output_detected = None  # 變更輸出在背景找出的變更（重新讀取的檔案與快照雜湊在完成後套用到模型）
+        self.metrics_panel = None  # 按 F12 時才建立效能數據面板
+        
+        # 創建主視窗（拖拽支援在第一次繪製後才載入）
+        self.root = tk.Tk()
         self.root.title(i18n.get_text("window_title"))
         self.root.geometry(WINDOW_SIZE)
         self.root.minsize(*WINDOW_MIN_SIZE)
@@ -71,6 +111,18 @@ class MainWindow:
         # 設定檔案列表的回調函數
         self.file_list_widget.set_restore_callback(self._on_restore_file)
         self.file_list_widget.set_clear_callback(self._on_clear_all_files)
+        self.file_list_widget.set_select_callback(self._on_file_selected)
+        self.file_list_widget.set_move_callback(self._on_move_file)
+        self.file_list_widget.set_filter_callback(self._on_filter_changed)
+        self.file_list_widget.set_watch_callback(self._on_watch_toggled)
+        self.file_list_widget.set_follow_callback(self._on_follow_file)
+        
+        # 創建搜尋面板
+        self.search_panel = SearchPanel(self.right_frame)
+        self.search_panel.pack(fill=tk.X, pady=(0, 5))
+        self.search_panel.set_search_callback(self._prepare_search)
+        self.search_panel.set_task_executor(self.task_executor)
+        self.search_panel.set_jump_callback(self._on_search_hit_selected)
         
         # 創建文字顯示元件
         self.text_display_widget = TextDisplayWidget(self.right_frame)
@@ -78,11 +130,24 @@ class MainWindow:
         
         # 設定文字顯示的回調函數
         self.text_display_widget.set_clear_callback(self._on_clear_text_content)
+        self.text_display_widget.set_copy_source(self._get_output_chunks)
+        self.text_display_widget.set_parts_source(self._prepare_parts)
+        self.text_display_widget.set_output_done_callback(self._on_output_done)
+        self.text_display_widget.set_task_executor(self.task_executor)
+        self.text_display_widget.set_scroll_callback(self._on_text_scrolled)
         
         # 創建狀態列
         self.status_frame = ttk.Frame(self.root)
         self.status_frame.pack(fill=tk.X, side=tk.BOTTOM)
         
+        # Token 總數與預算
+        self.token_budget_bar = TokenBudgetBar(self.status_frame)
+        self.token_budget_bar.pack(side=tk.RIGHT, padx=5, pady=2)
+        
+        # 背景工作進度
+        self.task_label = ttk.Label(self.status_frame, text="")
+        self.task_label.pack(side=tk.RIGHT, padx=5, pady=2)
+        
         self.status_label = ttk.Label(
             self.status_frame, 
             text=i18n.get_text("drag_files_hint"),
@@ -90,114 +155,112 @@ class MainWindow:
         )
         self.status_label.pack(fill=tk.X, padx=5, pady=2)
         
-        # 設定拖拽功能
-        self._setup_drag_and_drop()
-        
-        # 載入之前的狀態
-        self._load_previous_state()
+        # 監聽檔案模型變更，以增量方式更新顯示
+        self.file_handler.add_observer(self)
+        self.root.after(100, self._poll_tokens)
+        self.root.after(TASK_POLL_INTERVAL, self._poll_tasks)
         
         # 綁定鍵盤事件
         self._setup_keyboard_bindings()
         
         # 綁定視窗關閉事件
         self.root.protocol("WM_DELETE_WINDOW", self._on_closing)
+        
+        # 視窗第一次繪製後再載入拖拽支援與上次的狀態
+        self.root.after_idle(lambda: self.root.after(0, self._finish_startup))
+    
+    def _finish_startup(self):
+        """第一次繪製後載入拖拽支援，並開始分批載入上次的狀態"""
+        self.root.update_idletasks()
+        self.startup_times['first_paint'] = time.perf_counter()
+        self._setup_drag_and_drop()
+        self._restore_iterator = self.file_handler.iter_load_previous_state()
+        self._continue_restore()
+    
+    def _continue_restore(self):
+        """載入上次狀態的下一批檔案，每批不超過 STARTUP_SLICE 秒，讓介面保持回應"""
+        deadline = time.perf_counter() + STARTUP_SLICE
+        for _ in self._restore_iterator:
+            if time.perf_counter() >= deadline:
+                self.root.after(1, self._continue_restore)
+                return
+        
+        self._restore_iterator = None
+        self.startup_times['interactive'] = time.perf_counter()
+        if self.file_handler.file_list:
+            # 更新狀態訊息
+            file_count = len(self.file_handler.file_list)
+            self.status_label.config(
+                text=i18n.get_text("state_loaded", str(file_count))
+            )
+    
+    def is_ready(self) -> bool:
+        """
+        啟動是否完成（拖拽支援已載入、上次的狀態已全部載入）
+        
+        Returns:
+            bool: 完成時為True
+        """
+        return 'interactive' in self.startup_times
     
     def _setup_drag_and_drop(self):
         """設定拖拽功能"""
-        # 註冊多種拖拽類型
-        dnd_types = [tkdnd.DND_FILES, tkdnd.DND_TEXT]
+        # tkinterdnd2 載入 tkdnd 擴充套件較慢，在視窗顯示後才載入
+        try:
+            from tkinterdnd2 import DND_FILES, DND_TEXT, TkinterDnD
+            self._load_tkdnd(TkinterDnD)
+        except (ImportError, RuntimeError, tk.TclError) as e:
+            print(f"載入拖拽支援失敗: {e}")
+            return
         
-        # 主視窗註冊拖拽事件
-        for dnd_type in dnd_types:
-            self.root.drop_target_register(dnd_type)
-        self.root.dnd_bind('<<Drop>>', self._on_drop)
+        # 註冊多種拖拽類型
+        dnd_types = [DND_FILES, DND_TEXT]
+        
+        # 主視窗的各區域與主要元件註冊拖拽事件
+        # （根視窗不是 tkinterdnd2 的 Tk，改為註冊填滿視窗的最上層框架）
+        targets = [self.top_frame, self.main_frame, self.status_frame,
+                   self.file_list_widget.tree, self.text_display_widget.text_widget]
+        for widget in targets:
+            for dnd_type in dnd_types:
+                widget.drop_target_register(dnd_type)
+            widget.dnd_bind('<<Drop>>', self._on_drop)
+    
+    def _load_tkdnd(self, dnd_module):
+        """
+        在已建立的根視窗載入 tkdnd 擴充套件
         
-        # 為主要元件也註冊拖拽
-        for dnd_type in dnd_types:
-            self.file_list_widget.listbox.drop_target_register(dnd_type)
-            self.text_display_widget.text_widget.drop_target_register(dnd_type)
+        tkinterdnd2 只在建立 TkinterDnD.Tk 時載入擴充套件，為了在視窗顯示後才載入，
+        使用其內部的 _require（requirements.txt 固定 tkinterdnd2==0.3.0）；
+        沒有此函數的版本改以套件內附的 tkdnd 目錄與 Tcl 的 package require 載入。
         
-        self.file_list_widget.listbox.dnd_bind('<<Drop>>', self._on_drop)
-        self.text_display_widget.text_widget.dnd_bind('<<Drop>>', self._on_drop)
+        Args:
+            dnd_module: tkinterdnd2.TkinterDnD 模組
+            
+        Raises:
+            RuntimeError: 無法載入擴充套件（_require）
+            tk.TclError: 無法載入擴充套件（package require）
+        """
+        require = getattr(dnd_module, '_require', None)
+        if callable(require):
+            require(self.root)
+            return
+        
+        import platform
+        platform_dirs = {'Darwin': 'osx64', 'Linux': 'linux64', 'Windows': 'win64'}
+        library = os.path.join(os.path.dirname(dnd_module.__file__), 'tkdnd',
+                               platform_dirs.get(platform.system(), ''))
+        if os.path.isdir(library):
+            self.root.tk.call('lappend', 'auto_path', library)
+        self.root.tk.call('package', 'require', 'tkdnd')
     
     def _on_drop(self, event):
         """處理拖拽事件"""
         # 取得拖拽的檔案列表
-        files = self._parse_drop_files(event.data)
+        files = parse_drop_files(event.data)
         
         for file_path in files:
             self._add_file(file_path)
     
-    def _parse_drop_files(self, data: str) -> List[str]:
-        """
-        解析拖拽的檔案資料
-        
-        Args:
-            data (str): 拖拽事件的資料
-            
-        Returns:
-            List[str]: 檔案路徑列表
-        """
-        files = []
-        
-        # 清理資料
-        data = data.strip()
-        
-        # 處理不同格式的拖拽資料
-        if not data:
-            return files
-        
-        # 方法1: 處理標準檔案路徑格式
-        if data.startswith('{') and data.endswith('}'):
-            # 單個檔案格式: {file}
-            if data.count('{') == 1 and data.count('}') == 1:
-                clean_path = data[1:-1].strip().strip('"')
-                if clean_path and os.path.exists(clean_path):
-                    files = [clean_path]
-            else:
-                # 多個檔案的格式: {file1} {file2} ...
-                # 使用正則表達式或簡單分割
-                pattern = r'\{([^}]+)\}'
-                matches = re.findall(pattern, data)
-                for match in matches:
-                    clean_path = match.strip().strip('"')
-                    if clean_path and os.path.exists(clean_path):
-                        files.append(clean_path)
-        
-        # 方法2: 處理純文字路徑（從其他程式拖拽出來的路徑）
-        elif os.path.exists(data):
-            files = [data]
-        
-        # 方法3: 處理多行文字路徑
-        elif '\n' in data or '\r' in data:
-            lines = data.replace('\r\n', '\n').replace('\r', '\n').split('\n')
-            for line in lines:
-                line = line.strip().strip('"').strip("'")
-                if line and os.path.exists(line):
-                    files.append(line)
-        
-        # 方法4: 處理空格分隔的路徑
-        elif ' ' in data:
-            parts = data.split()
-            for part in parts:
-                part = part.strip().strip('"').strip("'")
-                if part and os.path.exists(part):
-                    files.append(part)
-        
-        # 方法5: 單個檔案路徑
-        else:
-            clean_path = data.strip().strip('{}').strip('"').strip("'")
-            if clean_path and os.path.exists(clean_path):
-                files = [clean_path]
-        
-        # 去除重複並驗證檔案存在
-        unique_files = []
-        for file_path in files:
-            if file_path not in unique_files and os.path.isfile(file_path):
-                unique_files.append(file_path)
-        
-        return unique_files
-    
     def _add_file(self, file_path: str):
         """
         新增檔案到列表
@@ -208,15 +271,12 @@ class MainWindow:
         success, message = self.file_handler.add_file(file_path)
         
         if success:
-            # 新增到GUI列表
-            filename = os.path.basename(file_path)
-            self.file_list_widget.add_file(filename)
-            
-            # 更新文字顯示
-            self._update_text_display()
-            
-            # 更新狀態
-            self.status_label.config(text=i18n.get_text("file_added", filename))
+            # GUI列表由模型變更事件更新，這裡只更新狀態（壓縮檔顯示加入的檔案數）
+            if is_archive(file_path):
+                self.status_label.config(text=message)
+            else:
+                filename = os.path.basename(file_path)
+                self.status_label.config(text=i18n.get_text("file_added", filename))
         else:
             # 顯示錯誤訊息
             self.status_label.config(text=message)
@@ -228,26 +288,27 @@ class MainWindow:
         if selected_index is not None:
             # 從檔案處理器中移除
             if self.file_handler.remove_file(selected_index):
-                # 從GUI列表中移除
-                self.file_list_widget.remove_selected()
-                
-                # 更新文字顯示
-                self._update_text_display()
-                
                 # 更新狀態
                 self.status_label.config(text=i18n.get_text("file_deleted"))
         else:
             messagebox.showwarning(i18n.get_text("warning"), i18n.get_text("no_file_selected"))
     
+    def _on_move_file(self, src: int, dst: int):
+        """
+        拖曳排序檔案
+        
+        Args:
+            src (int): 原位置
+            dst (int): 新位置
+        """
+        if self.file_handler.move(src, dst):
+            self.status_label.config(
+                text=i18n.get_text("file_moved", os.path.basename(self.file_handler.file_list[dst]), dst + 1)
+            )
+    
     def _on_restore_file(self):
         """復原最後刪除的檔案"""
         if self.file_handler.restore_last_deleted():
-            # 重新載入GUI列表
-            self._reload_file_list()
-            
-            # 更新文字顯示
-            self._update_text_display()
-            
             # 更新狀態
             self.status_label.config(text=i18n.get_text("file_restored"))
         else:
@@ -256,7 +317,6 @@ class MainWindow:
     def _on_clear_all_files(self):
         """清空所有檔案"""
         self.file_handler.clear_all()
-        self.file_list_widget.clear_all()
         self.text_display_widget.clear_content()
         self.status_label.config(text=i18n.get_text("all_files_cleared"))
     
@@ -267,29 +327,396 @@ class MainWindow:
     
     def _update_text_display(self):
         """更新文字顯示區域"""
-        content = self.file_handler.get_combined_content()
-        self.text_display_widget.set_content(content)
-    
-    def _reload_file_list(self):
-        """重新載入檔案列表"""
-        self.file_list_widget.clear_all()
-        file_names = self.file_handler.get_file_list()
-        for filename in file_names:
-            self.file_list_widget.add_file(filename)
-    
-    def _load_previous_state(self):
-        """載入之前的狀態"""
-        # FileHandler 已經在初始化時載入了狀態
-        # 這裡只需要更新GUI顯示
-        if self.file_handler.file_list:
-            self._reload_file_list()
+        self.text_display_widget.set_document(self.file_handler.document)
+    
+    def on_files_changed(self, event: dict):
+        """
+        檔案模型變更通知（觀察者模式）
+        
+        Args:
+            event (dict): 變更事件，包含 type、index 與合併文件的行變更 lines
+        """
+        self._apply_list_change(event)
+        self.text_display_widget.reset_parts()
+        if self.file_watcher is not None and event['type'] != EVENT_REPLACED:
+            self.file_watcher.set_paths(self.file_handler.file_list)
+        if event['type'] == EVENT_REMOVED:
+            self.log_follower.unfollow(event['path'])
+        elif event['type'] == EVENT_CLEARED:
+            self.log_follower.clear()
+        if self.file_list_widget.get_filter()[0]:
+            self._apply_filter()
+        
+        if self.text_display_widget.document is self.file_handler.document:
+            # 只更新受影響的範圍，保留使用者的捲動位置
+            self.text_display_widget.apply_line_change(*event['lines'])
+        else:
+            # 文字內容先前被清空，重新顯示整份文件
             self._update_text_display()
+    
+    def _apply_list_change(self, event: dict):
+        """
+        將模型變更套用到檔案列表（只處理受影響的項目）
+        
+        Args:
+            event (dict): 變更事件
+        """
+        event_type = event['type']
+        index = event['index']
+        if event_type == EVENT_INSERTED:
+            self._insert_list_item(index)
+        elif event_type == EVENT_REMOVED:
+            self.file_list_widget.remove_file(index)
+        elif event_type == EVENT_REPLACED:
+            self.file_list_widget.set_file_info(event['path'], self.file_handler.get_file_stats(index))
+        elif event_type == EVENT_MOVED:
+            self.file_list_widget.move_file(event['from_index'], index)
+        elif event_type == EVENT_CLEARED:
+            self.file_list_widget.clear_all()
+    
+    def _insert_list_item(self, index: int):
+        """
+        將模型中的檔案插入檔案列表（token 數由背景計數完成後填入）
+        
+        Args:
+            index (int): 檔案索引
+        """
+        file_path = self.file_handler.file_list[index]
+        info = dict(self.file_handler.get_file_stats(index))
+        info['tokens'] = self.token_counter.get_count(file_path)
+        info['similar'] = self.duplicate_detector.get_label(file_path)
+        self.file_list_widget.insert_file(index, os.path.basename(file_path), file_path, info)
+    
+    def _on_filter_changed(self, query: str, fuzzy: bool):
+        """
+        篩選條件變更時更新檔案列表
+        
+        Args:
+            query (str): 篩選文字
+            fuzzy (bool): 是否模糊比對
+        """
+        self._apply_filter()
+    
+    def _apply_filter(self):
+        """依目前的篩選條件只顯示符合的檔案"""
+        self.file_list_widget.show_only(self.file_filter.match(*self.file_list_widget.get_filter()))
+    
+    def _get_output_chunks(self):
+        """取得複製/匯出的內容片段（在UI執行緒取得快照）"""
+        return self._prepare_output_source()()
+    
+    def _prepare_output_source(self):
+        """
+        在UI執行緒取得檔案快照，回傳可重複產生輸出片段的函數
+        
+        勾選只輸出篩選結果時，只包含符合篩選條件的檔案；
+        選擇只輸出變更時，只包含上次複製或匯出後新增或修改的檔案（或其差異）
+        並列出移除的檔案；勾選精簡內容時，先精簡內容；勾選相似檔案只輸出差異時，
+        每組相似檔案只完整輸出第一個（都在背景執行緒第一次取值時進行）；
+        勾選輸出符合預算時，依預算列的設定裁剪。
+        
+        Returns:
+            Callable[[], Iterator[str]]: 每次呼叫回傳一個新的片段串流（可在背景執行緒呼叫）
+        """
+        delta_mode = self.text_display_widget.get_delta_mode()
+        delta = None
+        self._output_detected = None
+        if delta_mode != 'all':
+            # 比對 stat 與重新讀取磁碟上變更的檔案都在背景執行緒第一次取值時進行，
+            # 重新讀取的內容在輸出完成後才套用到模型
+            detect = self.file_handler.prepare_changes(self.log_follower.get_paths())
+            detected = self._output_detected = []
             
-            # 更新狀態訊息
-            file_count = len(self.file_handler.file_list)
-            self.status_label.config(
-                text=i18n.get_text("state_loaded", str(file_count))
-            )
+            def changes():
+                if not detected:
+                    detected.append(detect())
+                return detected[0]
+            
+            delta = (changes, delta_mode == 'diff')
+        
+        entries = self.file_handler.get_entries()
+        stats = self.file_handler.file_stats
+        indices = range(len(entries))
+        if self.file_list_widget.restricts_output():
+            matches = self.file_filter.match(*self.file_list_widget.get_filter())
+            if matches is not None:
+                indices = matches
+        # 輸出完成後記錄為已複製的快照（包含變更輸出中未變更的檔案）
+        self._output_entries = [entries[i] for i in indices]
+        entries = [entries[i] for i in indices]
+        stats = [stats[i] for i in indices]
+        
+        reducer = self.content_reducer if self.text_display_widget.reduces_content() else None
+        clusters = None
+        if self.text_display_widget.diffs_duplicates():
+            clusters = self.duplicate_detector.get_clusters()
+        formatter = get_formatter(self.text_display_widget.get_output_format())
+        fit, strategy = self.token_budget_bar.get_fit_options()
+        if not fit:
+            return lambda: self._iter_reduced(
+                entries, reducer, clusters, delta,
+                lambda reduced: self.file_handler.iter_combined_content(reduced, formatter))
+        
+        # 以快取的大小分配預算，不需重新掃描內容（精簡或差異後的大小需重新計算）
+        if reducer is not None or clusters or delta is not None:
+            sizes = None
+        elif self.token_budget_bar.get_unit() == 'tokens':
+            sizes = [self.token_counter.get_count(file_path) for file_path, _ in entries]
+        else:
+            sizes = [file_stats['bytes'] for file_stats in stats]
+        additive = (self.token_budget_bar.get_unit() != 'tokens'
+                    or getattr(self.token_counter.estimator, 'additive', False))
+        fitter = BudgetFitter(self.token_budget_bar.get_budget(), self._get_measure(), strategy, formatter,
+                              additive)
+        return lambda: self._iter_reduced(entries, reducer, clusters, delta,
+                                          lambda reduced: fitter.iter_fitted(reduced, sizes))
+    
+    @staticmethod
+    def _iter_reduced(entries, reducer, clusters, delta, produce):
+        """
+        在第一次取值時精簡內容、相似檔案與變更輸出，再產生輸出片段
+        
+        Args:
+            entries (List[Tuple[str, str]]): 檔案快照
+            reducer (Optional[ContentReducer]): 內容精簡器，None 表示不精簡
+            clusters (Optional[List[List[str]]]): 相似檔案分組，None 表示不輸出差異
+            delta (Optional[tuple]): (找出變更的函數, 是否輸出差異)，None 表示輸出全部內容
+            produce (Callable): 以快照產生輸出片段的函數
+            
+        Returns:
+            Iterator[str]: 輸出片段
+        """
+        if delta is not None:
+            changes, diff = delta
+            changed, previous, removed, reloaded, _ = changes()
+            # 只輸出新增或修改的檔案，重新讀取的檔案使用讀取到的內容
+            entries = [(file_path, reloaded[file_path][1] if file_path in reloaded else content)
+                       for file_path, content in entries if file_path in changed]
+        if reducer is not None:
+            entries = reducer.reduce_entries(entries)
+        if clusters:
+            entries = diff_duplicates(entries, clusters)
+        if delta is not None:
+            if diff and reducer is not None:
+                # 差異需以相同方式精簡上次的內容
+                previous = {file_path: content if content is None
+                            else reducer.reduce_entries([(file_path, content)])[0][1]
+                            for file_path, content in previous.items()}
+            entries = build_delta(entries, previous, removed, diff)
+        yield from produce(entries)
+    
+    def _on_output_done(self):
+        """複製或匯出完成，套用背景重新讀取的內容並記錄輸出的檔案快照供下次只輸出變更"""
+        detected = self._output_detected
+        self._output_detected = None
+        reloaded = {}
+        if detected:
+            _, _, _, reloaded, hashes = detected[0]
+            self.file_handler.apply_reloaded(reloaded, hashes)
+        if self._output_entries is not None:
+            self.file_handler.mark_copied([(file_path, reloaded[file_path][1] if file_path in reloaded else content)
+                                           for file_path, content in self._output_entries])
+            self._output_entries = None
+    
+    def _prepare_parts(self, limit: int):
+        """
+        在UI執行緒取得快照，回傳逐段產生輸出的產生器
+        
+        Args:
+            limit (int): 每段上限（單位依預算列的設定）
+            
+        Returns:
+            Iterator[Tuple[int, int, str]]: (段落編號, 總段數, 段落文字)
+        """
+        formatter = get_formatter(self.text_display_widget.get_output_format())
+        chunker = OutputChunker(self._prepare_output_source(), limit, self._get_measure(),
+                                formatter.separator, formatter.prologue, formatter.epilogue)
+        return chunker.iter_parts()
+    
+    def _get_measure(self):
+        """
+        取得預算列所選單位的大小計算函數
+        
+        Returns:
+            Callable[[str], int]: token 數或 UTF-8 位元組數
+        """
+        if self.token_budget_bar.get_unit() == 'tokens':
+            return self.token_counter.estimator.count
+        return utf8_length
+    
+    def _poll_tasks(self):
+        """取出背景工作的完成結果並執行回呼，在狀態列顯示進度"""
+        self.task_executor.poll()
+        progress = self.task_executor.get_progress()
+        if progress['label'] and progress['total']:
+            text = i18n.get_text("task_progress", progress['label'], progress['done'], progress['total'])
+        elif progress['label']:
+            text = progress['label']
+        elif progress['background']:
+            text = i18n.get_text("background_tasks", progress['background'])
+        else:
+            text = ""
+        if self.task_label.cget('text') != text:
+            self.task_label.config(text=text)
+        self.root.after(TASK_POLL_INTERVAL, self._poll_tasks)
+    
+    def _poll_tokens(self):
+        """輪詢背景完成的 token 計數與相似檔案分組，更新檔案列表與總數"""
+        for file_path, tokens in self.token_counter.poll():
+            self.file_list_widget.set_file_info(file_path, {'tokens': tokens})
+        for file_path, label in self.duplicate_detector.poll().items():
+            self.file_list_widget.set_file_info(file_path, {'similar': label})
+        self.token_budget_bar.set_totals(self.token_counter.total_tokens,
+                                         self.file_handler.total_stats['bytes'],
+                                         self.token_counter.pending_count())
+        self.root.after(100, self._poll_tokens)
+    
+    def _on_watch_toggled(self, enabled: bool):
+        """
+        開始或停止監看列表中的檔案
+        
+        Args:
+            enabled (bool): 是否監看
+        """
+        if enabled and self.file_watcher is None:
+            self.file_watcher = FileWatcher()
+            self.file_watcher.set_paths(self.file_handler.file_list)
+            self.root.after(200, self._poll_watcher)
+        elif not enabled and self.file_watcher is not None:
+            self.file_watcher.close()
+            self.file_watcher = None
+    
+    def _poll_watcher(self):
+        """輪詢變更的檔案並只重新載入這些檔案（文字顯示只更新受影響的範圍）"""
+        if self.file_watcher is None:
+            return
+        
+        reloaded = 0
+        for file_path in self.file_watcher.poll():
+            # 跟隨中的檔案只讀取新增的內容
+            if file_path in self.file_handler.file_list and not self.log_follower.is_following(file_path):
+                index = self.file_handler.file_list.index(file_path)
+                if self.file_handler.reload_file(index):
+                    reloaded += 1
+        if reloaded:
+            self.status_label.config(text=i18n.get_text("watch_reloaded", str(reloaded)))
+        self.root.after(200, self._poll_watcher)
+    
+    def _on_follow_file(self):
+        """開始或停止跟隨選中檔案的新增內容"""
+        index = self.file_list_widget.get_selected_index()
+        if index is None:
+            messagebox.showwarning(i18n.get_text("warning"), i18n.get_text("no_file_selected"))
+            return
+        
+        file_path = self.file_handler.file_list[index]
+        name = os.path.basename(file_path)
+        if self.log_follower.is_following(file_path):
+            self.log_follower.unfollow(file_path)
+            self.file_list_widget.set_following(file_path, False)
+            self.status_label.config(text=i18n.get_text("follow_stopped", name))
+            return
+        
+        if split_virtual_path(file_path) is not None:
+            messagebox.showwarning(i18n.get_text("warning"), i18n.get_text("archive_no_follow"))
+            return
+        
+        # 先載入到目前為止的內容，之後從實際讀取到的位置開始只讀取新增的位元組
+        # （載入與開始跟隨之間新增的內容不會遺失）
+        offset = None
+        if self.file_handler.reload_file(index):
+            offset = self.file_handler.get_file_stats(index).get('size')
+        encoding = self.file_handler.get_file_stats(index).get('encoding')
+        self.file_handler.append_content(index, "", FOLLOW_MAX_LINES)
+        if not self.log_follower.follow(file_path, encoding, offset):
+            return
+        self.file_list_widget.set_following(file_path, True)
+        self.status_label.config(text=i18n.get_text("follow_started", name))
+        if not self._follow_polling:
+            self._follow_polling = True
+            self.root.after(int(FOLLOW_POLL_INTERVAL * 1000), self._poll_followed)
+    
+    def _poll_followed(self):
+        """將跟隨中檔案新增的內容加到檔案尾端，檔案被截斷或輪替時重新載入"""
+        for file_path, text, reset in self.log_follower.poll():
+            index = self.file_handler.file_list.index(file_path)
+            if reset:
+                encoding = None
+                offset = None
+                if self.file_handler.reload_file(index):
+                    stats = self.file_handler.get_file_stats(index)
+                    encoding, offset = stats.get('encoding'), stats.get('size')
+                self.file_handler.append_content(index, "", FOLLOW_MAX_LINES)
+                self.log_follower.follow(file_path, encoding, offset)
+            else:
+                self.file_handler.append_content(index, text, FOLLOW_MAX_LINES)
+        
+        if self.log_follower.get_paths():
+            self.root.after(int(FOLLOW_POLL_INTERVAL * 1000), self._poll_followed)
+        else:
+            self._follow_polling = False
+    
+    def _on_file_selected(self, index: int):
+        """
+        選取檔案時捲動文字區域到該檔案的標題行
+        
+        Args:
+            index (int): 檔案索引
+        """
+        if not 0 <= index < self.file_handler.document.segment_count():
+            return
+        
+        # 文字內容先前被清空時重新顯示
+        if self.text_display_widget.document is not self.file_handler.document:
+            self._update_text_display()
+        
+        line = self.file_handler.document.segment_header_line(index)
+        self.text_display_widget.scroll_to_line(line)
+    
+    def _on_text_scrolled(self, top_line: int):
+        """
+        文字區域捲動時標示目前可見的檔案
+        
+        Args:
+            top_line (int): 可見範圍頂端的文件行號
+        """
+        if self.text_display_widget.document is not self.file_handler.document:
+            self.file_list_widget.set_current(None)
+            return
+        
+        # 以區段起始行號表二分搜尋，不需掃描文字
+        self.file_list_widget.set_current(self.file_handler.document.segment_at_line(top_line))
+    
+    def _prepare_search(self, query: str, use_regex: bool, case_sensitive: bool):
+        """
+        在UI執行緒取得檔案快照，回傳可在背景執行的搜尋工作
+        
+        Args:
+            query (str): 搜尋字串
+            use_regex (bool): 是否為正規表示式
+            case_sensitive (bool): 是否區分大小寫
+        """
+        entries = self.file_handler.get_entries()
+        return lambda task: self.search_engine.search(query, entries, use_regex, case_sensitive, task)
+    
+    def _on_search_hit_selected(self, file_path: str, hit: dict):
+        """
+        跳至搜尋命中的位置
+        
+        Args:
+            file_path (str): 命中的檔案路徑
+            hit (dict): 命中資訊（line、column、length）
+        """
+        if file_path not in self.file_handler.file_list:
+            return
+        
+        # 文字內容先前被清空時重新顯示
+        if self.text_display_widget.document is not self.file_handler.document:
+            self._update_text_display()
+        
+        index = self.file_handler.file_list.index(file_path)
+        line = self.file_handler.document.content_start_line(index) + hit['line']
+        self.text_display_widget.show_match(line, hit['column'], hit['length'])
     
     def _setup_keyboard_bindings(self):
         """設定鍵盤綁定"""
@@ -297,9 +724,40 @@ class MainWindow:
         self.root.bind('<Control-v>', self._on_paste)
         self.root.bind('<Control-V>', self._on_paste)
         
+        # 綁定 Ctrl+F 到搜尋
+        self.root.bind('<Control-f>', self._on_find)
+        self.root.bind('<Control-F>', self._on_find)
+        
+        # 綁定 Ctrl+L 到檔案列表篩選
+        self.root.bind('<Control-l>', self._on_filter_focus)
+        self.root.bind('<Control-L>', self._on_filter_focus)
+        
+        # 綁定 F12 到效能數據面板
+        self.root.bind('<F12>', self._on_show_metrics)
+        
         # 確保焦點在主視窗上以接收鍵盤事件
         self.root.focus_set()
     
+    def _on_find(self, event=None):
+        """處理 Ctrl+F 搜尋事件"""
+        self.search_panel.focus()
+        return "break"
+    
+    def _on_filter_focus(self, event=None):
+        """處理 Ctrl+L 篩選事件"""
+        self.file_list_widget.focus_filter()
+        return "break"
+    
+    def _on_show_metrics(self, event=None):
+        """處理 F12 效能數據面板事件"""
+        if self.metrics_panel is None:
+            # 除錯面板很少使用，第一次開啟時才載入
+            from gui.metrics_panel import MetricsPanel
+            self.metrics_panel = MetricsPanel(self.root)
+        else:
+            self.metrics_panel.show()
+        return "break"
+    
     def _on_paste(self, event=None):
         """處理 Ctrl+V 貼上事件"""
         try:
@@ -315,7 +773,7 @@ class MainWindow:
             else:
                 # 剪貼簿為空
                 self.status_label.config(text=i18n.get_text("clipboard_empty"))
-                
+        
         except Exception as e:
             messagebox.showerror(
                 i18n.get_text("error"), 
@@ -333,14 +791,9 @@ class MainWindow:
         for file_path in file_paths:
             success, message = self.file_handler.add_file(file_path)
             if success:
-                filename = os.path.basename(file_path)
-                self.file_list_widget.add_file(filename)
                 added_count += 1
         
         if added_count > 0:
-            # 更新文字顯示
-            self._update_text_display()
-            
             # 更新狀態
             self.status_label.config(
                 text=i18n.get_text("files_pasted", str(added_count))
@@ -363,10 +816,6 @@ class MainWindow:
             success, message = self.file_handler.add_file(temp_file_path)
             if success:
                 filename = os.path.basename(temp_file_path)
-                self.file_list_widget.add_file(filename)
-                
-                # 更新文字顯示
-                self._update_text_display()
                 
                 # 更新狀態
                 self.status_label.config(
@@ -379,7 +828,7 @@ class MainWindow:
                 except:
                     pass
                 self.status_label.config(text=message)
-                
+        
         except Exception as e:
             messagebox.showerror(
                 i18n.get_text("error"), 
@@ -388,9 +837,23 @@ class MainWindow:
     
     def _on_closing(self):
         """視窗關閉事件"""
+        self.search_engine.close()
+        self.file_filter.close()
+        self.token_counter.close()
+        self.content_reducer.close()
+        self.duplicate_detector.close()
+        self.task_executor.shutdown()
+        if self.metrics_panel is not None:
+            self.metrics_panel.destroy()
+        if self.file_watcher is not None:
+            self.file_watcher.close()
+        self.file_handler.flush_state()
         self.root.quit()
         self.root.destroy()
     
     def run(self):
-        """執行主程式"""
-        self.root.mainloop() 
\ No newline at end of file
+        """執行主程式（例如被 Ctrl+C 中斷時也寫入尚未保存的狀態）"""
+        try:
+            self.root.mainloop()
+        finally:
+            self.file_handler.flush_state() 
\ No newline at end of file
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+效能數據面板
+除錯用的視窗，定期顯示各熱點的呼叫次數、平均與百分位數耗時以及計數，
+可啟用或停用記錄、清除數據，並將數據儲存為 JSON
+"""
+
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+from core import metrics
+from utils.constants import METRICS_PERCENTILES, METRICS_REFRESH_INTERVAL
+from utils.i18n import i18n
+
+
+class MetricsPanel:
+    """效能數據面板（獨立視窗，關閉時只隱藏）"""
+    
+    def __init__(self, parent):
+        self.parent = parent
+        
+        self.window = tk.Toplevel(parent)
+        self.window.title(i18n.get_text("metrics_title"))
+        self.window.geometry("760x360")
+        self.window.protocol("WM_DELETE_WINDOW", self.hide)
+        
+        # 工具列
+        toolbar = ttk.Frame(self.window, padding="5")
+        toolbar.pack(fill=tk.X)
+        
+        self.enabled_var = tk.BooleanVar(value=metrics.is_enabled())
+        self.enable_check = ttk.Checkbutton(
+            toolbar,
+            text=i18n.get_text("metrics_enable"),
+            variable=self.enabled_var,
+            command=self._on_enable_toggled
+        )
+        self.enable_check.pack(side=tk.LEFT)
+        
+        self.reset_btn = ttk.Button(toolbar, text=i18n.get_text("metrics_reset"), command=self._on_reset_clicked)
+        self.reset_btn.pack(side=tk.LEFT, padx=(5, 0))
+        
+        self.save_btn = ttk.Button(toolbar, text=i18n.get_text("metrics_save"), command=self._on_save_clicked)
+        self.save_btn.pack(side=tk.LEFT, padx=(5, 0))
+        
+        # 數據表：耗時一列一項，計數排在最後（只有次數欄）
+        self.columns = (['count', 'mean_ms'] + [f'p{percentile}_ms' for percentile in METRICS_PERCENTILES]
+                        + ['max_ms', 'total_ms'])
+        table_frame = ttk.Frame(self.window, padding=(5, 0, 5, 5))
+        table_frame.pack(fill=tk.BOTH, expand=True)
+        self.tree = ttk.Treeview(table_frame, columns=self.columns, show='tree headings')
+        self.tree.column('#0', width=240, stretch=True)
+        for column in self.columns:
+            self.tree.column(column, width=70, anchor=tk.E, stretch=False)
+        scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self._update_headings()
+        
+        self._items = {}  # 數據名稱 -> 表格項目
+        self._refresh_job = None
+        
+        # 註冊為觀察者
+        i18n.add_observer(self)
+        self.refresh()
+    
+    def show(self):
+        """顯示視窗並開始定期更新"""
+        self.window.deiconify()
+        self.window.lift()
+        self.enabled_var.set(metrics.is_enabled())
+        self.refresh()
+    
+    def hide(self):
+        """隱藏視窗並停止更新（不影響記錄）"""
+        if self._refresh_job is not None:
+            self.window.after_cancel(self._refresh_job)
+            self._refresh_job = None
+        self.window.withdraw()
+    
+    def refresh(self):
+        """以目前的數據更新表格（只更新數值，不重建項目）"""
+        if self._refresh_job is not None:
+            self.window.after_cancel(self._refresh_job)
+        data = metrics.snapshot()
+        
+        rows = []
+        for name, timer in data['timers'].items():
+            rows.append((name, [timer[column] for column in self.columns]))
+        for name, value in data['counters'].items():
+            rows.append((name, [value] + [""] * (len(self.columns) - 1)))
+        
+        for name, values in rows:
+            item = self._items.get(name)
+            if item is None:
+                self._items[name] = self.tree.insert('', tk.END, text=name, values=values)
+            else:
+                self.tree.item(item, values=values)
+        
+        self._refresh_job = self.window.after(METRICS_REFRESH_INTERVAL, self.refresh)
+    
+    def _update_headings(self):
+        """更新欄位標題"""
+        self.tree.heading('#0', text=i18n.get_text("metrics_name"))
+        for column in self.columns:
+            if column == 'count':
+                text = i18n.get_text("metrics_count")
+            elif column == 'mean_ms':
+                text = i18n.get_text("metrics_mean")
+            elif column == 'max_ms':
+                text = i18n.get_text("metrics_max")
+            elif column == 'total_ms':
+                text = i18n.get_text("metrics_total")
+            else:
+                text = column[:-3] + " ms"
+            self.tree.heading(column, text=text)
+    
+    def _on_enable_toggled(self):
+        """啟用或停用記錄"""
+        metrics.enable(self.enabled_var.get())
+    
+    def _on_reset_clicked(self):
+        """清除已記錄的數據"""
+        metrics.reset()
+        self.tree.delete(*self.tree.get_children())
+        self._items.clear()
+        self.refresh()
+    
+    def _on_save_clicked(self):
+        """將數據儲存為 JSON"""
+        file_path = filedialog.asksaveasfilename(
+            parent=self.window,
+            defaultextension=".json",
+            filetypes=[("JSON", "*.json"), ("All", "*.*")]
+        )
+        if not file_path:
+            return
+        try:
+            metrics.dump(file_path)
+        except OSError as e:
+            messagebox.showerror(i18n.get_text("error"), i18n.get_text("export_failed", str(e)), parent=self.window)
+    
+    def on_language_changed(self):
+        """語言變更通知（觀察者模式）"""
+        self.window.title(i18n.get_text("metrics_title"))
+        self.enable_check.config(text=i18n.get_text("metrics_enable"))
+        self.reset_btn.config(text=i18n.get_text("metrics_reset"))
+        self.save_btn.config(text=i18n.get_text("metrics_save"))
+        self._update_headings()
+    
+    def destroy(self):
+        """銷毀元件時移除觀察者"""
+        i18n.remove_observer(self)
+        if self._refresh_job is not None:
+            self.window.after_cancel(self._refresh_job)
+            self._refresh_job = None
+        self.window.destroy()
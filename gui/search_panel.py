@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+搜尋面板元件
+提供搜尋欄位，並以檔案分組顯示命中結果
+"""
+
+import os
+import re
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable
+from utils.i18n import i18n
+
+
+class SearchPanel:
+    """搜尋面板元件"""
+    
+    def __init__(self, parent):
+        self.parent = parent
+        
+        # 創建主框架
+        self.frame = ttk.Frame(parent)
+        
+        # 搜尋列
+        search_bar = ttk.Frame(self.frame)
+        search_bar.pack(fill=tk.X)
+        
+        self.label = ttk.Label(search_bar, text=i18n.get_text("search"))
+        self.label.pack(side=tk.LEFT, padx=(0, 5))
+        
+        self.query_var = tk.StringVar()
+        self.entry = ttk.Entry(search_bar, textvariable=self.query_var)
+        self.entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.entry.bind('<Return>', self._on_search_clicked)
+        
+        self.regex_var = tk.BooleanVar(value=False)
+        self.regex_check = ttk.Checkbutton(
+            search_bar,
+            text=i18n.get_text("search_regex"),
+            variable=self.regex_var
+        )
+        self.regex_check.pack(side=tk.LEFT, padx=(5, 0))
+        
+        self.case_var = tk.BooleanVar(value=False)
+        self.case_check = ttk.Checkbutton(
+            search_bar,
+            text=i18n.get_text("search_case_sensitive"),
+            variable=self.case_var
+        )
+        self.case_check.pack(side=tk.LEFT, padx=(5, 0))
+        
+        self.search_btn = ttk.Button(
+            search_bar,
+            text=i18n.get_text("search"),
+            command=self._on_search_clicked
+        )
+        self.search_btn.pack(side=tk.LEFT, padx=(5, 0))
+        
+        self.result_label = ttk.Label(search_bar, text="")
+        self.result_label.pack(side=tk.LEFT, padx=(10, 0))
+        
+        # 結果樹（依檔案分組），有結果時才顯示
+        self.result_frame = ttk.Frame(self.frame)
+        self.result_tree = ttk.Treeview(self.result_frame, show='tree', height=6, selectmode='browse')
+        result_scrollbar = ttk.Scrollbar(self.result_frame, orient=tk.VERTICAL, command=self.result_tree.yview)
+        self.result_tree.configure(yscrollcommand=result_scrollbar.set)
+        self.result_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        result_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.result_tree.bind('<<TreeviewSelect>>', self._on_hit_selected)
+        
+        # 回調函數
+        self.search_callback = None
+        self.jump_callback = None
+        
+        # 命中項目 -> (檔案路徑, 命中資訊)
+        self._hit_items = {}
+        
+        # 背景工作執行器（由主視窗設定）與進行中的搜尋
+        self.task_executor = None
+        self._search_task = None
+        
+        # 註冊為觀察者
+        i18n.add_observer(self)
+    
+    def pack(self, **kwargs):
+        """包裝pack方法"""
+        self.frame.pack(**kwargs)
+    
+    def grid(self, **kwargs):
+        """包裝grid方法"""
+        self.frame.grid(**kwargs)
+    
+    def focus(self):
+        """將焦點移到搜尋欄位"""
+        self.entry.focus_set()
+        self.entry.select_range(0, tk.END)
+    
+    def set_search_callback(self, callback: Callable):
+        """
+        設定搜尋回調函數
+        
+        Args:
+            callback (Callable): callback(query, use_regex, case_sensitive) 在UI執行緒呼叫，
+                回傳一個以 Task 為參數的函數，於背景執行緒執行並回傳搜尋結果
+        """
+        self.search_callback = callback
+    
+    def set_task_executor(self, executor):
+        """
+        設定背景工作執行器
+        
+        Args:
+            executor (TaskExecutor): 背景工作執行器（擁有者負責以 Tk 事件迴圈輪詢）
+        """
+        self.task_executor = executor
+    
+    def set_jump_callback(self, callback: Callable):
+        """
+        設定跳至命中位置的回調函數
+        
+        Args:
+            callback (Callable): callback(file_path, hit)
+        """
+        self.jump_callback = callback
+    
+    def _on_search_clicked(self, event=None):
+        """搜尋按鈕點擊事件"""
+        query = self.query_var.get()
+        if not query or not self.search_callback:
+            return
+        
+        # 新的搜尋取代進行中的搜尋
+        if self._search_task is not None:
+            self._search_task.cancel()
+        work = self.search_callback(query, self.regex_var.get(), self.case_var.get())
+        self.result_label.config(text=i18n.get_text("searching"))
+        self._search_task = self.task_executor.submit(
+            work, pass_task=True, label=i18n.get_text("searching"),
+            on_done=self._on_search_done, on_error=self._on_search_failed)
+    
+    def _on_search_done(self, results: dict):
+        """搜尋完成"""
+        self._search_task = None
+        self.show_results(results)
+    
+    def _on_search_failed(self, error: Exception):
+        """搜尋失敗"""
+        self._search_task = None
+        if isinstance(error, re.error):
+            self.result_label.config(text=i18n.get_text("invalid_regex", str(error)))
+        else:
+            self.result_label.config(text=i18n.get_text("search_failed", str(error)))
+    
+    def show_results(self, results: dict):
+        """
+        顯示依檔案分組的搜尋結果
+        
+        Args:
+            results (dict): SearchEngine.search 的回傳值
+        """
+        self.result_tree.delete(*self.result_tree.get_children())
+        self._hit_items.clear()
+        
+        for file_result in results['files']:
+            file_path = file_result['path']
+            hits = file_result['hits']
+            file_item = self.result_tree.insert(
+                '', tk.END,
+                text=f"{os.path.basename(file_path)} ({len(hits)})",
+                open=len(results['files']) == 1
+            )
+            for hit in hits:
+                item = self.result_tree.insert(
+                    file_item, tk.END,
+                    text=f"{hit['line'] + 1}: {hit['text'].strip()}"
+                )
+                self._hit_items[item] = (file_path, hit)
+        
+        summary = i18n.get_text("search_summary", results['total_hits'], len(results['files']))
+        if results['truncated']:
+            summary += " +"
+        self.result_label.config(text=summary)
+        
+        if results['files']:
+            self.result_frame.pack(fill=tk.BOTH, expand=True, pady=(5, 0))
+        else:
+            self.result_frame.pack_forget()
+    
+    def clear_results(self):
+        """清除搜尋結果"""
+        self.result_tree.delete(*self.result_tree.get_children())
+        self._hit_items.clear()
+        self.result_label.config(text="")
+        self.result_frame.pack_forget()
+    
+    def _on_hit_selected(self, event=None):
+        """選取命中項目時跳至對應位置"""
+        selection = self.result_tree.selection()
+        if not selection or not self.jump_callback:
+            return
+        hit_item = self._hit_items.get(selection[0])
+        if hit_item:
+            self.jump_callback(*hit_item)
+    
+    def on_language_changed(self):
+        """語言變更通知（觀察者模式）"""
+        self.label.config(text=i18n.get_text("search"))
+        self.search_btn.config(text=i18n.get_text("search"))
+        self.regex_check.config(text=i18n.get_text("search_regex"))
+        self.case_check.config(text=i18n.get_text("search_case_sensitive"))
+    
+    def destroy(self):
+        """銷毀元件時移除觀察者"""
+        i18n.remove_observer(self)
+        self.frame.destroy()
@@ -1,8 +1,14 @@
 # -*- coding: utf-8 -*-
 import tkinter as tk
-from tkinter import ttk, messagebox
-import pyperclip
-from typing import Callable, Optional
+import tkinter.font as tkfont
+from tkinter import ttk, messagebox, filedialog
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+from core import metrics
+from core.change_delta import DELTA_MODES
+from core.clipboard_handler import copy_text
+from core.combined_document import CombinedDocument
+from core.output_formatters import get_format_names, get_formatter
+from utils.constants import DEFAULT_PART_LIMIT, VIEWER_MARGIN_LINES
 from utils.i18n import i18n
 
 
@@ -29,9 +35,9 @@ class TextDisplayWidget:
             fg='black'
         )
         
-        # 垂直滾動條
-        v_scrollbar = ttk.Scrollbar(text_frame, orient=tk.VERTICAL, command=self.text_widget.yview)
-        self.text_widget.configure(yscrollcommand=v_scrollbar.set)
+        # 垂直滾動條（依文件行號索引按比例顯示，而非僅反映已載入的視窗）
+        self.v_scrollbar = ttk.Scrollbar(text_frame, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.text_widget.configure(yscrollcommand=self._on_text_scrolled)
         
         # 水平滾動條
         h_scrollbar = ttk.Scrollbar(text_frame, orient=tk.HORIZONTAL, command=self.text_widget.xview)
@@ -39,7 +45,7 @@ class TextDisplayWidget:
         
         # 佈局文字框和滾動條
         self.text_widget.grid(row=0, column=0, sticky='nsew')
-        v_scrollbar.grid(row=0, column=1, sticky='ns')
+        self.v_scrollbar.grid(row=0, column=1, sticky='ns')
         h_scrollbar.grid(row=1, column=0, sticky='ew')
         
         # 設定grid權重
@@ -66,12 +72,100 @@ class TextDisplayWidget:
         )
         self.clear_btn.pack(side=tk.LEFT, padx=(5, 0))
         
+        # 創建匯出按鈕
+        self.export_btn = ttk.Button(
+            button_frame, 
+            text=i18n.get_text("export_content"), 
+            command=self._on_export_clicked
+        )
+        self.export_btn.pack(side=tk.LEFT, padx=(5, 0))
+        
+        # 創建分段複製按鈕與每段上限
+        self.copy_part_btn = ttk.Button(
+            button_frame,
+            text=i18n.get_text("copy_next_part"),
+            command=self._on_copy_part_clicked
+        )
+        self.copy_part_btn.pack(side=tk.LEFT, padx=(5, 0))
+        
+        self.part_limit_var = tk.StringVar(value=str(DEFAULT_PART_LIMIT))
+        self.part_limit_spinbox = ttk.Spinbox(
+            button_frame,
+            textvariable=self.part_limit_var,
+            from_=100,
+            to=10000000,
+            increment=1000,
+            width=8
+        )
+        self.part_limit_spinbox.pack(side=tk.LEFT, padx=(5, 0))
+        self.part_limit_var.trace_add('write', lambda *args: self.reset_parts())
+        
+        # 創建輸出格式選單（複製、分段複製與匯出共用）
+        self.format_label = ttk.Label(button_frame, text=i18n.get_text("output_format"))
+        self.format_label.pack(side=tk.LEFT, padx=(10, 0))
+        self.format_combobox = ttk.Combobox(button_frame, state="readonly", width=10)
+        self.format_combobox.pack(side=tk.LEFT, padx=(5, 0))
+        self._update_format_values()
+        self.format_combobox.current(0)
+        self.format_combobox.bind('<<ComboboxSelected>>', lambda e: self.reset_parts())
+        
+        # 創建精簡內容選項（移除註解、多餘空白與重複記錄行）
+        self.reduce_var = tk.BooleanVar(value=False)
+        self.reduce_check = ttk.Checkbutton(
+            button_frame,
+            text=i18n.get_text("reduce_content"),
+            variable=self.reduce_var,
+            command=self.reset_parts
+        )
+        self.reduce_check.pack(side=tk.LEFT, padx=(5, 0))
+        
+        # 創建相似檔案差異選項（每組相似檔案只完整輸出第一個，其他輸出差異）
+        self.diff_duplicates_var = tk.BooleanVar(value=False)
+        self.diff_duplicates_check = ttk.Checkbutton(
+            button_frame,
+            text=i18n.get_text("diff_duplicates"),
+            variable=self.diff_duplicates_var,
+            command=self.reset_parts
+        )
+        self.diff_duplicates_check.pack(side=tk.LEFT, padx=(5, 0))
+        
+        # 創建變更輸出選單（全部內容、只輸出上次複製或匯出後變更的檔案、變更的差異）
+        self.delta_combobox = ttk.Combobox(button_frame, state="readonly", width=14)
+        self.delta_combobox.pack(side=tk.LEFT, padx=(5, 0))
+        self._update_delta_values()
+        self.delta_combobox.current(0)
+        self.delta_combobox.bind('<<ComboboxSelected>>', lambda e: self.reset_parts())
+        
+        # 背景工作進度標籤（取代阻塞式對話框）
+        self.progress_label = ttk.Label(button_frame, text="")
+        self.progress_label.pack(side=tk.LEFT, padx=(10, 0))
+        
         # 狀態標籤
         self.status_label = ttk.Label(button_frame, text="")
         self.status_label.pack(side=tk.RIGHT)
         
         # 回調函數
         self.on_clear_callback = None
+        self.on_scroll_callback = None  # 可見範圍改變時呼叫，參數為頂端的文件行號
+        self.copy_source = None  # 回傳合併內容片段的函數（來自檔案模型）
+        self.parts_source = None  # 回傳分段產生器的函數，參數為每段上限
+        self.on_output_done_callback = None  # 複製、匯出或最後一段複製完成時呼叫
+        self._parts = None  # 進行中的分段複製產生器
+        
+        # 虛擬化顯示狀態：完整內容保存在文件模型中，
+        # 文字框只載入可見範圍前後各 VIEWER_MARGIN_LINES 行
+        self.document = None
+        self._owns_document = False
+        self._window_start = 0  # 已載入範圍的第一行（文件行號）
+        self._window_end = 0  # 已載入範圍的結束行（不含）
+        self._recenter_pending = False
+        self._line_height = max(1, tkfont.Font(font=self.text_widget.cget('font')).metrics('linespace'))
+        self.text_widget.bind('<Configure>', self._on_resize)
+        self.text_widget.tag_configure('search_hit', background='yellow')
+        
+        # 背景工作執行器（由主視窗設定，其完成佇列由 Tk 事件迴圈輪詢）
+        self.task_executor = None
+        self._job_running = False
         
         # 註冊為觀察者
         i18n.add_observer(self)
@@ -84,6 +178,22 @@ class TextDisplayWidget:
         """包裝grid方法"""
         self.frame.grid(**kwargs)
     
+    @metrics.timed('text_display.set_document')
+    def set_document(self, document: CombinedDocument):
+        """
+        顯示文件模型的內容，只載入可見範圍
+        
+        Args:
+            document (CombinedDocument): 合併文件模型
+        """
+        # 同一份文件時保留目前的捲動位置
+        top = self._top_line() if document is self.document else 0
+        self.document = document
+        self._owns_document = False
+        self._render_window(top)
+        self._update_status()
+    
+    @metrics.timed('text_display.set_content')
     def set_content(self, content: str):
         """
         設定文字內容
@@ -91,15 +201,20 @@ class TextDisplayWidget:
         Args:
             content (str): 要顯示的文字內容
         """
-        self.text_widget.config(state=tk.NORMAL)
-        self.text_widget.delete(1.0, tk.END)
-        self.text_widget.insert(1.0, content)
-        self.text_widget.config(state=tk.DISABLED)
+        document = CombinedDocument()
+        if content:
+            document.append_segment(None, content)
+        self.set_document(document)
+        self._owns_document = True
+    
+    def has_content(self) -> bool:
+        """
+        是否有顯示內容
         
-        # 更新狀態
-        lines = content.count('\n') + 1 if content else 0
-        chars = len(content)
-        self.status_label.config(text=i18n.get_text("lines_chars", lines, chars))
+        Returns:
+            bool: 有內容返回True
+        """
+        return self.document is not None and self.document.line_count() > 0
     
     def get_content(self) -> str:
         """
@@ -108,13 +223,13 @@ class TextDisplayWidget:
         Returns:
             str: 文字內容
         """
-        return self.text_widget.get(1.0, tk.END).rstrip('\n')
+        return self.document.get_text() if self.document else ""
     
     def clear_content(self):
         """清空文字內容"""
-        self.text_widget.config(state=tk.NORMAL)
-        self.text_widget.delete(1.0, tk.END)
-        self.text_widget.config(state=tk.DISABLED)
+        self.document = None
+        self._owns_document = False
+        self._render_window(0)
         self.status_label.config(text="")
     
     def append_content(self, content: str):
@@ -124,49 +239,502 @@ class TextDisplayWidget:
         Args:
             content (str): 要追加的文字內容
         """
+        # 不修改外部的文件模型，改為建立自己的副本
+        if not self._owns_document:
+            document = CombinedDocument()
+            if self.document:
+                for segment in self.document.segments:
+                    document.append_segment(segment['header'], segment['content'])
+            self.document = document
+            self._owns_document = True
+        
+        self.document.append_segment(None, content)
+        
+        # 自動滾動到底部
+        self._render_window(self.document.line_count() - 1)
+        self._update_status()
+    
+    def scroll_to_line(self, line: int):
+        """
+        捲動到文件中的指定行
+        
+        Args:
+            line (int): 文件行號（從0開始）
+        """
+        if self._window_start <= line < self._window_end:
+            self.text_widget.yview(f"{line - self._window_start + 1}.0")
+        else:
+            self._render_window(line)
+    
+    def show_match(self, line: int, column: int, length: int):
+        """
+        捲動到文件中的指定位置並標示命中範圍
+        
+        Args:
+            line (int): 文件行號（從0開始）
+            column (int): 行內起始欄位
+            length (int): 命中長度
+        """
+        self.scroll_to_line(line)
+        self.text_widget.tag_remove('search_hit', 1.0, tk.END)
+        start = f"{line - self._window_start + 1}.{column}"
+        self.text_widget.tag_add('search_hit', start, f"{start}+{length}c")
+    
+    def apply_line_change(self, start: int, old_count: int, new_count: int):
+        """
+        套用文件模型的行變更，只更新文字框中受影響的範圍並保留捲動位置
+        
+        文件模型必須已經是變更後的狀態；參數描述原文件中
+        [start, start + old_count) 的行被新文件中 [start, start + new_count) 的行取代。
+        區段邊界由文件模型的區段起始行號表定位（文字框只載入部分範圍，
+        不為每個區段設定標記），只以 view_top 標記保留可見位置。
+        
+        Args:
+            start (int): 變更起始行
+            old_count (int): 被取代的原行數
+            new_count (int): 取代後的新行數
+        """
+        if not self.document:
+            return
+        
+        old_end = start + old_count
+        delta = new_count - old_count
+        window_start, window_end = self._window_start, self._window_end
+        
+        if start < window_start and old_end <= window_start:
+            # 變更完全在已載入範圍之上：文字框內容不變，只平移行號
+            self._window_start += delta
+            self._window_end += delta
+        elif start < window_start:
+            # 變更跨越已載入範圍頂端：重新載入
+            self._render_window(start)
+        elif start > window_end or (start == window_end and window_end < self.document.line_count() - delta):
+            # 變更完全在已載入範圍之下：不需處理
+            pass
+        else:
+            self._splice_window(start, old_end, new_count)
+        
+        self._update_scrollbar()
+        self._update_status()
+    
+    @metrics.timed('text_display.splice_window')
+    def _splice_window(self, start: int, old_end: int, new_count: int):
+        """
+        在已載入範圍內以行為單位替換文字，並以標記保留可見位置
+        
+        Args:
+            start (int): 變更起始行（位於已載入範圍內）
+            old_end (int): 原文件中被取代範圍的結束行
+            new_count (int): 新行數
+        """
+        window_start, window_end = self._window_start, self._window_end
+        capacity = self._visible_lines() + 2 * VIEWER_MARGIN_LINES
+        insert_count = min(new_count, capacity)
+        
+        # 以標記記住目前頂端行，文字增刪後 Tk 會自動調整其位置
+        self.text_widget.mark_set('view_top', '@0,0')
+        
+        first = start - window_start + 1
+        last = min(old_end, window_end) - window_start + 1
+        self.text_widget.config(state=tk.NORMAL)
+        self.text_widget.delete(f"{first}.0", f"{last}.0")
+        self.text_widget.insert(f"{first}.0",
+                                self._join_lines(self.document.get_lines(start, start + insert_count)))
+        
+        if old_end <= window_end and insert_count == new_count:
+            window_end += new_count - (old_end - start)
+        else:
+            # 新內容只載入一部分，捨棄其後不再連續的舊行
+            self.text_widget.delete(f"{first + insert_count}.0", tk.END)
+            window_end = start + insert_count
+        self._window_end = window_end
+        
+        # 依新的頂端行補足或裁切下方的緩衝行
+        top = window_start + int(self.text_widget.index('view_top').split('.')[0]) - 1
+        target_end = min(self.document.line_count(), top + self._visible_lines() + VIEWER_MARGIN_LINES)
+        if self._window_end < target_end:
+            self.text_widget.insert('end-1c', self._join_lines(
+                self.document.get_lines(self._window_end, target_end)))
+            self._window_end = target_end
+        elif self._window_end > target_end + VIEWER_MARGIN_LINES:
+            self.text_widget.delete(f"{target_end - window_start + 1}.0", tk.END)
+            self._window_end = target_end
+        self.text_widget.config(state=tk.DISABLED)
+        
+        self.text_widget.yview('view_top')
+    
+    def _update_status(self):
+        """以文件模型的累計值更新狀態標籤（不需掃描內容）"""
+        if not self.document:
+            self.status_label.config(text="")
+            return
+        self.status_label.config(text=i18n.get_text(
+            "lines_chars_bytes",
+            self.document.line_count(),
+            self.document.total_chars,
+            self.document.total_bytes
+        ))
+    
+    def _visible_lines(self) -> int:
+        """估計文字框可見的行數"""
+        return max(1, self.text_widget.winfo_height() // self._line_height)
+    
+    def _top_line(self) -> int:
+        """目前可見範圍第一行的文件行號"""
+        if not self.document:
+            return 0
+        return self._window_start + int(self.text_widget.index('@0,0').split('.')[0]) - 1
+    
+    @metrics.timed('text_display.render_window')
+    def _render_window(self, top: int):
+        """
+        重新載入以指定行為頂端的可見範圍（含前後緩衝行）
+        
+        Args:
+            top (int): 要顯示在頂端的文件行號
+        """
+        total = self.document.line_count() if self.document else 0
+        top = max(0, min(top, total - 1))
+        start = max(0, top - VIEWER_MARGIN_LINES)
+        end = min(total, top + self._visible_lines() + VIEWER_MARGIN_LINES)
+        lines = self.document.get_lines(start, end) if self.document else []
+        metrics.increment('text_display.rendered_lines', len(lines))
+        
+        self._window_start, self._window_end = start, end
         self.text_widget.config(state=tk.NORMAL)
-        if self.text_widget.get(1.0, tk.END).strip():
-            self.text_widget.insert(tk.END, "\n\n")
-        self.text_widget.insert(tk.END, content)
+        self.text_widget.delete(1.0, tk.END)
+        self.text_widget.insert(1.0, self._join_lines(lines))
         self.text_widget.config(state=tk.DISABLED)
+        self.text_widget.yview(f"{top - start + 1}.0")
+        self._update_scrollbar()
+    
+    @staticmethod
+    def _join_lines(lines) -> str:
+        """將行列表轉為文字框內容（每行皆以換行結尾，方便以行為單位增刪）"""
+        return "".join(line + "\n" for line in lines)
+    
+    def _update_scrollbar(self):
+        """依文件總行數設定垂直滾動條的位置與比例"""
+        total = self.document.line_count() if self.document else 0
+        if total == 0:
+            self.v_scrollbar.set(0.0, 1.0)
+            return
+        top = self._top_line()
+        self.v_scrollbar.set(top / total, min(1.0, (top + self._visible_lines()) / total))
+    
+    def _on_text_scrolled(self, first=None, last=None):
+        """文字框捲動時更新滾動條，接近已載入範圍邊緣時重新載入"""
+        self._update_scrollbar()
+        if not self.document:
+            return
         
-        # 自動滾動到底部
-        self.text_widget.see(tk.END)
+        top = self._top_line()
+        if self.on_scroll_callback:
+            self.on_scroll_callback(top)
+        if self._recenter_pending:
+            return
         
-        # 更新狀態
-        full_content = self.get_content()
-        lines = full_content.count('\n') + 1 if full_content else 0
-        chars = len(full_content)
-        self.status_label.config(text=i18n.get_text("lines_chars", lines, chars))
+        bottom = top + self._visible_lines()
+        threshold = VIEWER_MARGIN_LINES // 2
+        near_top = self._window_start > 0 and top - self._window_start < threshold
+        near_bottom = (self._window_end < self.document.line_count()
+                       and self._window_end - bottom < threshold)
+        if near_top or near_bottom:
+            self._recenter_pending = True
+            self.text_widget.after_idle(self._recenter)
+    
+    def _recenter(self):
+        """以目前頂端行為中心重新載入範圍"""
+        self._recenter_pending = False
+        if self.document:
+            self._render_window(self._top_line())
+    
+    def _on_scrollbar(self, *args):
+        """垂直滾動條事件：拖曳時依比例跳到文件行號，其餘交給文字框處理"""
+        if not self.document:
+            return
+        if args and args[0] == 'moveto':
+            self.scroll_to_line(int(float(args[1]) * self.document.line_count()))
+        else:
+            self.text_widget.yview(*args)
+    
+    def _on_resize(self, event=None):
+        """文字框大小改變時檢查已載入範圍是否足夠"""
+        self._on_text_scrolled()
     
     def set_clear_callback(self, callback: Callable):
         """設定清空回調函數"""
         self.on_clear_callback = callback
     
+    def set_scroll_callback(self, callback: Callable[[int], None]):
+        """
+        設定捲動回調函數
+        
+        Args:
+            callback (Callable[[int], None]): 可見範圍改變時呼叫，參數為頂端的文件行號
+        """
+        self.on_scroll_callback = callback
+    
+    def set_copy_source(self, callback: Callable[[], Iterable[str]]):
+        """
+        設定複製/匯出的內容來源
+        
+        Args:
+            callback (Callable[[], Iterable[str]]): 在UI執行緒呼叫，
+                回傳合併內容片段（需為快照，之後會在背景執行緒中讀取）
+        """
+        self.copy_source = callback
+    
+    def set_output_done_callback(self, callback: Callable[[], None]):
+        """
+        設定輸出完成的回調函數（完整複製、匯出或分段複製的最後一段）
+        
+        Args:
+            callback (Callable[[], None]): 回調函數
+        """
+        self.on_output_done_callback = callback
+    
+    def set_parts_source(self, callback: Callable[[int], Iterator[Tuple[int, int, str]]]):
+        """
+        設定分段複製的內容來源
+        
+        Args:
+            callback (Callable[[int], Iterator[Tuple[int, int, str]]]): 在UI執行緒呼叫，參數為每段上限，
+                回傳 (段落編號, 總段數, 段落文字) 的產生器（之後會在背景執行緒中取值）
+        """
+        self.parts_source = callback
+    
+    def get_output_format(self) -> str:
+        """
+        取得選擇的輸出格式
+        
+        Returns:
+            str: 格式名稱（get_format_names() 之一）
+        """
+        return get_format_names()[max(0, self.format_combobox.current())]
+    
+    def reduces_content(self) -> bool:
+        """
+        是否在輸出前精簡內容
+        
+        Returns:
+            bool: 勾選精簡內容時為True
+        """
+        return self.reduce_var.get()
+    
+    def get_delta_mode(self) -> str:
+        """
+        取得選擇的變更輸出模式
+        
+        Returns:
+            str: 模式名稱（DELTA_MODES 之一）
+        """
+        return DELTA_MODES[max(0, self.delta_combobox.current())]
+    
+    def diffs_duplicates(self) -> bool:
+        """
+        是否將相似檔案輸出為相對於代表檔案的差異
+        
+        Returns:
+            bool: 勾選時為True
+        """
+        return self.diff_duplicates_var.get()
+    
+    def _update_format_values(self):
+        """更新輸出格式選單的文字（保留目前的選擇）"""
+        current = self.format_combobox.current()
+        self.format_combobox['values'] = [i18n.get_text(f"format_{name}") for name in get_format_names()]
+        if current >= 0:
+            self.format_combobox.current(current)
+    
+    def _update_delta_values(self):
+        """更新變更輸出選單的文字（保留目前的選擇）"""
+        current = self.delta_combobox.current()
+        self.delta_combobox['values'] = [i18n.get_text(f"delta_{name}") for name in DELTA_MODES]
+        if current >= 0:
+            self.delta_combobox.current(current)
+    
+    def reset_parts(self):
+        """重新開始分段複製（內容或每段上限變更時）"""
+        if self._parts is None:
+            return
+        self._parts = None
+        if not self._job_running:
+            self.progress_label.config(text="")
+    
+    def _get_output_chunks(self) -> Iterable[str]:
+        """取得要輸出的內容片段，優先使用檔案模型"""
+        if self.copy_source:
+            return self.copy_source()
+        return [self.get_content()]
+    
+    def set_task_executor(self, executor):
+        """
+        設定背景工作執行器
+        
+        Args:
+            executor (TaskExecutor): 背景工作執行器（擁有者負責以 Tk 事件迴圈輪詢）
+        """
+        self.task_executor = executor
+    
+    def _run_in_background(self, work: Callable, on_done: Callable, on_error: Callable, label: str):
+        """
+        在背景執行緒執行工作，完成後於Tk事件迴圈中回呼
+        
+        Args:
+            work (Callable): 背景工作，回傳值會傳給 on_done
+            on_done (Callable): 成功回呼
+            on_error (Callable): 失敗回呼，參數為例外
+            label (str): 狀態列顯示的工作名稱
+        """
+        def finished(callback):
+            def deliver(result):
+                self._job_running = False
+                self._set_buttons_state(tk.NORMAL)
+                callback(result)
+            return deliver
+        
+        self._job_running = True
+        self._set_buttons_state(tk.DISABLED)
+        self.task_executor.submit(work, on_done=finished(on_done), on_error=finished(on_error), label=label)
+    
+    def _set_buttons_state(self, state):
+        """設定複製與匯出按鈕狀態"""
+        self.copy_btn.config(state=state)
+        self.export_btn.config(state=state)
+        self.copy_part_btn.config(state=state)
+    
     def _on_copy_clicked(self):
         """複製按鈕點擊事件"""
-        content = self.get_content()
-        if content.strip():
+        if self._job_running:
+            return
+        if not self.has_content():
+            messagebox.showwarning(
+                i18n.get_text("warning"), 
+                i18n.get_text("no_content_to_copy")
+            )
+            return
+        
+        chunks = self._get_output_chunks()
+        
+        def work():
+            copy_text("".join(chunks))
+        
+        self.progress_label.config(text=i18n.get_text("copying"))
+        self._run_in_background(work, self._on_copy_done, self._on_copy_failed, i18n.get_text("copying"))
+    
+    def _on_copy_done(self, _result):
+        """複製完成"""
+        self.progress_label.config(text=i18n.get_text("content_copied"))
+        if self.on_output_done_callback:
+            self.on_output_done_callback()
+    
+    def _on_copy_failed(self, error: Exception):
+        """複製失敗"""
+        self.progress_label.config(text="")
+        messagebox.showerror(
+            i18n.get_text("error"), 
+            i18n.get_text("copy_failed", str(error))
+        )
+    
+    def _on_copy_part_clicked(self):
+        """複製下一段按鈕點擊事件"""
+        if self._job_running or not self.parts_source:
+            return
+        if not self.has_content():
+            messagebox.showwarning(
+                i18n.get_text("warning"), 
+                i18n.get_text("no_content_to_copy")
+            )
+            return
+        
+        if self._parts is None:
             try:
-                pyperclip.copy(content)
-                messagebox.showinfo(
-                    i18n.get_text("success"), 
-                    i18n.get_text("content_copied")
-                )
-            except Exception as e:
+                limit = int(self.part_limit_var.get().replace(',', ''))
+            except ValueError:
+                limit = DEFAULT_PART_LIMIT
+            try:
+                self._parts = self.parts_source(max(1, limit))
+            except ValueError:
                 messagebox.showerror(
-                    i18n.get_text("error"), 
-                    i18n.get_text("copy_failed", str(e))
+                    i18n.get_text("error"),
+                    i18n.get_text("part_limit_too_small")
                 )
-        else:
+                return
+        parts = self._parts
+        
+        def work():
+            part = next(parts, None)
+            if part is not None:
+                copy_text(part[2])
+            return part
+        
+        self.progress_label.config(text=i18n.get_text("copying"))
+        self._run_in_background(work, self._on_copy_part_done, self._on_copy_failed, i18n.get_text("copying"))
+    
+    def _on_copy_part_done(self, part: Optional[Tuple[int, int, str]]):
+        """分段複製完成"""
+        if part is None:
+            # 所有段落都已複製，下次從第一段開始
+            self._parts = None
+            self.progress_label.config(text=i18n.get_text("all_parts_copied"))
+            return
+        
+        index, total, _ = part
+        if index == total:
+            self._parts = None
+            if self.on_output_done_callback:
+                self.on_output_done_callback()
+        self.progress_label.config(text=i18n.get_text("part_copied", index, total))
+    
+    def _on_export_clicked(self):
+        """匯出按鈕點擊事件"""
+        if self._job_running:
+            return
+        if not self.has_content():
             messagebox.showwarning(
                 i18n.get_text("warning"), 
                 i18n.get_text("no_content_to_copy")
             )
+            return
+        
+        # 預設副檔名依輸出格式而定
+        extension = get_formatter(self.get_output_format()).extension
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=extension,
+            filetypes=[(self.format_combobox.get(), "*" + extension), ("All", "*.*")]
+        )
+        if not file_path:
+            return
+        
+        chunks = self._get_output_chunks()
+        
+        def work():
+            with open(file_path, 'w', encoding='utf-8', newline='') as f:
+                for chunk in chunks:
+                    f.write(chunk)
+            return file_path
+        
+        self.progress_label.config(text=i18n.get_text("exporting"))
+        self._run_in_background(work, self._on_export_done, self._on_export_failed, i18n.get_text("exporting"))
+    
+    def _on_export_done(self, file_path: str):
+        """匯出完成"""
+        self.progress_label.config(text=i18n.get_text("content_exported", file_path))
+        if self.on_output_done_callback:
+            self.on_output_done_callback()
+    
+    def _on_export_failed(self, error: Exception):
+        """匯出失敗"""
+        self.progress_label.config(text="")
+        messagebox.showerror(
+            i18n.get_text("error"), 
+            i18n.get_text("export_failed", str(error))
+        )
     
     def _on_clear_clicked(self):
         """清空按鈕點擊事件"""
-        if self.get_content().strip():
+        if self.has_content():
             result = messagebox.askyesno(
                 i18n.get_text("confirm"), 
                 i18n.get_text("confirm_clear_content")
@@ -185,13 +753,17 @@ class TextDisplayWidget:
         # 更新按鈕文字
         self.copy_btn.config(text=i18n.get_text("copy_content"))
         self.clear_btn.config(text=i18n.get_text("clear_content"))
+        self.export_btn.config(text=i18n.get_text("export_content"))
+        self.copy_part_btn.config(text=i18n.get_text("copy_next_part"))
+        self.format_label.config(text=i18n.get_text("output_format"))
+        self.reduce_check.config(text=i18n.get_text("reduce_content"))
+        self.diff_duplicates_check.config(text=i18n.get_text("diff_duplicates"))
+        self._update_format_values()
+        self._update_delta_values()
         
         # 更新狀態標籤（如果有內容的話）
-        content = self.get_content()
-        if content:
-            lines = content.count('\n') + 1
-            chars = len(content)
-            self.status_label.config(text=i18n.get_text("lines_chars", lines, chars))
+        if self.has_content():
+            self._update_status()
     
     def destroy(self):
         """銷毀元件時移除觀察者"""
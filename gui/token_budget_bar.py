@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+Token 預算列元件
+顯示所有檔案的 token（或位元組）總數與預算的比例，
+並可選擇複製/匯出時將輸出裁剪到預算內
+"""
+
+import tkinter as tk
+from tkinter import ttk
+from typing import Tuple
+from core.budget_fitter import FIT_STRATEGIES
+from utils.constants import BUDGET_UNITS, DEFAULT_TOKEN_BUDGET
+from utils.i18n import i18n
+
+
+class TokenBudgetBar:
+    """Token 預算列元件"""
+    
+    def __init__(self, parent, budget: int = DEFAULT_TOKEN_BUDGET):
+        self.parent = parent
+        
+        # 創建框架
+        self.frame = ttk.Frame(parent)
+        
+        # 總數標籤
+        self.total_label = ttk.Label(self.frame, text="")
+        self.total_label.pack(side=tk.LEFT)
+        
+        # 使用比例
+        self.progress = ttk.Progressbar(self.frame, length=100, mode='determinate', maximum=100)
+        self.progress.pack(side=tk.LEFT, padx=(5, 10))
+        
+        # 預算設定
+        self.budget_label = ttk.Label(self.frame, text=i18n.get_text("token_budget"))
+        self.budget_label.pack(side=tk.LEFT, padx=(0, 5))
+        
+        self.budget_var = tk.StringVar(value=str(budget))
+        self.budget_spinbox = ttk.Spinbox(
+            self.frame,
+            textvariable=self.budget_var,
+            from_=1000,
+            to=10000000,
+            increment=1000,
+            width=10
+        )
+        self.budget_spinbox.pack(side=tk.LEFT)
+        self.budget_var.trace_add('write', lambda *args: self._refresh())
+        
+        # 預算單位（token 或位元組）
+        self.unit_combobox = ttk.Combobox(self.frame, state="readonly", width=8)
+        self.unit_combobox.pack(side=tk.LEFT, padx=(5, 0))
+        self.unit_combobox.bind('<<ComboboxSelected>>', lambda event: self._refresh())
+        
+        # 複製/匯出時裁剪到預算內
+        self.fit_var = tk.BooleanVar(value=False)
+        self.fit_check = ttk.Checkbutton(
+            self.frame,
+            text=i18n.get_text("fit_output"),
+            variable=self.fit_var
+        )
+        self.fit_check.pack(side=tk.LEFT, padx=(10, 0))
+        
+        self.strategy_combobox = ttk.Combobox(self.frame, state="readonly", width=10)
+        self.strategy_combobox.pack(side=tk.LEFT, padx=(5, 0))
+        
+        self._update_combobox_values()
+        self.unit_combobox.current(0)
+        self.strategy_combobox.current(0)
+        
+        # 目前顯示的值
+        self._totals = {unit: 0 for unit in BUDGET_UNITS}
+        self._pending = 0
+        
+        # 註冊為觀察者
+        i18n.add_observer(self)
+        self._refresh()
+    
+    def pack(self, **kwargs):
+        """包裝pack方法"""
+        self.frame.pack(**kwargs)
+    
+    def grid(self, **kwargs):
+        """包裝grid方法"""
+        self.frame.grid(**kwargs)
+    
+    def get_budget(self) -> int:
+        """
+        取得目前的 token 預算
+        
+        Returns:
+            int: token 預算，輸入無效時返回預設值
+        """
+        try:
+            budget = int(self.budget_var.get().replace(',', ''))
+        except ValueError:
+            return DEFAULT_TOKEN_BUDGET
+        return budget if budget > 0 else DEFAULT_TOKEN_BUDGET
+    
+    def get_unit(self) -> str:
+        """
+        取得預算單位
+        
+        Returns:
+            str: BUDGET_UNITS 之一（'tokens' 或 'bytes'）
+        """
+        return BUDGET_UNITS[max(0, self.unit_combobox.current())]
+    
+    def get_fit_options(self) -> Tuple[bool, str]:
+        """
+        取得預算內輸出的設定
+        
+        Returns:
+            Tuple[bool, str]: (是否裁剪輸出, 分配策略)
+        """
+        return self.fit_var.get(), FIT_STRATEGIES[max(0, self.strategy_combobox.current())]
+    
+    def set_totals(self, tokens: int, size: int, pending: int = 0):
+        """
+        更新總數
+        
+        Args:
+            tokens (int): 已計算完成的 token 總數
+            size (int): 位元組總數
+            pending (int): 尚未計算 token 數的檔案數
+        """
+        totals = {'tokens': tokens, 'bytes': size}
+        if totals == self._totals and pending == self._pending:
+            return
+        self._totals = totals
+        self._pending = pending
+        self._refresh()
+    
+    def _refresh(self):
+        """依總數與預算更新顯示"""
+        unit = self.get_unit()
+        total = self._totals[unit]
+        budget = self.get_budget()
+        text = i18n.get_text(f"{unit}_total", f"{total:,}", f"{budget:,}", total * 100 / budget)
+        if self._pending and unit == 'tokens':
+            text += " " + i18n.get_text("token_pending", self._pending)
+        self.total_label.config(text=text, foreground='red' if total > budget else '')
+        self.progress['value'] = min(100, total * 100 / budget)
+    
+    def _update_combobox_values(self):
+        """更新下拉選單的文字（保留目前的選擇）"""
+        for combobox, keys in ((self.unit_combobox, [f"budget_unit_{unit}" for unit in BUDGET_UNITS]),
+                               (self.strategy_combobox, [f"fit_{name}" for name in FIT_STRATEGIES])):
+            current = combobox.current()
+            combobox['values'] = [i18n.get_text(key) for key in keys]
+            if current >= 0:
+                combobox.current(current)
+    
+    def on_language_changed(self):
+        """語言變更通知（觀察者模式）"""
+        self.budget_label.config(text=i18n.get_text("token_budget"))
+        self.fit_check.config(text=i18n.get_text("fit_output"))
+        self._update_combobox_values()
+        self._refresh()
+    
+    def destroy(self):
+        """銷毀元件時移除觀察者"""
+        i18n.remove_observer(self)
+        self.frame.destroy()
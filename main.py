@@ -3,19 +3,74 @@
 """
 文字檔案拖拽工具
 支援拖拽文字檔案到程式中，顯示檔案列表和內容
+
+命令列合併模式（不載入GUI）:
+    python main.py combine [路徑|萬用字元|-] ...
+    
+常駐服務（保留檔案快取）與客戶端:
+    python main.py daemon
+    python main.py client combine [路徑|萬用字元|-] ...
+    
+監看模式（檔案變更時更新輸出檔案）:
+    python main.py watch [路徑|萬用字元|-] ... -o 輸出檔案
+    
+效能數據（結束時以 JSON 輸出，'-' 表示標準錯誤；也可設定環境變數 DRAG_N_PASTE_METRICS）:
+    python main.py --metrics 輸出檔案 [命令 ...]
 """
 
+import time
+
+STARTED = time.perf_counter()
+
 import sys
 import os
 
 # 將當前目錄加入Python路徑
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from gui.main_window import MainWindow
+# 命令列命令 -> 模組（模組需提供 main(argv, started)）
+COMMANDS = {
+    'combine': 'cli.combine',
+    'daemon': 'cli.daemon',
+    'client': 'cli.client',
+    'watch': 'cli.watch'
+}
+
+
+def setup_metrics():
+    """
+    依 --metrics 參數（必須是第一個參數）或環境變數啟用效能數據記錄，
+    並在程式結束時輸出 JSON；未啟用時不載入記錄模組
+    """
+    from utils.constants import METRICS_ENV
+    output = os.environ.get(METRICS_ENV)
+    if len(sys.argv) > 1 and sys.argv[1].startswith('--metrics='):
+        output = sys.argv.pop(1).split('=', 1)[1]
+    elif len(sys.argv) > 2 and sys.argv[1] == '--metrics':
+        output = sys.argv[2]
+        del sys.argv[1:3]
+    if not output:
+        return
+    
+    import atexit
+    from core import metrics
+    metrics.enable()
+    atexit.register(metrics.dump, None if output == '-' else output, sys.stderr)
 
 
 def main():
     """主程式入口"""
+    setup_metrics()
+    
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        # 命令列模式只載入核心模組
+        import importlib
+        command = importlib.import_module(COMMANDS[sys.argv[1]])
+        sys.exit(command.main(sys.argv[2:], STARTED))
+    
+    # GUI模組只在需要時載入
+    from gui.main_window import MainWindow
+    
     try:
         # 創建並執行主視窗
         app = MainWindow()
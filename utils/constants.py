@@ -9,4 +9,71 @@ SUPPORTED_TEXT_EXTENSIONS = {
 
 # GUI相關常數
 WINDOW_SIZE = "800x600"
-WINDOW_MIN_SIZE = (600, 400) 
\ No newline at end of file
+WINDOW_MIN_SIZE = (600, 400) 
+
+# 文字檢視器在可見範圍前後額外載入的行數（虛擬化顯示）
+VIEWER_MARGIN_LINES = 200
+
+# 搜尋相關常數
+MAX_SEARCH_HITS = 5000  # 單次搜尋最多回傳的命中數
+TRIGRAM_BITS_PER_GRAM = 8  # 三元組位元集合每個不同三元組使用的位元數（依檔案大小調整集合大小）
+TRIGRAM_MIN_BITS = 64  # 三元組位元集合的最小位元數
+TRIGRAM_MAX_BITS = 1 << 22  # 三元組位元集合的最大位元數
+TRIGRAM_MAX_CHARS = 4000000  # 超過此字元數的檔案不建立三元組索引
+
+# 狀態保存延遲（秒），短時間內的多次變更只寫入一次狀態檔案
+STATE_SAVE_DELAY = 0.5
+
+# 啟動時分批載入上次狀態，每批最多佔用事件迴圈的秒數
+STARTUP_SLICE = 0.03
+
+# Token 計數相關常數
+DEFAULT_TOKEN_BUDGET = 128000  # 預設的 token 預算
+BUDGET_UNITS = ('tokens', 'bytes')  # 預算單位
+DEFAULT_PART_LIMIT = 8000  # 分段複製時每段的預設上限（單位與預算相同）
+TOKEN_CACHE_SIZE = 4096  # 依內容雜湊快取的 token 計數數量
+
+# 輸出格式相關常數
+FORMATTER_CACHE_SIZE = 4096  # 每種輸出格式快取的檔案標題與結尾數量
+
+# 內容精簡相關常數
+DEFAULT_REDUCTION_OPTIONS = ('trailing_whitespace', 'blank_lines', 'comments', 'license_header', 'log_repeats')
+REDUCTION_CACHE_SIZE = 1024  # 依（內容雜湊, 步驟）快取的精簡結果數量
+REDUCTION_POOL_MIN_CHARS = 1000000  # 待處理內容超過此字元數時才使用行程池
+
+# 相似檔案偵測相關常數
+DUPLICATE_THRESHOLD = 0.8  # 視為相似的 Jaccard 相似度下限
+DUPLICATE_SIGNATURE_SIZE = 64  # MinHash 簽章保留的雜湊數量
+DUPLICATE_MAX_POSTINGS = 200  # 超過此檔案數共用的行不用於尋找候選配對
+
+# 常駐服務相關常數
+CONTENT_CACHE_SIZE = 20000  # 內容快取最多保留的檔案數
+DAEMON_SOCKET_NAME = "drag_n_paste-{}.sock"  # Unix socket 名稱（{} 為使用者）
+DAEMON_SOCKET_DIR = "drag_n_paste-{}"  # 沒有 XDG_RUNTIME_DIR 時，暫存目錄下只有使用者本人可存取的目錄
+DAEMON_TOKEN_CACHE_SIZE = 20000  # 服務保留的 token 計數數量（檔案路徑與估計器的組合）
+
+# 監看模式相關常數
+WATCH_POLL_INTERVAL = 0.5  # 比對檔案 stat 的間隔（秒）
+WATCH_DEBOUNCE = 0.3  # 最後一次變更後需安靜的秒數，之後才重新載入
+
+# 記錄檔跟隨相關常數
+FOLLOW_MAX_LINES = 5000  # 跟隨中的檔案最多保留的行數
+FOLLOW_POLL_INTERVAL = 0.5  # 檢查新增內容的間隔（秒）
+
+# 壓縮檔相關常數
+ARCHIVE_SEPARATOR = "!/"  # 虛擬路徑中壓縮檔與成員名稱的分隔（例如 bundle.zip!/logs/app.log）
+ARCHIVE_MAX_MEMBER_SIZE = 64 * 1024 * 1024  # 單一成員解壓縮後的大小上限（位元組）
+ARCHIVE_HANDLE_CACHE = 4  # 保持開啟的壓縮檔數量（載入同一壓縮檔的多個成員時不需重新開啟）
+ARCHIVE_SPOOL_MEMORY = 32 * 1024 * 1024  # 壓縮過的 tar 解壓縮後保留在記憶體的上限，超過時改存匿名暫存檔（位元組）
+ARCHIVE_SPOOL_MAX_SIZE = 4 * 1024 * 1024 * 1024  # 壓縮過的 tar 解壓縮後保留的上限，超過時不保留（位元組）
+
+# 背景工作相關常數
+TASK_WORKERS = 2  # 使用者操作（複製、匯出、搜尋）的執行緒數
+TASK_BACKGROUND_WORKERS = 2  # 背景維護工作（索引、token 計數、簽章）的執行緒數
+TASK_POLL_INTERVAL = 50  # UI執行緒取出完成結果的間隔（毫秒）
+
+# 效能數據相關常數
+METRICS_MAX_SAMPLES = 2048  # 每項耗時保留的最近樣本數（用於計算百分位數）
+METRICS_PERCENTILES = (50, 90, 99)  # 回報的百分位數
+METRICS_REFRESH_INTERVAL = 1000  # 效能數據面板的更新間隔（毫秒）
+METRICS_ENV = "DRAG_N_PASTE_METRICS"  # 設定此環境變數時啟用記錄，值為結束時輸出 JSON 的檔案（'-' 表示標準錯誤）
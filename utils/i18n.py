@@ -14,14 +14,36 @@ class I18nManager:
     
     def __init__(self):
         self.current_language = "zh_TW"  # 預設繁體中文
-        self.translations = {}
+        self.translations = {}  # 已建立的翻譯表（第一次使用某個語言時才建立）
+        self._table_builders = {
+            "zh_TW": self._build_zh_tw,
+            "en_US": self._build_en_us
+        }
         self.observers = []  # 觀察者列表，用於通知語言變更
-        self._load_translations()
     
-    def _load_translations(self):
-        """載入翻譯資源"""
-        # 中文翻譯
-        self.translations["zh_TW"] = {
+    def _get_table(self, language: str) -> Dict[str, str]:
+        """
+        取得語言的翻譯表（延遲建立）
+        
+        Args:
+            language (str): 語言代碼
+            
+        Returns:
+            Dict[str, str]: 翻譯表，不支援的語言返回空字典
+        """
+        table = self.translations.get(language)
+        if table is None:
+            builder = self._table_builders.get(language)
+            if builder is None:
+                return {}
+            table = builder()
+            self.translations[language] = table
+        return table
+    
+    @staticmethod
+    def _build_zh_tw() -> Dict[str, str]:
+        """建立中文翻譯表"""
+        return {
             # 視窗標題
             "window_title": "文字檔案拖拽工具",
             
@@ -29,17 +51,66 @@ class I18nManager:
             "file_list_title": "檔案列表",
             "text_content_title": "文字內容",
             
+            # 檔案列表欄位
+            "column_name": "名稱",
+            "column_size": "大小",
+            "column_lines": "行數",
+            "column_encoding": "編碼",
+            "column_tokens": "Token 估計",
+            "column_similar": "相似",
+            
+            # 檔案列表篩選
+            "filter": "篩選",
+            "filter_fuzzy": "模糊比對",
+            "filter_restrict_output": "只複製/匯出篩選結果",
+            "watch_files": "監看變更",
+            "filter_count": "{} / {}",
+            
+            # Token 預算
+            "token_budget": "預算:",
+            "tokens_total": "Tokens: {} / {} ({:.1f}%)",
+            "bytes_total": "位元組: {} / {} ({:.1f}%)",
+            "token_pending": "（{} 個檔案計算中）",
+            "budget_unit_tokens": "Tokens",
+            "budget_unit_bytes": "位元組",
+            "fit_output": "輸出符合預算",
+            "fit_proportional": "等比例裁剪",
+            "fit_priority": "依順序保留",
+            "fit_head_tail": "保留頭尾",
+            
+            # 輸出格式
+            "output_format": "格式:",
+            "format_plain": "純文字",
+            "format_markdown": "Markdown",
+            "format_xml": "XML",
+            "format_jsonl": "JSONL",
+            "reduce_content": "精簡內容",
+            "diff_duplicates": "相似檔案只輸出差異",
+            "delta_all": "輸出全部內容",
+            "delta_changed": "只輸出變更的檔案",
+            "delta_diff": "只輸出變更的差異",
+            
+            # 分段複製
+            "copy_next_part": "複製下一段",
+            "part_copied": "已複製第 {}/{} 段",
+            "all_parts_copied": "所有段落都已複製",
+            "part_limit_too_small": "每段上限太小，無法放入段落標題",
+            
             # 按鈕文字
             "delete_selected": "刪除選中",
             "restore": "復原",
+            "follow": "跟隨",
             "clear": "清空",
             "copy_content": "複製內容",
             "clear_content": "清空內容",
+            "export_content": "匯出內容",
             
             # 狀態訊息
             "drag_files_hint": "拖拽文字檔案到此視窗以新增到列表",
             "file_added": "已新增: {}",
+            "archive_added": "已從壓縮檔新增 {} 個檔案",
             "file_deleted": "檔案已刪除",
+            "file_moved": "已將 {} 移到第 {} 個",
             "file_restored": "檔案已復原",
             "all_files_cleared": "所有檔案已清空",
             "text_content_cleared": "文字內容已清空",
@@ -48,10 +119,24 @@ class I18nManager:
             "invalid_file": "不是合法的文字檔案",
             "file_exists": "檔案已存在於列表中",
             "read_file_error": "讀取檔案失敗: {}",
+            "archive_empty": "壓縮檔中沒有支援的文字檔案",
+            "archive_no_follow": "無法跟隨壓縮檔中的檔案",
+            "task_progress": "{} {}/{}",
+            "background_tasks": "背景處理中: {}",
+            "metrics_title": "效能數據",
+            "metrics_enable": "記錄效能數據",
+            "metrics_reset": "清除",
+            "metrics_save": "儲存 JSON",
+            "metrics_name": "項目",
+            "metrics_count": "次數",
+            "metrics_mean": "平均 ms",
+            "metrics_max": "最大 ms",
+            "metrics_total": "總計 ms",
             "no_file_selected": "請先選擇要刪除的檔案",
             "no_file_to_restore": "沒有可復原的檔案",
             "no_content_to_copy": "沒有內容可複製",
             "copy_failed": "複製失敗: {}",
+            "export_failed": "匯出失敗: {}",
             
             # 對話框訊息
             "confirm": "確認",
@@ -62,9 +147,13 @@ class I18nManager:
             "confirm_clear_files": "確定要清空所有檔案嗎？",
             "confirm_clear_content": "確定要清空文字內容嗎？",
             "content_copied": "內容已複製到剪貼簿",
+            "copying": "正在複製...",
+            "exporting": "正在匯出...",
+            "content_exported": "內容已匯出至: {}",
             
             # 狀態資訊
             "lines_chars": "行數: {}, 字元數: {}",
+            "lines_chars_bytes": "行數: {}, 字元數: {}, 位元組: {}",
             
             # 語言選項
             "language": "語言",
@@ -73,6 +162,9 @@ class I18nManager:
             
             # 狀態載入
             "state_loaded": "已載入 {} 個檔案",
+            "watch_reloaded": "已重新載入 {} 個變更的檔案",
+            "follow_started": "正在跟隨 {} 的新增內容",
+            "follow_stopped": "已停止跟隨 {}",
             
             # 剪貼簿功能
             "clipboard_empty": "剪貼簿為空",
@@ -80,11 +172,22 @@ class I18nManager:
             "files_pasted": "已貼上 {} 個檔案",
             "no_valid_files_in_clipboard": "剪貼簿中沒有有效的文字檔案",
             "text_pasted": "已貼上文字檔案: {}",
-            "create_text_file_failed": "創建文字檔案失敗: {}"
+            "create_text_file_failed": "創建文字檔案失敗: {}",
+            
+            # 搜尋功能
+            "search": "搜尋",
+            "search_regex": "正規表示式",
+            "search_case_sensitive": "區分大小寫",
+            "searching": "搜尋中...",
+            "search_summary": "{} 個結果，共 {} 個檔案",
+            "invalid_regex": "無效的正規表示式: {}",
+            "search_failed": "搜尋失敗: {}"
         }
-        
-        # 英文翻譯
-        self.translations["en_US"] = {
+    
+    @staticmethod
+    def _build_en_us() -> Dict[str, str]:
+        """建立英文翻譯表"""
+        return {
             # Window title
             "window_title": "Text File Drag & Drop Tool",
             
@@ -92,17 +195,66 @@ class I18nManager:
             "file_list_title": "File List",
             "text_content_title": "Text Content",
             
+            # File list columns
+            "column_name": "Name",
+            "column_size": "Size",
+            "column_lines": "Lines",
+            "column_encoding": "Encoding",
+            "column_tokens": "Est. Tokens",
+            "column_similar": "Similar",
+            
+            # File list filter
+            "filter": "Filter",
+            "filter_fuzzy": "Fuzzy",
+            "filter_restrict_output": "Copy/export filtered only",
+            "watch_files": "Watch for changes",
+            "filter_count": "{} / {}",
+            
+            # Token budget
+            "token_budget": "Budget:",
+            "tokens_total": "Tokens: {} / {} ({:.1f}%)",
+            "bytes_total": "Bytes: {} / {} ({:.1f}%)",
+            "token_pending": "({} files pending)",
+            "budget_unit_tokens": "Tokens",
+            "budget_unit_bytes": "Bytes",
+            "fit_output": "Fit output to budget",
+            "fit_proportional": "Proportional",
+            "fit_priority": "By order",
+            "fit_head_tail": "Head + tail",
+            
+            # Output format
+            "output_format": "Format:",
+            "format_plain": "Plain text",
+            "format_markdown": "Markdown",
+            "format_xml": "XML",
+            "format_jsonl": "JSONL",
+            "reduce_content": "Reduce content",
+            "diff_duplicates": "Diff near-duplicates",
+            "delta_all": "All content",
+            "delta_changed": "Changed files only",
+            "delta_diff": "Changes as diffs",
+            
+            # Chunked copy
+            "copy_next_part": "Copy Next Part",
+            "part_copied": "Copied part {}/{}",
+            "all_parts_copied": "All parts copied",
+            "part_limit_too_small": "Part limit is too small to fit the part header",
+            
             # Button text
             "delete_selected": "Delete Selected",
             "restore": "Restore",
+            "follow": "Follow",
             "clear": "Clear",
             "copy_content": "Copy Content",
             "clear_content": "Clear Content",
+            "export_content": "Export Content",
             
             # Status messages
             "drag_files_hint": "Drag text files to this window to add to list",
             "file_added": "Added: {}",
+            "archive_added": "Added {} files from archive",
             "file_deleted": "File deleted",
+            "file_moved": "Moved {} to position {}",
             "file_restored": "File restored",
             "all_files_cleared": "All files cleared",
             "text_content_cleared": "Text content cleared",
@@ -111,10 +263,24 @@ class I18nManager:
             "invalid_file": "Not a valid text file",
             "file_exists": "File already exists in list",
             "read_file_error": "Failed to read file: {}",
+            "archive_empty": "No supported text files in archive",
+            "archive_no_follow": "Files inside archives cannot be followed",
+            "task_progress": "{} {}/{}",
+            "background_tasks": "Background tasks: {}",
+            "metrics_title": "Performance Metrics",
+            "metrics_enable": "Record metrics",
+            "metrics_reset": "Reset",
+            "metrics_save": "Save JSON",
+            "metrics_name": "Name",
+            "metrics_count": "Count",
+            "metrics_mean": "mean ms",
+            "metrics_max": "max ms",
+            "metrics_total": "total ms",
             "no_file_selected": "Please select a file to delete first",
             "no_file_to_restore": "No file to restore",
             "no_content_to_copy": "No content to copy",
             "copy_failed": "Copy failed: {}",
+            "export_failed": "Export failed: {}",
             
             # Dialog messages
             "confirm": "Confirm",
@@ -125,9 +291,13 @@ class I18nManager:
             "confirm_clear_files": "Are you sure you want to clear all files?",
             "confirm_clear_content": "Are you sure you want to clear text content?",
             "content_copied": "Content copied to clipboard",
+            "copying": "Copying...",
+            "exporting": "Exporting...",
+            "content_exported": "Content exported to: {}",
             
             # Status info
             "lines_chars": "Lines: {}, Characters: {}",
+            "lines_chars_bytes": "Lines: {}, Characters: {}, Bytes: {}",
             
             # Language options
             "language": "Language",
@@ -136,6 +306,9 @@ class I18nManager:
             
             # State loading
             "state_loaded": "Loaded {} files",
+            "watch_reloaded": "Reloaded {} changed files",
+            "follow_started": "Following new lines in {}",
+            "follow_stopped": "Stopped following {}",
             
             # Clipboard functionality
             "clipboard_empty": "Clipboard is empty",
@@ -143,7 +316,16 @@ class I18nManager:
             "files_pasted": "Pasted {} files",
             "no_valid_files_in_clipboard": "No valid text files in clipboard",
             "text_pasted": "Pasted text file: {}",
-            "create_text_file_failed": "Failed to create text file: {}"
+            "create_text_file_failed": "Failed to create text file: {}",
+            
+            # Search functionality
+            "search": "Search",
+            "search_regex": "Regex",
+            "search_case_sensitive": "Match case",
+            "searching": "Searching...",
+            "search_summary": "{} results in {} files",
+            "invalid_regex": "Invalid regular expression: {}",
+            "search_failed": "Search failed: {}"
         }
     
     def get_text(self, key: str, *args) -> str:
@@ -157,8 +339,7 @@ class I18nManager:
         Returns:
             str: 翻譯後的文字
         """
-        translation = self.translations.get(self.current_language, {})
-        text = translation.get(key, key)  # 如果找不到翻譯，返回原鍵值
+        text = self._get_table(self.current_language).get(key, key)  # 如果找不到翻譯，返回原鍵值
         
         if args:
             try:
@@ -174,7 +355,7 @@ class I18nManager:
         Args:
             language (str): 語言代碼 (zh_TW 或 en_US)
         """
-        if language in self.translations:
+        if language in self._table_builders:
             self.current_language = language
             self._notify_observers()
     